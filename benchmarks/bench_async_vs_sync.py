@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import platform
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from benchmarks.load_benchmark import (
+    DEFAULT_HOST, DEFAULT_PORT, ENDPOINTS, git_commit, http_sender, run_load,
+    start_gunicorn, summarize, synthetic_payloads, to_batches
+)
+
+# --- Config ---
+# (gunicorn arguments, app module, server settings) per serving mode
+MODES = {
+    "sync": (["--threads", "8"], "run:app", {}),                           # Flask, threaded sync workers
+    "asgi": (["-k", "uvicorn.workers.UvicornWorker"], "run_asgi:app", {})  # asyncio, inference on an executor
+}
+# --------------------
+
+
+def measure(mode: str, endpoint: str, bodies: List[Any], warmup_bodies: List[Any], concurrency: int,
+            workers: int, port: int, timeout: float, items_per_request: int) -> Dict[str, Any]:
+    """
+    Starts gunicorn in one serving mode and drives it at one concurrency level.
+    """
+    extra_args, app_module, env = MODES[mode]
+    server = start_gunicorn(DEFAULT_HOST, port, workers, extra_args, app_module, env)
+    try:
+        send = http_sender(f"http://{DEFAULT_HOST}:{port}", ENDPOINTS[endpoint], concurrency, timeout)
+        if warmup_bodies:
+            run_load(send, warmup_bodies, concurrency)
+        latencies, statuses, elapsed = run_load(send, bodies, concurrency)
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {"mode": mode, "concurrency": concurrency, **summarize(latencies, statuses, elapsed, items_per_request)}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compares the Flask (sync) and asyncio (ASGI) serving modes under many keep-alive connections.")
+    parser.add_argument("--endpoint", choices=list(ENDPOINTS), default="predict")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 64, 256], help="Concurrent connections to measure.")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per run.")
+    parser.add_argument("--batch-size", type=int, default=100, help="Items per request for the batch endpoint.")
+    parser.add_argument("--warmup", type=int, default=200, help="Requests sent before measuring.")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers, same for both modes.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    args = parser.parse_args()
+
+    items_per_request = args.batch_size if args.endpoint == "batch" else 1
+    payloads = synthetic_payloads((args.requests + args.warmup) * items_per_request)
+    all_bodies = to_batches(payloads, args.batch_size) if args.endpoint == "batch" else payloads
+    warmup_bodies, bodies = all_bodies[:args.warmup], all_bodies[args.warmup:]
+
+    results = []
+    for concurrency in args.concurrency:
+        for mode in args.modes:
+            print(f"Measuring {mode} at concurrency {concurrency}...")
+            results.append(measure(
+                mode, args.endpoint, bodies, warmup_bodies, concurrency,
+                args.workers, args.port, args.timeout, items_per_request
+            ))
+
+    print(f"\n{'mode':>6} | {'conc':>5} | {'req/s':>9} | {'p50 ms':>8} | {'p99 ms':>8} | status codes")
+    for row in results:
+        print(f"{row['mode']:>6} | {row['concurrency']:>5} | {row['requests_per_sec']:>9} | "
+              f"{row['latency_ms']['p50']:>8} | {row['latency_ms']['p99']:>8} | {row['status_codes']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                "commit": git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "host": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+                "config": {"endpoint": args.endpoint, "workers": args.workers, "batch_size": items_per_request},
+                "results": results
+            }, f, indent=4)
+        print(f"\nResults saved to {args.output}")
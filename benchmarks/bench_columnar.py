@@ -0,0 +1,91 @@
+import json
+import time
+from typing import Any, Callable, Dict, List, Tuple
+from run import app
+from src.config import settings
+from src.controllers.predict_controller import prediction_controller
+from src.models import columnar
+from benchmarks.load_benchmark import API_PREFIX, synthetic_payloads
+
+# --- Config ---
+BATCH_SIZES = [100, 1000, 10000]
+N_ITEMS = 100000  # Items scored per measurement
+N_REPEATS = 3
+# --------------------
+
+
+def json_round_trip(client, items: List[Dict[str, Any]]) -> Tuple[List[str], int, int]:
+    """
+    Encodes, posts and decodes one batch through /predict/batch.
+    Returns (labels, request bytes, response bytes).
+    """
+    body = json.dumps(items).encode('utf-8')
+    response = client.post(f"{API_PREFIX}/predict/batch?echo=false", data=body, content_type='application/json')
+    assert response.status_code == 200, response.get_data(as_text=True)
+    data = response.get_data()
+    labels = [result.get("predicted_product_type") for result in json.loads(data)["results"]]
+    return labels, len(body), len(data)
+
+
+def columnar_round_trip(client, items: List[Dict[str, Any]]) -> Tuple[List[str], int, int]:
+    """
+    Encodes, posts and decodes one batch through /predict/columnar.
+    Returns (labels, request bytes, response bytes).
+    """
+    body = columnar.encode_request([item["package_weight_gr"] for item in items], [item["package_size"] for item in items])
+    response = client.post(f"{API_PREFIX}/predict/columnar", data=body, content_type=columnar.CONTENT_TYPE)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    data = response.get_data()
+    labels, _ = columnar.decode_labels(data)
+    return labels, len(body), len(data)
+
+
+def measure(round_trip: Callable, client, batches: List[List[Dict[str, Any]]]) -> Dict[str, float]:
+    """
+    Best-of-N_REPEATS wall and CPU time of scoring every batch, plus bytes on the wire.
+    CPU time covers the client and the server together: both run in this process.
+    """
+    best_wall = best_cpu = float('inf')
+    request_bytes = response_bytes = 0
+    for _ in range(N_REPEATS):
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        request_bytes = response_bytes = 0
+        for batch in batches:
+            _, sent, received = round_trip(client, batch)
+            request_bytes += sent
+            response_bytes += received
+        best_wall = min(best_wall, time.perf_counter() - wall_started)
+        best_cpu = min(best_cpu, time.process_time() - cpu_started)
+
+    n_items = sum(len(batch) for batch in batches)
+    return {
+        "wall_us_per_item": best_wall / n_items * 1e6,
+        "cpu_us_per_item": best_cpu / n_items * 1e6,
+        "request_bytes_per_item": request_bytes / n_items,
+        "response_bytes_per_item": response_bytes / n_items
+    }
+
+
+if __name__ == "__main__":
+
+    if prediction_controller.service is None:
+        raise SystemExit("PredictionService failed to initialize. Check the artifact paths.")
+
+    # The JSON route caps batches at MAX_BATCH_SIZE; lift it for the comparison
+    settings.MAX_BATCH_SIZE = max(BATCH_SIZES)
+    app.config['MAX_CONTENT_LENGTH'] = None
+    client = app.test_client()
+    payloads = synthetic_payloads(N_ITEMS)
+
+    print(f"{'batch':>6} | {'path':>8} | {'wall us/item':>12} | {'cpu us/item':>11} | {'req B/item':>10} | {'resp B/item':>11}")
+    for batch_size in BATCH_SIZES:
+        batches = [payloads[i:i + batch_size] for i in range(0, len(payloads), batch_size)]
+
+        # Both paths must return the same labels
+        for batch in batches[:5]:
+            assert json_round_trip(client, batch)[0] == columnar_round_trip(client, batch)[0]
+
+        for name, round_trip in (("json", json_round_trip), ("columnar", columnar_round_trip)):
+            r = measure(round_trip, client, batches)
+            print(f"{batch_size:>6} | {name:>8} | {r['wall_us_per_item']:>12.2f} | {r['cpu_us_per_item']:>11.2f} | "
+                  f"{r['request_bytes_per_item']:>10.1f} | {r['response_bytes_per_item']:>11.1f}")
@@ -0,0 +1,82 @@
+import json
+import timeit
+from run import app
+from src.controllers.predict_controller import prediction_controller
+from src.models.fast_io import fast_validate, validate_request
+from src.models.schemas import PredictionRequest
+from benchmarks.load_benchmark import API_PREFIX, synthetic_payloads, to_batches
+
+# --- Config ---
+N_CALLS = 500
+BATCH_SIZE = 200
+N_REPEATS = 3
+# --------------------
+
+def per_call_us(fn, bodies) -> float:
+    """
+    Returns the best-of-N_REPEATS mean latency of fn, in microseconds per call.
+    """
+    def run():
+        for body in bodies:
+            fn(body)
+
+    best = min(timeit.repeat(run, number=1, repeat=N_REPEATS))
+    return best / len(bodies) * 1e6
+
+
+def poster(client, path: str):
+    """
+    Posts one JSON body through the Flask test client and returns the response.
+    """
+    def post(body):
+        response = client.post(path, json=body)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return response
+
+    return post
+
+
+def compare_bodies(post, bodies):
+    """
+    Checks that the current and the fast path return the same JSON documents.
+    """
+    for body in bodies:
+        prediction_controller.fast_io = False
+        expected = json.loads(post(body).get_data())
+        prediction_controller.fast_io = True
+        assert json.loads(post(body).get_data()) == expected
+
+
+if __name__ == "__main__":
+
+    if prediction_controller.service is None:
+        raise SystemExit("PredictionService failed to initialize. Check the artifact paths.")
+
+    payloads = synthetic_payloads(N_CALLS)
+    batches = to_batches(synthetic_payloads(N_CALLS * 4), BATCH_SIZE)
+    client = app.test_client()
+
+    # Validation only
+    for payload in payloads:
+        assert fast_validate(payload) is not None
+    results = {
+        "validation: PredictionRequest + float()": per_call_us(
+            lambda body: float(PredictionRequest(**body).package_weight_gr), payloads
+        ),
+        "validation: fast path": per_call_us(validate_request, payloads)
+    }
+
+    # Whole requests, current path vs fast path
+    fast_io = prediction_controller.fast_io
+    for name, path, bodies in (("predict", "/predict", payloads), (f"batch x{BATCH_SIZE}", "/predict/batch", batches)):
+        for echo in ("true", "false"):
+            post = poster(client, f"{API_PREFIX}{path}?echo={echo}")
+            compare_bodies(post, bodies[:50])
+            for label, enabled in (("current", False), ("fast", True)):
+                prediction_controller.fast_io = enabled
+                results[f"{name} (echo={echo}): {label} path"] = per_call_us(post, bodies)
+    prediction_controller.fast_io = fast_io
+
+    print(f"\n--- Per-call latency (best of {N_REPEATS}) ---")
+    for name, latency in results.items():
+        print(f"{name:<48} {latency:10.1f} us")
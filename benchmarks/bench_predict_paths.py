@@ -0,0 +1,49 @@
+import timeit
+import numpy as np
+from src.services.prediction_service import prediction_service
+
+# --- Config ---
+N_CALLS = 500
+N_REPEATS = 3
+# --------------------
+
+def per_call_us(fn, weights, sizes) -> float:
+    """
+    Returns the best-of-N_REPEATS mean latency of fn, in microseconds per call.
+    """
+    inputs = list(zip(weights, sizes))
+
+    def run():
+        for weight, size in inputs:
+            fn(weight, size)
+
+    best = min(timeit.repeat(run, number=1, repeat=N_REPEATS))
+    return best / len(inputs) * 1e6
+
+
+if __name__ == "__main__":
+
+    if prediction_service is None:
+        raise SystemExit("PredictionService failed to initialize. Check the artifact paths.")
+
+    rng = np.random.default_rng(42)
+    weights = np.round(rng.uniform(50, 900, N_CALLS), 2).tolist()
+    sizes = rng.choice(prediction_service.size_encoder.classes_, N_CALLS).tolist()
+
+    # Both paths must agree before timing them
+    for weight, size in zip(weights, sizes):
+        assert prediction_service.predict(weight, size) == prediction_service.predict_reference(weight, size)
+
+    results = {"predict_reference (pandas + sklearn encoders)": per_call_us(prediction_service.predict_reference, weights, sizes)}
+
+    table = prediction_service.forest_table
+    prediction_service.artifacts.forest_table = None
+    results["predict (fast path, model call)"] = per_call_us(prediction_service.predict, weights, sizes)
+    prediction_service.artifacts.forest_table = table
+
+    if table is not None:
+        results["predict (fast path, compiled table)"] = per_call_us(prediction_service.predict, weights, sizes)
+
+    print(f"\n--- Per-call latency ({N_CALLS} calls, best of {N_REPEATS}) ---")
+    for name, latency in results.items():
+        print(f"{name:<48} {latency:10.1f} us")
@@ -0,0 +1,307 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# --- Config ---
+API_PREFIX = "/vinicius_rubens/api"
+ENDPOINTS = {"predict": f"{API_PREFIX}/predict", "batch": f"{API_PREFIX}/predict/batch"}
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5055 # Not the default API port, so a running API is left alone
+SERVER_START_TIMEOUT_S = 60
+
+# Same business rules as utils/create_synthetic_dataset.py
+SYNTHETIC_PATTERNS = {
+    'Smartphone': ('Small Package', 220),
+    'Tablet':     ('Large Package', 550)
+}
+WEIGHT_NOISE_STD_PERCENT = 0.25
+# --------------------
+
+
+# --- Payloads ---
+def synthetic_payloads(n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generates request payloads in the style of utils/create_synthetic_dataset.py.
+    """
+    rng = np.random.default_rng(seed)
+    products = rng.choice(list(SYNTHETIC_PATTERNS), size=n)
+
+    payloads = []
+    for product in products:
+        base_size, mean_weight = SYNTHETIC_PATTERNS[product]
+        size = base_size
+        if product == 'Tablet' and rng.random() < 0.2:
+            size = 'Small Package'
+        weight = round(float(abs(rng.normal(mean_weight, mean_weight * WEIGHT_NOISE_STD_PERCENT))), 2)
+        payloads.append({"package_weight_gr": weight, "package_size": size})
+    return payloads
+
+
+def load_payloads(path: str) -> List[Any]:
+    """
+    Reads one JSON request body per line from a JSONL file.
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def to_batches(payloads: List[Any], batch_size: int) -> List[List[Any]]:
+    """
+    Groups single payloads into /predict/batch bodies.
+    """
+    return [payloads[i:i + batch_size] for i in range(0, len(payloads), batch_size)]
+
+
+# --- Runners ---
+def run_load(send: Callable[[Any], int], bodies: List[Any], concurrency: int) -> Tuple[List[float], Dict[str, int], float]:
+    """
+    Sends every body once with a pool of concurrency threads.
+
+    Args:
+        send (Callable): Sends one body and returns the HTTP status code.
+        bodies (List[Any]): Request bodies, replayed in order.
+        concurrency (int): Number of concurrent senders.
+
+    Returns:
+        Tuple: (latencies in seconds, counts by status code, wall-clock seconds).
+    """
+    latencies = np.zeros(len(bodies), dtype=np.float64)
+    statuses: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def one(i: int):
+        started_at = time.perf_counter()
+        try:
+            status = str(send(bodies[i]))
+        except Exception as e:
+            status = f"error:{type(e).__name__}"
+        latencies[i] = time.perf_counter() - started_at
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(len(bodies))))
+    elapsed = time.perf_counter() - started_at
+
+    return latencies.tolist(), statuses, elapsed
+
+
+def inprocess_sender(path: str, max_in_flight: Optional[int] = None) -> Callable[[Any], int]:
+    """
+    Drives the Flask app in-process through its test client (one client per thread).
+    max_in_flight overrides the admission limit of the app.
+    """
+    from run import app
+
+    from src.controllers.predict_controller import prediction_controller
+    if max_in_flight is not None and prediction_controller.admission is not None:
+        prediction_controller.admission.max_in_flight = max_in_flight
+
+    local = threading.local()
+
+    def send(body: Any) -> int:
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        return client.post(path, json=body).status_code
+
+    return send
+
+
+def http_sender(base_url: str, path: str, concurrency: int, timeout: float) -> Callable[[Any], int]:
+    """
+    Sends requests over HTTP through one pooled keep-alive session.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    url = base_url + path
+
+    def send(body: Any) -> int:
+        return session.post(url, json=body, timeout=timeout).status_code
+
+    return send
+
+
+def start_gunicorn(
+    host: str, port: int, workers: int, extra_args: List[str], app_module: str = "run:app",
+    env: Optional[Dict[str, str]] = None
+) -> subprocess.Popen:
+    """
+    Starts a local gunicorn instance serving app_module and waits until it answers /ready.
+    env adds settings to the server's environment.
+
+    Raises:
+        RuntimeError: If the server does not come up in time.
+    """
+    import requests
+
+    command = [
+        sys.executable, "-m", "gunicorn", "--workers", str(workers),
+        "--bind", f"{host}:{port}", *extra_args, app_module
+    ]
+    print(f"Starting: {' '.join(command)}")
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env={**os.environ, **(env or {})})
+
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_S
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {process.returncode}")
+        try:
+            if requests.get(f"http://{host}:{port}/ready", timeout=1).ok:
+                return process
+        except requests.exceptions.RequestException:
+            # Not listening yet, or workers still loading the artifacts
+            pass
+        time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError("gunicorn did not become healthy in time.")
+
+
+# --- Reporting ---
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(latencies: List[float], statuses: Dict[str, int], elapsed: float, items_per_request: float) -> Dict[str, Any]:
+    """
+    Builds the latency/throughput summary of one run.
+    """
+    latencies_ms = np.asarray(latencies) * 1000
+    n_requests = len(latencies_ms)
+    return {
+        "requests": n_requests,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_sec": round(n_requests / elapsed, 1),
+        "items_per_sec": round(n_requests * items_per_request / elapsed, 1),
+        "latency_ms": {
+            "mean": round(float(latencies_ms.mean()), 3),
+            "p50": round(float(np.percentile(latencies_ms, 50)), 3),
+            "p95": round(float(np.percentile(latencies_ms, 95)), 3),
+            "p99": round(float(np.percentile(latencies_ms, 99)), 3),
+            "max": round(float(latencies_ms.max()), 3)
+        },
+        "status_codes": statuses
+    }
+
+
+def print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    """
+    Prints the summary, with relative changes against a baseline run if given.
+    """
+    summary = results["summary"]
+
+    def delta(path: List[str]) -> str:
+        if baseline is None:
+            return ""
+        old = baseline["summary"]
+        new = summary
+        for key in path:
+            old, new = old[key], new[key]
+        return f"  ({(new - old) / old * 100:+.1f}% vs {baseline.get('commit') or 'baseline'})" if old else ""
+
+    print("\n--- Load Test Results ---")
+    print(f"Mode: {results['config']['mode']} | Endpoint: {results['config']['endpoint']} | Concurrency: {results['config']['concurrency']}")
+    print(f"Requests: {summary['requests']} in {summary['elapsed_s']}s")
+    print(f"Throughput: {summary['requests_per_sec']} req/s{delta(['requests_per_sec'])}")
+    for key in ("p50", "p95", "p99"):
+        print(f"Latency {key}: {summary['latency_ms'][key]} ms{delta(['latency_ms', key])}")
+    print(f"Status codes: {summary['status_codes']}")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Load test and benchmark for the prediction API.")
+    parser.add_argument("--mode", choices=["inprocess", "gunicorn"], default="inprocess",
+                        help="inprocess: Flask test client. gunicorn: start a local gunicorn and drive it over HTTP.")
+    parser.add_argument("--url", help="Target an already running server instead of starting gunicorn (gunicorn mode).")
+    parser.add_argument("--endpoint", choices=list(ENDPOINTS), default="predict")
+    parser.add_argument("--payloads", help="JSONL file with one request body per line. Default: synthetic payloads.")
+    parser.add_argument("--requests", type=int, default=2000, help="Number of requests to send.")
+    parser.add_argument("--batch-size", type=int, default=100, help="Items per request for the batch endpoint.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=50, help="Requests sent before measuring.")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers (gunicorn mode).")
+    parser.add_argument("--gunicorn-args", default="", help="Extra gunicorn arguments, e.g. '--threads 8'.")
+    parser.add_argument("--max-in-flight", type=int,
+                        help="Admission limit per worker (ADMISSION_MAX_IN_FLIGHT). Default: the server's own.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds (HTTP modes).")
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against.")
+    args = parser.parse_args()
+
+    # --- 1. Build request bodies ---
+    items_per_request = args.batch_size if args.endpoint == "batch" else 1
+    n_items = (args.requests + args.warmup) * items_per_request
+    payloads = load_payloads(args.payloads) if args.payloads else synthetic_payloads(n_items)
+    payloads = (payloads * (n_items // max(len(payloads), 1) + 1))[:n_items]
+    bodies = to_batches(payloads, args.batch_size) if args.endpoint == "batch" else payloads
+    warmup_bodies, bodies = bodies[:args.warmup], bodies[args.warmup:]
+
+    # --- 2. Start the target ---
+    server = None
+    path = ENDPOINTS[args.endpoint]
+    if args.mode == "inprocess":
+        send = inprocess_sender(path, args.max_in_flight)
+    else:
+        base_url = args.url
+        if base_url is None:
+            env = {"ADMISSION_MAX_IN_FLIGHT": str(args.max_in_flight)} if args.max_in_flight is not None else None
+            server = start_gunicorn(DEFAULT_HOST, args.port, args.workers, args.gunicorn_args.split(), env=env)
+            base_url = f"http://{DEFAULT_HOST}:{args.port}"
+        send = http_sender(base_url, path, args.concurrency, args.timeout)
+
+    # --- 3. Run ---
+    try:
+        if warmup_bodies:
+            run_load(send, warmup_bodies, args.concurrency)
+        latencies, statuses, elapsed = run_load(send, bodies, args.concurrency)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    # --- 4. Report ---
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "host": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        "config": {
+            "mode": args.mode, "endpoint": args.endpoint, "concurrency": args.concurrency,
+            "batch_size": items_per_request, "workers": args.workers if args.mode == "gunicorn" else None,
+            "gunicorn_args": args.gunicorn_args, "max_in_flight": args.max_in_flight,
+            "payloads": args.payloads or "synthetic"
+        },
+        "summary": summarize(latencies, statuses, elapsed, items_per_request)
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"\nResults saved to {args.output}")
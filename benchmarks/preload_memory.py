@@ -0,0 +1,158 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+
+from benchmarks.load_benchmark import DEFAULT_HOST, DEFAULT_PORT, ENDPOINTS, git_commit, start_gunicorn, synthetic_payloads
+
+# --- Config ---
+MODES = {
+    "per-worker": [],                             # Each worker loads its own artifacts (start_api.sh default)
+    "preload": ["-c", "gunicorn_preload.py"]      # Loaded once in the master, shared after fork
+}
+ALL_WORKERS_READY_TIMEOUT_S = 60
+WARM_TRAFFIC_REQUESTS = 500
+# --------------------
+
+
+# --- /proc readers (Linux) ---
+def child_pids(pid: int) -> List[int]:
+    """
+    Direct children of pid, i.e. the gunicorn workers of a master.
+    """
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces: fields start after the last ')'
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """
+    PSS (shared pages split among the processes mapping them) and private
+    memory of one process, in kB, from /proc/<pid>/smaps_rollup.
+    """
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            if name in ('Pss', 'Private_Clean', 'Private_Dirty'):
+                values[name] = int(rest.split()[0])
+    return {"pss_kb": values['Pss'], "private_kb": values['Private_Clean'] + values['Private_Dirty']}
+
+
+# --- Measurements ---
+def wait_all_workers_ready(base_url: str, n_workers: int) -> Optional[float]:
+    """
+    Polls /ready concurrently until n_workers distinct worker pids answered 200.
+
+    Returns:
+        Optional[float]: Seconds waited, or None on timeout.
+    """
+    import requests
+
+    seen: Set[int] = set()
+    started_at = time.perf_counter()
+
+    def probe(_):
+        try:
+            response = requests.get(f"{base_url}/ready", timeout=1)
+            if response.ok:
+                return response.json().get("worker_pid")
+        except requests.exceptions.RequestException:
+            pass
+        return None
+
+    with ThreadPoolExecutor(max_workers=n_workers * 2) as executor:
+        while time.perf_counter() - started_at < ALL_WORKERS_READY_TIMEOUT_S:
+            seen.update(pid for pid in executor.map(probe, range(n_workers * 2)) if pid is not None)
+            if len(seen) >= n_workers:
+                return time.perf_counter() - started_at
+            time.sleep(0.05)
+    return None
+
+
+def send_traffic(base_url: str, n_requests: int, concurrency: int):
+    """
+    Sends /predict requests so workers touch the artifacts before memory is read.
+    """
+    import requests
+
+    session = requests.Session()
+    url = base_url + ENDPOINTS["predict"]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda body: session.post(url, json=body, timeout=10), synthetic_payloads(n_requests)))
+
+
+def measure(mode: str, n_workers: int, host: str, port: int) -> Dict[str, Any]:
+    """
+    Starts gunicorn in one mode, times readiness and reads memory per process.
+    """
+    base_url = f"http://{host}:{port}"
+    started_at = time.perf_counter()
+    process = start_gunicorn(host, port, n_workers, MODES[mode])
+    try:
+        first_ready_s = time.perf_counter() - started_at
+        all_ready_s = wait_all_workers_ready(base_url, n_workers)
+        if all_ready_s is not None:
+            all_ready_s += first_ready_s
+
+        send_traffic(base_url, WARM_TRAFFIC_REQUESTS, n_workers)
+
+        workers = [memory_kb(pid) for pid in child_pids(process.pid)]
+        master = memory_kb(process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+
+    total_pss_kb = master["pss_kb"] + sum(w["pss_kb"] for w in workers)
+    return {
+        "mode": mode,
+        "workers": n_workers,
+        "first_ready_s": round(first_ready_s, 3),
+        "all_ready_s": None if all_ready_s is None else round(all_ready_s, 3),
+        "master_pss_mb": round(master["pss_kb"] / 1024, 1),
+        "worker_pss_mb": round(sum(w["pss_kb"] for w in workers) / max(len(workers), 1) / 1024, 1),
+        "worker_private_mb": round(sum(w["private_kb"] for w in workers) / max(len(workers), 1) / 1024, 1),
+        "total_pss_mb": round(total_pss_kb / 1024, 1)
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compares PSS per worker and time to ready with and without preload.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Worker counts to measure.")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--output", help="Save the results as JSON.")
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        raise SystemExit("This script reads /proc/<pid>/smaps_rollup and needs Linux 4.14 or newer.")
+
+    results = []
+    for n_workers in args.workers:
+        for mode in args.modes:
+            print(f"Measuring {mode} with {n_workers} workers...")
+            results.append(measure(mode, n_workers, args.host, args.port))
+
+    columns = list(results[0])
+    print("\n" + " | ".join(f"{c:>17}" for c in columns))
+    for row in results:
+        print(" | ".join(f"{str(row[c]):>17}" for c in columns))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"git_commit": git_commit(), "results": results}, f, indent=2)
+        print(f"\nSaved to {args.output}")
@@ -0,0 +1,158 @@
+import argparse
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+# --- Config ---
+# Same input columns as pre_processing/src/build_dataset.load_data
+WEIGHT_COL = 'package_weight_gr'
+SIZE_COL = 'package_size'
+PREDICTION_COL = 'predicted_product_type'
+
+DEFAULT_CHUNK_SIZE = 100_000
+# --------------------
+
+# Set once per worker process by _init_worker()
+_service = None
+
+
+def _init_worker():
+    """
+    Loads the artifacts once per worker process.
+    Importing the module creates the PredictionService singleton.
+    """
+    global _service
+    from src.services.prediction_service import prediction_service
+
+    if prediction_service is None:
+        raise RuntimeError("PredictionService failed to initialize. Check the artifact paths.")
+    _service = prediction_service
+
+
+def _score_chunk(index: int, chunk: pd.DataFrame, output_dir: str) -> Tuple[int, int, int]:
+    """
+    Scores one chunk and writes it as one Parquet partition.
+
+    Rows with a non-positive or missing weight, or an unknown size,
+    get a null prediction, like the API would reject them.
+
+    Returns:
+        Tuple[int, int, int]: (chunk index, rows scored, rows with a null prediction).
+    """
+    weights = pd.to_numeric(chunk[WEIGHT_COL], errors='coerce').to_numpy(dtype=np.float64)
+    sizes = chunk[SIZE_COL].astype(str).to_numpy(dtype=object)
+
+    valid = np.isfinite(weights) & (weights > 0)
+    predictions = np.full(len(chunk), None, dtype=object)
+    predictions[valid] = _service.predict_batch(weights[valid], sizes[valid])
+
+    chunk = chunk.assign(**{PREDICTION_COL: predictions})
+    chunk.to_parquet(os.path.join(output_dir, f'part-{index:05d}.parquet'), index=False)
+
+    return index, len(chunk), int(pd.isna(predictions).sum())
+
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Reads a CSV or Parquet file in chunks of at most chunk_size rows.
+    """
+    if path.endswith('.parquet') or os.path.isdir(path):
+        import pyarrow.dataset as ds
+
+        for batch in ds.dataset(path, format='parquet').to_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def run(input_path: str, output_dir: str, workers: int, chunk_size: int, overwrite: bool = False):
+    """
+    Scores input_path with a pool of worker processes and writes
+    partitioned Parquet to output_dir. At most 2 chunks per worker
+    are in flight, so memory stays bounded for any input size.
+
+    Partitions are written to a temporary sibling directory that replaces
+    output_dir only once every chunk is scored, so output_dir never mixes
+    partitions of two runs and a failed run leaves it untouched.
+
+    Raises:
+        FileExistsError: If output_dir is not empty and overwrite is False.
+    """
+    output_dir = os.path.normpath(output_dir)
+    if os.path.isdir(output_dir) and os.listdir(output_dir) and not overwrite:
+        raise FileExistsError(f"Output directory '{output_dir}' is not empty. Use --overwrite to replace it.")
+
+    staging_dir = f"{output_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    try:
+        _score_all(input_path, staging_dir, workers, chunk_size, output_dir)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.replace(staging_dir, output_dir)
+
+
+def _score_all(input_path: str, staging_dir: str, workers: int, chunk_size: int, output_dir: str):
+    """
+    Body of run(): scores every chunk into staging_dir.
+    """
+    print(f"Scoring '{input_path}' -> '{output_dir}'")
+    print(f"Workers: {workers}, chunk size: {chunk_size}")
+
+    started_at = time.perf_counter()
+    total_rows = 0
+    total_nulls = 0
+    pending = set()
+
+    def collect(done):
+        nonlocal total_rows, total_nulls
+        for future in done:
+            index, n_rows, n_nulls = future.result()
+            total_rows += n_rows
+            total_nulls += n_nulls
+            elapsed = time.perf_counter() - started_at
+            print(f"  part-{index:05d}: {n_rows} rows | total {total_rows} rows | {total_rows / elapsed:,.0f} rows/sec")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        for index, chunk in enumerate(read_chunks(input_path, chunk_size)):
+            missing = {WEIGHT_COL, SIZE_COL} - set(chunk.columns)
+            if missing:
+                raise ValueError(f"Input is missing required columns: {sorted(missing)}")
+
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(executor.submit(_score_chunk, index, chunk, staging_dir))
+
+        done, _ = wait(pending)
+        collect(done)
+
+    elapsed = time.perf_counter() - started_at
+    print("\n--- Bulk scoring complete ---")
+    print(f"Rows: {total_rows} ({total_nulls} without prediction)")
+    print(f"Elapsed: {elapsed:.1f}s | {total_rows / max(elapsed, 1e-9):,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Offline bulk scoring of CSV/Parquet files, no API involved.")
+    parser.add_argument("input", help="Input CSV file, Parquet file or Parquet directory.")
+    parser.add_argument("output_dir", help="Directory for the partitioned Parquet output.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: all cores).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk/partition.")
+    parser.add_argument("--overwrite", action="store_true", help="Replace a non-empty output directory.")
+    args = parser.parse_args()
+
+    try:
+        run(args.input, args.output_dir, args.workers, args.chunk_size, args.overwrite)
+    except FileExistsError as e:
+        raise SystemExit(str(e))
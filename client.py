@@ -1,10 +1,12 @@
 import requests
 import json
-import sys
+from prediction_client import DEFAULT_BASE_URL, API_PREFIX, PredictionAPIError, PredictionClient
 
 # --- Configuration ---
-# This must match the URL prefix in 'routes.py' and the Gunicorn host/port
-API_URL = "http://localhost:5000/vinicius_rubens/api/predict"
+# This must match the Gunicorn host/port
+BASE_URL = DEFAULT_BASE_URL
+API_URL = f"{BASE_URL}{API_PREFIX}/predict"
+TIMEOUT_S = 10
 
 def get_user_input() -> tuple[str, str] | tuple[None, None]:
     """
@@ -37,28 +39,18 @@ def get_user_input() -> tuple[str, str] | tuple[None, None]:
     # Return strings, as Pydantic will handle the conversion
     return weight_str, size_str
 
-def call_api(weight: str, size: str):
+def call_api(client: PredictionClient, weight: str, size: str):
     """
-    Builds the payload, calls the API, and prints the response.
+    Calls the API through the client and prints the response.
     """
-    
-    payload = {
-        "package_weight_gr": weight,
-        "package_size": size
-    }
-    
     print(f"\nSending request to {API_URL}...")
     
     try:
-        # Send the POST request with a 10-second timeout
-        response = requests.post(API_URL, json=payload, timeout=10)
-        
-        # This will automatically raise an error for 4xx/5xx responses
-        response.raise_for_status() 
+        response = client.predict(weight, size)
 
         # --- Success ---
         print("\n--- ✅ API Success Response ---")
-        print(json.dumps(response.json(), indent=2, ensure_ascii=False))
+        print(json.dumps(response, indent=2, ensure_ascii=False))
         
     except requests.exceptions.ConnectionError:
         print("\n--- ❌ API Connection Error ---")
@@ -68,15 +60,14 @@ def call_api(weight: str, size: str):
         print("\n--- ❌ API Timeout Error ---")
         print("Error: The request timed out.")
         
-    except requests.exceptions.HTTPError as e:
-        # This handles 4xx (Bad Request, Validation) and 5xx (Server Error)
-        print(f"\n--- ❌ API Error (HTTP {e.response.status_code}) ---")
-        try:
-            # Try to print the JSON error from our API
-            print(json.dumps(e.response.json(), indent=2, ensure_ascii=False))
-        except json.JSONDecodeError:
+    except PredictionAPIError as e:
+        # This handles 4xx (Bad Request, Validation) and 5xx (Server Error), after retries
+        print(f"\n--- ❌ API Error (HTTP {e.status_code}) ---")
+        if isinstance(e.body, dict):
+            print(json.dumps(e.body, indent=2, ensure_ascii=False))
+        else:
             # If the error is not JSON (e.g., a proxy error)
-            print(e.response.text)
+            print(e.body)
             
     except Exception as e:
         print(f"\n--- ❌ An Unexpected Error Occurred ---")
@@ -90,15 +81,17 @@ def main():
     print(f"Connecting to: {API_URL}")
     print("Type 'sair' or 'exit' at any prompt to quit.")
     
-    while True:
-        weight, size = get_user_input()
-        
-        if weight is None: # Exit signal
-            break
+    with PredictionClient(BASE_URL, pool_size=1, timeout_s=TIMEOUT_S) as client:
+        while True:
+            weight, size = get_user_input()
             
-        call_api(weight, size)
-        print("-" * 40) # Separator
+            if weight is None: # Exit signal
+                break
+                
+            call_api(client, weight, size)
+            print("-" * 40) # Separator
 
+        print(f"\nClient-side latency: {client.latency_stats()}")
     print("\nExiting client. Goodbye!")
 
 if __name__ == "__main__":
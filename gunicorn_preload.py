@@ -0,0 +1,81 @@
+"""
+Gunicorn config for the preload-and-fork serving mode.
+
+    gunicorn -c gunicorn_preload.py run:app
+
+The gunicorn master imports the app once (preload_app), so pandas, sklearn
+and the artifacts are loaded, compiled and warmed up a single time. Workers
+are then forked from it and share those memory pages copy-on-write instead
+of each loading its own copy.
+
+Pages stay shared only while nothing writes to them. So, following the
+gc.freeze() recipe from the Python docs:
+- the garbage collector is disabled in the master while it loads the app,
+  so collections do not leave freed holes in (or write to) the loaded objects;
+- right before each fork, the artifact arrays are made read-only and every
+  live object is moved to the permanent generation with gc.freeze(), so
+  collections in the workers never touch them;
+- the collector is re-enabled in the master after gc.freeze(), and in each
+  worker as soon as it starts.
+
+Threads do not survive fork: the micro-batcher, the shadow scorer and the
+metrics files are started per process, on first use after the fork. The
+model watcher never runs in the master (a reload there while it forks would
+leave the child a held reload lock): each worker starts its own in post_fork,
+and reloads at once if the files changed since the master loaded them.
+A hot reload in a worker loads a private copy of the new artifacts; restart
+gunicorn (or send it SIGHUP) to share a new version again.
+
+Every setting below can be overridden from the command line, e.g. --workers 8.
+"""
+import gc
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+preload_app = True
+
+# Read by the app's settings, imported after this file: the master must not watch
+os.environ["MODEL_WATCH_AUTOSTART"] = "false"
+
+# Loading the app allocates most long-lived objects: no collections meanwhile
+gc.disable()
+
+
+def when_ready(server):
+    """
+    Runs in the master once the app is loaded, before the first fork.
+    """
+    from src.services.prediction_service import prediction_service
+
+    if prediction_service is None:
+        server.log.warning("PredictionService failed to initialize; workers will not be ready.")
+        return
+    server.log.info(f"Artifacts {prediction_service.model_version} preloaded.")
+
+
+def pre_fork(server, worker):
+    """
+    Runs in the master before every fork, including worker respawns.
+    """
+    from src.services.prediction_service import prediction_service
+
+    if prediction_service is not None:
+        prediction_service.artifacts.freeze()
+        if prediction_service.shadow_artifacts is not None:
+            prediction_service.shadow_artifacts.freeze()
+    gc.freeze()
+    # Frozen objects are never scanned again, so the master can collect what it allocates later
+    gc.enable()
+
+
+def post_fork(server, worker):
+    """
+    Runs first thing in each worker.
+    """
+    gc.enable()
+
+    from src.services.model_watcher import model_watcher
+
+    if model_watcher is not None:
+        model_watcher.start()
@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import pickle
+import timeit
+import argparse
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+# Make the 'src' package importable when running from modelling/src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from src.services.forest_engine import ForestArrays
+from src.services.forest_table import ForestTable, extract_trees, model_classes, tree_predict_proba
+
+# Post-training step after random_forest.py / random_forest_cpu.py.
+# The problem has two features, so most of a 100-tree forest is redundant.
+# Builds smaller candidates, measures their accuracy and latency, and saves
+# the fastest one within the accuracy budget as a portable ForestArrays
+# artifact, served with FOREST_ARRAYS_PATH=modelling/artifacts/forest_compact
+
+# --- Config ---
+DATA_DIR = '../../pre_processing/data/'
+X_TRAIN_PATH = os.path.join(DATA_DIR, 'X_train.parquet')
+X_TEST_PATH = os.path.join(DATA_DIR, 'X_test.parquet')
+Y_TRAIN_PATH = os.path.join(DATA_DIR, 'y_train.parquet')
+Y_TEST_PATH = os.path.join(DATA_DIR, 'y_test.parquet')
+
+ARTIFACTS_DIR = '../artifacts/'
+MODEL_PATH = os.path.join(ARTIFACTS_DIR, 'model.pkl')
+METRICS_PATH = os.path.join(ARTIFACTS_DIR, 'model_best_metrics.json')
+COMPACT_DIR = os.path.join(ARTIFACTS_DIR, 'forest_compact')
+REPORT_PATH = os.path.join(ARTIFACTS_DIR, 'compression_report.json')
+
+ACCURACY_TOLERANCE = 0.005     # Max test accuracy lost against model_best_metrics.json
+SUBSET_SIZES = [1, 2, 3, 5, 10, 20, 50]  # Tree counts of the greedy sub-forests
+SELECTION_ROWS = 20000         # Training rows scored by the greedy selection
+DISTILL_DEPTHS = [1, 2, 3, 4, 5, 6]
+DISTILL_GRID_POINTS = 4096     # Weights per size code added to the distillation set
+LATENCY_CALLS = 2000           # Single-row predictions timed per candidate
+LATENCY_REPEATS = 3
+RANDOM_STATE = 42
+# --------------------
+
+def load_data():
+    """
+    Loads the encoded splits as float32 feature arrays (the dtype the trees split on).
+    """
+    X_train = pd.read_parquet(X_TRAIN_PATH).to_numpy(dtype=np.float32)
+    X_test = pd.read_parquet(X_TEST_PATH).to_numpy(dtype=np.float32)
+    y_train = pd.read_parquet(Y_TRAIN_PATH)['product_type'].to_numpy()
+    y_test = pd.read_parquet(Y_TEST_PATH)['product_type'].to_numpy()
+    return X_train, X_test, y_train, y_test
+
+
+def greedy_subsets(trees: list, classes: np.ndarray, X: np.ndarray, y: np.ndarray) -> dict:
+    """
+    Forward selection: starting from no tree, repeatedly adds the tree that
+    most improves accuracy on (X, y).
+
+    Returns:
+        dict: Selected tree indexes for every size in SUBSET_SIZES below the forest size.
+    """
+    sizes = [k for k in SUBSET_SIZES if k < len(trees)]
+    if not sizes:
+        return {}
+
+    # Per-tree class probabilities, shape (n_trees, n_rows, n_classes)
+    X = X.astype(np.float64)
+    tree_proba = np.stack([tree_predict_proba(tree, X) for tree in trees])
+    y_index = np.searchsorted(classes, y)
+
+    selected, subsets = [], {}
+    votes = np.zeros(tree_proba.shape[1:], dtype=np.float64)
+    remaining = np.ones(len(trees), dtype=bool)
+
+    while len(selected) < max(sizes):
+        # Accuracy of the current votes plus each remaining tree, all at once
+        candidates = np.flatnonzero(remaining)
+        accuracy = ((votes[None] + tree_proba[candidates]).argmax(axis=2) == y_index[None]).mean(axis=1)
+        best = int(candidates[accuracy.argmax()])
+
+        selected.append(best)
+        remaining[best] = False
+        votes += tree_proba[best]
+        if len(selected) in sizes:
+            subsets[len(selected)] = list(selected)
+
+    return subsets
+
+
+def distill(forest: ForestArrays, X_train: np.ndarray, n_size_codes: int, depth: int):
+    """
+    Fits one shallow tree to the forest's own predictions, on the training
+    rows plus a dense weight grid per size code, so the tree also learns the
+    forest's boundaries where training data is sparse.
+    """
+    weights = np.linspace(0.0, float(X_train[:, 0].max()) * 1.1, DISTILL_GRID_POINTS, dtype=np.float32)
+    grid = np.array([(w, s) for s in range(n_size_codes) for w in weights], dtype=np.float32)
+    X = np.vstack([X_train, grid])
+
+    student = DecisionTreeClassifier(max_depth=depth, random_state=RANDOM_STATE)
+    student.fit(X, forest.predict(X))
+    return student
+
+
+def per_call_us(fn, args: list) -> float:
+    """
+    Best-of-LATENCY_REPEATS mean latency of fn, in microseconds per call.
+    """
+    def run():
+        for a in args:
+            fn(*a)
+
+    return min(timeit.repeat(run, number=1, repeat=LATENCY_REPEATS)) / len(args) * 1e6
+
+
+def evaluate(name: str, kind: str, candidate: ForestArrays, full_predictions: np.ndarray,
+             X_test: np.ndarray, y_test: np.ndarray, n_size_codes: int) -> dict:
+    """
+    Test accuracy, agreement with the full forest and per-prediction latency of one candidate.
+    Latency is measured on the uncompiled path (ForestArrays traversal, grows with the tree count)
+    and on the compiled lookup table that PredictionService builds by default.
+    """
+    predictions = candidate.predict(X_test)
+    table = ForestTable.compile(candidate, n_size_codes=n_size_codes)
+
+    rows = [(X_test[i:i + 1],) for i in range(min(LATENCY_CALLS, len(X_test)))]
+    scalars = [(float(row[0, 0]), int(row[0, 1])) for (row,) in rows]
+
+    return {
+        "name": name,
+        "kind": kind,
+        "n_trees": candidate.n_estimators,
+        "n_nodes": int(len(candidate.feature)),
+        "max_depth": candidate.max_depth,
+        "compiled_intervals": int(sum(t.size + 1 for t in table.thresholds)),
+        "test_accuracy": round(float(np.mean(predictions == y_test)), 4),
+        "agreement_with_full": round(float(np.mean(predictions == full_predictions)), 4),
+        "latency_us": round(per_call_us(candidate.predict, rows), 2),
+        "compiled_latency_us": round(per_call_us(table.predict_one, scalars), 3)
+    }
+
+
+def compress_forest(tolerance: float):
+
+    # --- 1. Load Model & Data ---
+    print(f"Loading model from {MODEL_PATH}...")
+    with open(MODEL_PATH, 'rb') as f:
+        model = pickle.load(f)
+    forest = ForestArrays.from_model(model)
+    trees = extract_trees(forest)
+    classes = model_classes(forest)
+
+    print("Loading data...")
+    X_train, X_test, y_train, y_test = load_data()
+    n_size_codes = int(max(X_train[:, 1].max(), X_test[:, 1].max())) + 1
+    full_predictions = forest.predict(X_test)
+
+    if os.path.exists(METRICS_PATH):
+        with open(METRICS_PATH) as f:
+            reference_accuracy = json.load(f)["test_metrics"]["accuracy"]
+    else:
+        print(f"[WARNING] {METRICS_PATH} not found. Using the loaded model's test accuracy as the reference.")
+        reference_accuracy = round(float(np.mean(full_predictions == y_test)), 4)
+    accuracy_floor = reference_accuracy - tolerance
+    print(f"Trees: {forest.n_estimators} | Reference accuracy: {reference_accuracy} | Floor: {accuracy_floor:.4f}\n")
+
+    # --- 2. Candidates ---
+    candidates = [("full", "forest", forest)]
+
+    print("Selecting tree subsets greedily...")
+    rng = np.random.default_rng(RANDOM_STATE)
+    selection_idx = rng.choice(len(X_train), size=min(SELECTION_ROWS, len(X_train)), replace=False)
+    for size, indexes in greedy_subsets(trees, classes, X_train[selection_idx], y_train[selection_idx]).items():
+        candidates.append((f"subset-{size}", "tree_subset", ForestArrays.from_trees([trees[i] for i in indexes], classes)))
+
+    print("Distilling the forest into single trees...")
+    for depth in DISTILL_DEPTHS:
+        student = distill(forest, X_train, n_size_codes, depth)
+        if not np.array_equal(model_classes(student), classes):
+            print(f"[WARNING] Distilled tree of depth {depth} does not predict every class. Skipped.")
+            continue
+        candidates.append((f"distilled-depth-{depth}", "distilled_tree", ForestArrays.from_model(student)))
+
+    # --- 3. Evaluate ---
+    print("Measuring accuracy and latency...\n")
+    results = [
+        evaluate(name, kind, candidate, full_predictions, X_test, y_test, n_size_codes)
+        for name, kind, candidate in candidates
+    ]
+
+    eligible = [r for r in results if r["test_accuracy"] >= accuracy_floor]
+    chosen = min(eligible, key=lambda r: (r["latency_us"], r["n_nodes"])) if eligible else None
+
+    columns = ["name", "n_trees", "n_nodes", "compiled_intervals", "test_accuracy", "agreement_with_full", "latency_us", "compiled_latency_us"]
+    print(" | ".join(f"{c:>19}" for c in columns))
+    for r in results:
+        marker = " <- chosen" if chosen is r else ""
+        print(" | ".join(f"{str(r[c]):>19}" for c in columns) + marker)
+    print("------------------------------------------\n")
+
+    # --- 4. Save ---
+    report = {
+        "reference_accuracy": reference_accuracy,
+        "tolerance": tolerance,
+        "accuracy_floor": round(accuracy_floor, 4),
+        "chosen": chosen["name"] if chosen else None,
+        "candidates": results
+    }
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    print(f"Saving report to {REPORT_PATH}...")
+    with open(REPORT_PATH, 'w') as f:
+        json.dump(report, f, indent=4)
+
+    if chosen is None:
+        raise SystemExit("No candidate is within the accuracy budget. Compact artifact NOT written.")
+
+    compact = next(candidate for name, _, candidate in candidates if name == chosen["name"])
+    print(f"Saving {chosen['name']} to {COMPACT_DIR}...")
+    compact.save(COMPACT_DIR)
+
+    # The saved artifact must score exactly as evaluated
+    mismatches = int(np.sum(ForestArrays.load(COMPACT_DIR).predict(X_test) != compact.predict(X_test)))
+    if mismatches:
+        raise SystemExit(f"Saved artifact disagrees with the candidate on {mismatches} rows.")
+
+    print(f"Compression complete. Serve it with FOREST_ARRAYS_PATH={os.path.normpath(os.path.join('modelling', 'artifacts', 'forest_compact'))}")
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compresses the trained forest under an accuracy budget.")
+    parser.add_argument("--tolerance", type=float, default=ACCURACY_TOLERANCE,
+                        help="Max test accuracy lost against model_best_metrics.json.")
+    args = parser.parse_args()
+
+    compress_forest(args.tolerance)
@@ -0,0 +1,59 @@
+import os
+import sys
+import pickle
+import numpy as np
+import pandas as pd
+
+# Make the 'src' package importable when running from modelling/src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from src.services.forest_engine import ForestArrays
+
+# --- Config ---
+ARTIFACTS_DIR = '../artifacts/'
+MODEL_PATH = os.path.join(ARTIFACTS_DIR, 'model.pkl')
+FOREST_DIR = os.path.join(ARTIFACTS_DIR, 'forest')
+
+DATA_DIR = '../../pre_processing/data/'
+X_TEST_PATH = os.path.join(DATA_DIR, 'X_test.parquet')
+# --------------------
+
+def export_forest():
+    """
+    Converts the pickled forest into the portable ForestArrays format
+    and checks that both give the same predictions on the test set.
+    """
+
+    # --- 1. Load Model ---
+    # Needs the training environment (cuML) only to unpickle the estimator
+    print(f"Loading model from {MODEL_PATH}...")
+    with open(MODEL_PATH, 'rb') as f:
+        model = pickle.load(f)
+
+    # --- 2. Convert ---
+    print("Converting forest to flat NumPy arrays...")
+    forest = ForestArrays.from_model(model)
+    print(f"Trees: {forest.n_estimators} | Nodes: {len(forest.feature)} | Max depth: {forest.max_depth}")
+
+    # --- 3. Check Equivalence ---
+    if os.path.exists(X_TEST_PATH):
+        print("Checking predictions against the original model on the test set...")
+        X_test = pd.read_parquet(X_TEST_PATH)
+        expected = np.asarray(model.predict(X_test))
+        if hasattr(expected, 'get'):
+            expected = expected.get() # CuPy array -> NumPy array
+
+        mismatches = int(np.sum(forest.predict(X_test.to_numpy()) != expected.ravel()))
+        print(f"Mismatches: {mismatches} / {len(X_test)}")
+        if mismatches:
+            raise SystemExit("Exported forest does not match the model. Artifact NOT written.")
+    else:
+        print(f"[WARNING] {X_TEST_PATH} not found. Skipping the equivalence check.")
+
+    # --- 4. Save ---
+    print(f"Saving portable forest to {FOREST_DIR}...")
+    forest.save(FOREST_DIR)
+
+    print("Export complete. Serve it with FOREST_ARRAYS_PATH=modelling/artifacts/forest")
+
+if __name__ == "__main__":
+    export_forest()
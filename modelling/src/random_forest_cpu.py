@@ -0,0 +1,184 @@
+import os
+import pickle
+import json
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv # noqa: F401 (enables HalvingGridSearchCV)
+from sklearn.metrics import accuracy_score, confusion_matrix
+from sklearn.model_selection import HalvingGridSearchCV, StratifiedKFold
+
+# CPU counterpart of random_forest.py, for machines without a GPU.
+# Same inputs, same artifacts (model.pkl + model_best_metrics.json).
+
+# --- Config ---
+DATA_DIR = '../../pre_processing/data/'
+X_TRAIN_PATH = os.path.join(DATA_DIR, 'X_train.parquet')
+X_TEST_PATH = os.path.join(DATA_DIR, 'X_test.parquet')
+Y_TRAIN_PATH = os.path.join(DATA_DIR, 'y_train.parquet')
+Y_TEST_PATH = os.path.join(DATA_DIR, 'y_test.parquet')
+
+ARTIFACTS_DIR = '../artifacts/'
+MODEL_PATH = os.path.join(ARTIFACTS_DIR, 'model.pkl')
+METRICS_PATH = os.path.join(ARTIFACTS_DIR, 'model_best_metrics.json')
+
+N_JOBS = -1 # Worker processes for the (candidate, fold) fits. -1 = all cores
+RANDOM_STATE = 42
+# --------------------
+
+# --- Hiperparams ---
+# Same search space as random_forest.py
+PARAM_GRID = {
+    'max_depth': [6, 8, 10, 12],
+    'n_estimators': [100, 200, 300],
+    'min_samples_leaf': [2, 3, 4, 5]
+    # Total combinations: 4 * 3 * 4 = 48
+}
+
+CV_FOLDS = 5 # "Cross-Validations"
+
+# Successive halving: every round keeps the best 1/HALVING_FACTOR of the
+# candidates and gives them HALVING_FACTOR times more training rows.
+# Only the last few candidates are fitted on the full folds.
+HALVING_FACTOR = 3
+MIN_RESOURCES = 'exhaust' # Start as small as needed to end on the full training set
+# --------------------
+
+def load_data():
+    """
+    Loads the encoded splits once, as contiguous float32 feature arrays
+    (the dtype the trees split on), so no fit has to convert them again.
+    """
+    X_train = pd.read_parquet(X_TRAIN_PATH)
+    X_test = pd.read_parquet(X_TEST_PATH)
+    y_train = pd.read_parquet(Y_TRAIN_PATH)['product_type'].to_numpy()
+    y_test = pd.read_parquet(Y_TEST_PATH)['product_type'].to_numpy()
+
+    X_train = X_train.astype(np.float32)
+    X_test = X_test.astype(np.float32)
+    return X_train, X_test, y_train, y_test
+
+
+def make_folds(y: np.ndarray):
+    """
+    Computes the stratified CV fold indices once. Every halving round
+    subsamples these same folds instead of re-splitting the data.
+    """
+    splitter = StratifiedKFold(n_splits = CV_FOLDS, shuffle = True, random_state = RANDOM_STATE)
+    return list(splitter.split(np.zeros(len(y)), y))
+
+
+def candidate_timings(cv_results: dict) -> pd.DataFrame:
+    """
+    Sums the fit and score wall-clock time of every candidate over
+    all its folds and halving rounds.
+    """
+    results = pd.DataFrame({
+        'params': [json.dumps(p, sort_keys = True) for p in cv_results['params']],
+        'round': cv_results['iter'],
+        'n_resources': cv_results['n_resources'],
+        'mean_test_score': cv_results['mean_test_score'],
+        'seconds': (np.asarray(cv_results['mean_fit_time']) + np.asarray(cv_results['mean_score_time'])) * CV_FOLDS
+    })
+    return (
+        results.groupby('params')
+        .agg(
+            rounds = ('round', lambda r: int(r.max()) + 1),
+            max_rows = ('n_resources', 'max'),
+            last_score = ('mean_test_score', 'last'),
+            seconds = ('seconds', 'sum')
+        )
+        .sort_values(['rounds', 'last_score'], ascending = False)
+    )
+
+
+def run_halving_search():
+
+    # --- 1. Load Data ---
+    print("Loading data...")
+    X_train, X_test, y_train, y_test = load_data()
+    folds = make_folds(y_train)
+    print(f"Data loading complete. Train rows: {len(X_train)} | CV folds: {CV_FOLDS}\n")
+
+    # --- 2. Search Setup ---
+    print("Initializing sklearn RandomForestClassifier and HalvingGridSearchCV...")
+
+    # One single-threaded forest per process; parallelism is across (candidate, fold) fits
+    model_base = RandomForestClassifier(n_jobs = 1, random_state = RANDOM_STATE)
+
+    search = HalvingGridSearchCV(
+        estimator = model_base,
+        param_grid = PARAM_GRID,
+        cv = folds,
+        factor = HALVING_FACTOR,
+        resource = 'n_samples',
+        min_resources = MIN_RESOURCES,
+        n_jobs = N_JOBS,
+        refit = True,
+        random_state = RANDOM_STATE,
+        verbose = 1
+    )
+
+    n_candidates = len(PARAM_GRID['max_depth']) * len(PARAM_GRID['n_estimators']) * len(PARAM_GRID['min_samples_leaf'])
+    print("--- Starting Successive-Halving Search on CPU ---")
+    print(f"Combinations: {n_candidates}")
+    print(f"CV Folds: {CV_FOLDS}")
+    print(f"Halving factor: {HALVING_FACTOR} | Workers: {os.cpu_count() if N_JOBS == -1 else N_JOBS}\n")
+
+    # --- 3. Model Training ---
+    started_at = time.perf_counter()
+    search.fit(X_train, y_train)
+    elapsed = time.perf_counter() - started_at
+
+    print("\n--- Search Complete ---")
+
+    best_model = search.best_estimator_
+    best_params = search.best_params_
+
+    print(f"Rounds: {search.n_iterations_} | Models fitted: {int(np.sum(search.n_candidates_)) * CV_FOLDS}")
+    print(f"Wall-clock: {elapsed:.1f}s")
+    print(f"Best parameters found: {best_params}")
+    print("------------------------------------------\n")
+
+    print("--- Wall-clock per candidate (fit + score, all folds and rounds) ---")
+    with pd.option_context('display.max_rows', None, 'display.max_columns', None, 'display.width', 200, 'display.max_colwidth', 80):
+        print(candidate_timings(search.cv_results_).round(4))
+    print("------------------------------------------\n")
+
+    # --- 4. Prediction & Evaluation ---
+    print("Predicting on test set with best model...")
+    y_pred = best_model.predict(X_test)
+
+    print("Calculating final metrics on test set...")
+    accuracy = accuracy_score(y_test, y_pred)
+    cm_list = confusion_matrix(y_test, y_pred).tolist()
+
+    metrics = {
+        "best_parameters": best_params,
+        "test_metrics": {
+            "accuracy": round(float(accuracy), 4),
+            "confusion_matrix": cm_list
+        }
+    }
+
+    # --- 5. Print & Save Artifacts ---
+    print(f"\n--- Best Model Metrics ---")
+    print(f"Accuracy: {metrics['test_metrics']['accuracy']}")
+    print(f"Confusion Matrix:\n{np.array(cm_list)}")
+    print("------------------------------------------\n")
+
+    os.makedirs(ARTIFACTS_DIR, exist_ok = True)
+
+    print(f"Saving best model artifact to {MODEL_PATH}...")
+    with open(MODEL_PATH, 'wb') as f:
+        pickle.dump(best_model, f)
+
+    print(f"Saving metrics and best params to {METRICS_PATH}...")
+    with open(METRICS_PATH, 'w') as f:
+        json.dump(metrics, f, indent=4)
+
+    print("Halving search script complete.")
+
+if __name__ == "__main__":
+    run_halving_search()
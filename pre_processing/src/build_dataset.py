@@ -1,9 +1,14 @@
+import argparse
+import json
+import os
+import shutil
 import pandas as pd
 import numpy as np
 import joblib
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
-from typing import Tuple, List, Any
+from datetime import datetime, timezone
+from typing import Tuple, List, Any, Dict, Iterator
 
 # --- Config ---
 RAW_DATA_PATH = '../../dataset/synthetic_shipping_data.csv'
@@ -16,6 +21,16 @@ ARTIFACTS_PATH = '../data/artifacts/'
 TEST_SIZE = 0.2
 RANDOM_STATE = 42
 
+# Streaming mode (--streaming)
+CHUNK_SIZE = 1_000_000
+FEATURE_COLS = ['package_weight_gr', 'package_size']
+TARGET_COL = 'product_type'
+
+# Reference profile for the API drift monitor (src/services/drift_monitor.py)
+PROFILE_PATH = f'{ARTIFACTS_PATH}/reference_profile.json'
+PROFILE_BINS = 20               # Equal-frequency weight bins per package_size
+PROFILE_SAMPLE_SIZE = 100_000   # Weights sampled per package_size to place the bin edges (streaming mode)
+
 
 # --- Load data ---
 def load_data(path: str) -> pd.DataFrame:
@@ -102,7 +117,244 @@ def scale_features(
     return x_train_scaled, x_test_scaled, scaler
 
 
-if __name__ == "__main__":
+# --- Reference profile ---
+def weight_edges(weights: np.ndarray, n_bins: int = PROFILE_BINS) -> np.ndarray:
+    """
+    Inner edges of n_bins equal-frequency weight bins. The first and last
+    bins are open-ended, so live weights outside the training range still
+    land in a bin.
+    """
+    return np.unique(np.quantile(weights, np.linspace(0, 1, n_bins + 1)[1:-1]))
+
+
+def bin_counts(weights: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Weights per bin. A weight equal to an edge goes to the bin above it
+    (bisect_right), as in the drift monitor.
+    """
+    return np.bincount(np.searchsorted(edges, weights, side = 'right'), minlength = len(edges) + 1)
+
+
+def save_reference_profile(
+    path: str, edges: Dict[str, np.ndarray], weight_counts: Dict[str, np.ndarray],
+    class_counts: Dict[str, Dict[str, int]]
+):
+    """
+    Saves the training distribution per package_size: weight bin edges and
+    fractions, and product_type fractions. Raw weights (before any scaling),
+    as the API receives them.
+    """
+    sizes = {}
+    for size in sorted(edges):
+        n = int(weight_counts[size].sum())
+        sizes[size] = {
+            "count": n,
+            "weight_edges": edges[size].tolist(),
+            "weight_fractions": (weight_counts[size] / n).tolist(),
+            "class_fractions": {label: count / n for label, count in sorted(class_counts[size].items())}
+        }
+
+    profile = {"created_at": datetime.now(timezone.utc).isoformat(), "sizes": sizes}
+    with open(path, 'w') as f:
+        json.dump(profile, f, indent = 2)
+
+
+# --- Streaming (out-of-core) mode ---
+def iter_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Reads a CSV file, Parquet file or Parquet directory in chunks
+    of at most chunk_size rows.
+    """
+    columns = ['id'] + FEATURE_COLS + [TARGET_COL]
+    if path.endswith('.parquet') or os.path.isdir(path):
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(path, format = 'parquet')
+        columns = [c for c in columns if c in dataset.schema.names]
+        for batch in dataset.to_batches(columns = columns, batch_size = chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize = chunk_size, usecols = lambda c: c in columns)
+
+
+def splitmix64(keys: np.ndarray, seed: int) -> np.ndarray:
+    """
+    Seeded splitmix64 hash of per-row keys.
+    """
+    # Seed offset wrapped in Python: a NumPy scalar multiply warns on overflow
+    # (array arithmetic below wraps silently, as splitmix64 expects)
+    z = keys.astype(np.uint64) + np.uint64((seed * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def is_test_row(keys: np.ndarray, seed: int = RANDOM_STATE) -> np.ndarray:
+    """
+    Deterministic train/test assignment from a per-row key (splitmix64 hash).
+    The same row always lands in the same split, whatever the chunking,
+    so no global shuffle is needed.
+    """
+    return (splitmix64(keys, seed) % np.uint64(1_000_000)) < np.uint64(int(TEST_SIZE * 1_000_000))
+
+
+def split_keys(chunk: pd.DataFrame, offset: int) -> np.ndarray:
+    """
+    Row keys for is_test_row(): the 'id' column when present,
+    else the row position in the input file.
+    """
+    if 'id' in chunk.columns:
+        return chunk['id'].to_numpy()
+    return np.arange(offset, offset + len(chunk), dtype = np.int64)
+
+
+def learn_vocabularies(
+    path: str, chunk_size: int
+) -> Tuple[LabelEncoder, LabelEncoder, Dict[str, np.ndarray]]:
+    """
+    Pass 1: learns both encoder vocabularies from the training rows,
+    one chunk at a time.
+    Also keeps a uniform sample of at most PROFILE_SAMPLE_SIZE weights per
+    package_size (the rows with the smallest hash), for the profile bin edges.
+    """
+    sizes, types = set(), set()
+    samples: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    offset = 0
+
+    for chunk in iter_chunks(path, chunk_size):
+        keys = split_keys(chunk, offset)
+        train_mask = ~is_test_row(keys)
+        train = chunk[train_mask]
+        offset += len(chunk)
+
+        sizes.update(train['package_size'].astype(str).unique())
+        types.update(train[TARGET_COL].astype(str).unique())
+
+        hashes = splitmix64(keys[train_mask], RANDOM_STATE + 1)
+        weights = train['package_weight_gr'].to_numpy(dtype = np.float64)
+        train_sizes = train['package_size'].astype(str).to_numpy()
+        for size in np.unique(train_sizes):
+            mask = train_sizes == size
+            kept_hashes, kept_weights = samples.get(size, (hashes[:0], weights[:0]))
+            kept_hashes = np.concatenate([kept_hashes, hashes[mask]])
+            kept_weights = np.concatenate([kept_weights, weights[mask]])
+            if len(kept_hashes) > PROFILE_SAMPLE_SIZE:
+                keep = np.argpartition(kept_hashes, PROFILE_SAMPLE_SIZE)[:PROFILE_SAMPLE_SIZE]
+                kept_hashes, kept_weights = kept_hashes[keep], kept_weights[keep]
+            samples[size] = (kept_hashes, kept_weights)
+
+    # Same classes_ (sorted, object dtype) as fitting on the full column
+    label_package_size = LabelEncoder().fit(np.array(sorted(sizes), dtype = object))
+    label_product_type = LabelEncoder().fit(np.array(sorted(types), dtype = object))
+    weight_samples = {size: kept_weights for size, (_, kept_weights) in samples.items()}
+    return label_package_size, label_product_type, weight_samples
+
+
+def encode_chunk(
+    chunk: pd.DataFrame, size_codes: Dict[str, int], type_codes: Dict[str, int]
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Encodes one chunk with compact dtypes (int8 codes, float32 weights).
+
+    Raises:
+        ValueError: If a size or product type is missing from the vocabulary,
+            like LabelEncoder.transform would.
+    """
+    size_encoded = chunk['package_size'].astype(str).map(size_codes)
+    type_encoded = chunk[TARGET_COL].astype(str).map(type_codes)
+    if size_encoded.isna().any() or type_encoded.isna().any():
+        raise ValueError("Found labels that are not in the training vocabulary.")
+
+    x = pd.DataFrame({
+        'package_weight_gr': chunk['package_weight_gr'].to_numpy(dtype = np.float32),
+        'package_size': size_encoded.to_numpy(dtype = np.int8)
+    })
+    y = pd.DataFrame({TARGET_COL: type_encoded.to_numpy(dtype = np.int8)})
+    return x, y
+
+
+def remove_output(path: str):
+    """
+    Removes a previous output, either a single Parquet file
+    (in-memory mode) or a directory of partitions (streaming mode).
+    """
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def build_streaming(input_path: str, chunk_size: int):
+    """
+    Out-of-core version of the in-memory pipeline. Memory is bounded by
+    chunk_size. X_*/y_* paths become directories of Parquet partitions,
+    which pandas, pyarrow and cuDF read like single files.
+    """
+    print(f"--- 1. Learning vocabularies (chunks of {chunk_size} rows) ---")
+    package_size_encoder, product_type_encoder, weight_samples = learn_vocabularies(input_path, chunk_size)
+    print(f"package_size: {list(package_size_encoder.classes_)}")
+    print(f"product_type: {list(product_type_encoder.classes_)}")
+
+    for encoder in (package_size_encoder, product_type_encoder):
+        if len(encoder.classes_) > np.iinfo(np.int8).max:
+            raise ValueError("Too many categories for int8 codes.")
+
+    print("--- 2. Saving Artifacts ---")
+    joblib.dump(package_size_encoder, f'{ARTIFACTS_PATH}/package_size_encoder.pkl')
+    joblib.dump(product_type_encoder, f'{ARTIFACTS_PATH}/product_type_encoder.pkl')
+
+    print("--- 3. Encoding and writing partitions ---")
+    output_paths = {
+        'X_train': X_TRAIN_PATH, 'X_test': X_TEST_PATH,
+        'y_train': Y_TRAIN_PATH, 'y_test': Y_TEST_PATH
+    }
+    for path in output_paths.values():
+        remove_output(path)
+        os.makedirs(path)
+
+    size_codes = {label: code for code, label in enumerate(package_size_encoder.classes_)}
+    type_codes = {label: code for code, label in enumerate(product_type_encoder.classes_)}
+    counts = {'train': 0, 'test': 0}
+    offset = 0
+
+    # Reference profile, counted over every training row
+    edges = {size: weight_edges(sample) for size, sample in weight_samples.items()}
+    weight_counts = {size: np.zeros(len(size_edges) + 1, dtype = np.int64) for size, size_edges in edges.items()}
+    class_counts: Dict[str, Dict[str, int]] = {size: {} for size in edges}
+
+    for index, chunk in enumerate(iter_chunks(input_path, chunk_size)):
+        test_mask = is_test_row(split_keys(chunk, offset))
+        offset += len(chunk)
+
+        train = chunk[~test_mask]
+        train_sizes = train['package_size'].astype(str)
+        for size, group in train.groupby(train_sizes):
+            weight_counts[size] += bin_counts(group['package_weight_gr'].to_numpy(dtype = np.float64), edges[size])
+            for label, count in group[TARGET_COL].astype(str).value_counts().items():
+                class_counts[size][label] = class_counts[size].get(label, 0) + int(count)
+
+        x, y = encode_chunk(chunk, size_codes, type_codes)
+        for split, mask in (('train', ~test_mask), ('test', test_mask)):
+            if not mask.any():
+                continue
+            part = f'part-{index:05d}.parquet'
+            x[mask].to_parquet(os.path.join(output_paths[f'X_{split}'], part), index = False)
+            y[mask].to_parquet(os.path.join(output_paths[f'y_{split}'], part), index = False)
+            counts[split] += int(mask.sum())
+
+        print(f"  chunk {index}: {len(chunk)} rows | train {counts['train']} | test {counts['test']}")
+
+    save_reference_profile(PROFILE_PATH, edges, weight_counts, class_counts)
+    print(f"Reference profile saved to {PROFILE_PATH}")
+
+    print("\nPre-processing complete.")
+    print(f"Train rows: {counts['train']} | Test rows: {counts['test']}")
+
+
+def build_in_memory():
+    """
+    The original pipeline: whole CSV in memory, random train_test_split.
+    """
 
     print("--- 1. Loading Data ---")
     
@@ -136,7 +388,17 @@ if __name__ == "__main__":
     joblib.dump(product_type_encoder, f'{ARTIFACTS_PATH}/product_type_encoder.pkl')
     # joblib.dump(weight_scaler, f'{ARTIFACTS_PATH}/weight_scaler.pkl')
 
+    edges, weight_counts, class_counts = {}, {}, {}
+    for size, group in X_train.groupby('package_size'):
+        weights = group['package_weight_gr'].to_numpy(dtype = np.float64)
+        edges[size] = weight_edges(weights)
+        weight_counts[size] = bin_counts(weights, edges[size])
+        class_counts[size] = {label: int(count) for label, count in y_train.loc[group.index].value_counts().items()}
+    save_reference_profile(PROFILE_PATH, edges, weight_counts, class_counts)
+
     print("--- 6. Saving Data ---")
+    for path in (X_TRAIN_PATH, X_TEST_PATH, Y_TRAIN_PATH, Y_TEST_PATH):
+        remove_output(path)
     x_train_encoded.to_parquet(X_TRAIN_PATH, index = False)
     x_test_encoded.to_parquet(X_TEST_PATH, index = False)
 
@@ -147,4 +409,18 @@ if __name__ == "__main__":
 
     print("\nPre-processing complete.")
     print("Final training data ready:")
-    
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description = "Builds the encoded train/test splits and the encoder artifacts.")
+    parser.add_argument("--streaming", action = "store_true",
+                        help = "Out-of-core mode: chunked passes, hash-based split, partitioned Parquet output.")
+    parser.add_argument("--input", default = RAW_DATA_PATH, help = "CSV file, Parquet file or Parquet directory (streaming mode).")
+    parser.add_argument("--chunk-size", type = int, default = CHUNK_SIZE, help = "Rows per chunk (streaming mode).")
+    args = parser.parse_args()
+
+    if args.streaming:
+        build_streaming(args.input, args.chunk_size)
+    else:
+        build_in_memory()
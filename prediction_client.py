@@ -0,0 +1,277 @@
+import argparse
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# --- Configuration ---
+DEFAULT_BASE_URL = "http://localhost:5000"
+API_PREFIX = "/vinicius_rubens/api"
+# Time left in ms: lets the server drop the request instead of answering after we gave up
+TIMEOUT_HEADER = "X-Request-Timeout-Ms"
+# --------------------
+
+
+class PredictionAPIError(Exception):
+    """
+    The API answered with an error status, after any retries.
+    """
+    def __init__(self, status_code: int, body: Any):
+        self.status_code = status_code
+        self.body = body
+        super().__init__(f"HTTP {status_code}: {body}")
+
+
+class PredictionClient:
+    """
+    Programmatic client for the prediction API.
+
+    - One pooled keep-alive session: connections are reused across calls
+      and threads instead of opening one TCP connection per prediction.
+    - predict_many() scores any number of items concurrently from a thread
+      pool, grouped into /predict/batch calls (or one /predict call each).
+    - Overload answers (429, 503), connection errors and timed-out attempts
+      are retried with full-jitter exponential backoff. A Retry-After header
+      sets the wait, capped at backoff_max_s.
+    - Every attempt has a timeout, also sent as the request's time budget so
+      the server sheds work whose answer would arrive too late.
+    - The latency of every call is kept for latency_stats().
+    """
+
+    RETRY_STATUSES = (429, 503)
+
+    def __init__(
+        self, base_url: str = DEFAULT_BASE_URL, pool_size: int = 16, timeout_s: float = 10.0,
+        max_retries: int = 3, backoff_base_s: float = 0.05, backoff_max_s: float = 2.0,
+        batch_size: int = 1000, latency_window: int = 100000
+    ):
+        """
+        Args:
+            base_url (str): Server address, without the API prefix.
+            pool_size (int): Keep-alive connections kept open, and predict_many() threads.
+            timeout_s (float): Default per-attempt timeout.
+            max_retries (int): Retries after the first attempt.
+            backoff_base_s (float): Backoff ceiling of the first retry; doubles on each retry.
+            backoff_max_s (float): Maximum backoff ceiling, and maximum wait a Retry-After header can ask for.
+            batch_size (int): Items per /predict/batch call (at most the server's MAX_BATCH_SIZE).
+            latency_window (int): Latest call latencies kept for latency_stats().
+        """
+        self.base_url = base_url.rstrip('/') + API_PREFIX
+        self.pool_size = pool_size
+        self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.batch_size = batch_size
+
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._retries = 0
+        self._errors = 0
+
+    # --- Lifecycle ---
+    def close(self):
+        self.session.close()
+
+    def __enter__(self) -> "PredictionClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Transport ---
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """
+        Seconds to wait before retry number attempt (0-based).
+        """
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after is not None:
+            try:
+                # Spread the clients that were told the same Retry-After. A
+                # proxy may ask for minutes or hours: never wait past the cap
+                wait = float(retry_after) + random.uniform(0, self.backoff_base_s)
+                if wait >= 0:
+                    return min(wait, self.backoff_max_s)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max_s, self.backoff_base_s * 2 ** attempt))
+
+    def _post(self, path: str, timeout_s: Optional[float], **kwargs) -> requests.Response:
+        """
+        POSTs with retries. Returns the successful response.
+
+        Raises:
+            PredictionAPIError: On an error status that is not retried, or after the last retry.
+            requests.exceptions.RequestException: On a connection error or timeout after the last retry.
+        """
+        timeout_s = timeout_s or self.timeout_s
+        headers = dict(kwargs.pop('headers', None) or {})
+
+        attempt = 0
+        while True:
+            headers[TIMEOUT_HEADER] = str(int(timeout_s * 1000))
+            started_at = time.perf_counter()
+            response = None
+            try:
+                response = self.session.post(self.base_url + path, timeout=timeout_s, headers=headers, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                # Timeouts are per attempt: a timed-out attempt is retried like a lost connection
+                if attempt == self.max_retries:
+                    self._count_error()
+                    raise
+            else:
+                if response.status_code < 400:
+                    with self._lock:
+                        self._latencies.append(time.perf_counter() - started_at)
+                    return response
+                if response.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                    self._count_error()
+                    raise PredictionAPIError(response.status_code, self._error_body(response))
+
+            with self._lock:
+                self._retries += 1
+            time.sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    @staticmethod
+    def _error_body(response: requests.Response) -> Any:
+        try:
+            return response.json()
+        except ValueError:
+            return response.text
+
+    def _count_error(self):
+        with self._lock:
+            self._errors += 1
+
+    # --- API ---
+    def predict(self, package_weight: Any, package_size: str, echo: bool = True, timeout_s: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Scores one package with /predict. Returns the response JSON.
+        """
+        payload = {"package_weight_gr": package_weight, "package_size": package_size}
+        return self._post(f"/predict?echo={str(echo).lower()}", timeout_s, json=payload).json()
+
+    def predict_batch(self, items: Sequence[Tuple[Any, str]], echo: bool = True, timeout_s: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Scores up to batch_size (weight, size) items with one /predict/batch call. Returns the response JSON.
+        """
+        payload = [{"package_weight_gr": weight, "package_size": size} for weight, size in items]
+        return self._post(f"/predict/batch?echo={str(echo).lower()}", timeout_s, json=payload).json()
+
+    def predict_columnar(self, package_weights: Sequence[float], package_sizes: Sequence[str], timeout_s: Optional[float] = None) -> Tuple[List[Optional[str]], str]:
+        """
+        Scores a block of readings through the binary columnar route.
+
+        Returns:
+            Tuple: (one label per reading, None where the reading was rejected; model version).
+        """
+        from src.models import columnar
+
+        response = self._post(
+            "/predict/columnar", timeout_s, data=columnar.encode_request(package_weights, package_sizes),
+            headers={"Content-Type": columnar.CONTENT_TYPE}
+        )
+        return columnar.decode_labels(response.content)
+
+    def predict_many(
+        self, items: Sequence[Tuple[Any, str]], batched: bool = True, echo: bool = False,
+        timeout_s: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Scores any number of (weight, size) items concurrently on pool_size threads.
+
+        With batched, items are grouped into /predict/batch calls of batch_size;
+        otherwise each item is one /predict call.
+
+        Returns:
+            List[Dict[str, Any]]: One result per item, in input order, with its 'index'.
+                Items the API rejected carry 'error' (and 'details') instead of a prediction.
+        """
+        if batched:
+            chunks = [(start, items[start:start + self.batch_size]) for start in range(0, len(items), self.batch_size)]
+
+            def send_chunk(chunk: Tuple[int, Sequence[Tuple[Any, str]]]) -> List[Dict[str, Any]]:
+                start, chunk_items = chunk
+                results = self.predict_batch(chunk_items, echo=echo, timeout_s=timeout_s)["results"]
+                return [{**result, "index": start + result["index"]} for result in results]
+
+            return [result for results in self._map(send_chunk, chunks) for result in results]
+
+        def send_one(indexed: Tuple[int, Tuple[Any, str]]) -> Dict[str, Any]:
+            i, (weight, size) = indexed
+            try:
+                return {"index": i, **self.predict(weight, size, echo=echo, timeout_s=timeout_s)}
+            except PredictionAPIError as e:
+                if e.status_code >= 500 or not isinstance(e.body, dict):
+                    raise
+                return {"index": i, **e.body}
+
+        return self._map(send_one, list(enumerate(items)))
+
+    def _map(self, fn: Callable, args: list) -> list:
+        if len(args) <= 1:
+            return [fn(a) for a in args]
+        with ThreadPoolExecutor(max_workers=min(self.pool_size, len(args))) as executor:
+            return list(executor.map(fn, args))
+
+    # --- Stats ---
+    def latency_stats(self) -> Dict[str, Any]:
+        """
+        Client-side latency percentiles of the successful calls, in ms
+        (time of the attempt that succeeded; backoff waits not included).
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            retries, errors = self._retries, self._errors
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000, 3)
+
+        return {
+            "calls": len(latencies),
+            "retries": retries,
+            "errors": errors,
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "max_ms": round(latencies[-1] * 1000, 3) if latencies else None
+        }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Scores synthetic packages with the client and reports client-side latency.")
+    parser.add_argument("--url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--pool-size", type=int, default=16, help="Connections and concurrent calls.")
+    parser.add_argument("--batch-size", type=int, default=100, help="Items per batch call.")
+    parser.add_argument("--unbatched", action="store_true", help="One /predict call per item.")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    items = [
+        (max(round(rng.gauss(220, 55), 2), 1.0), "Small Package") if rng.random() < 0.5
+        else (max(round(rng.gauss(550, 137), 2), 1.0), "Large Package")
+        for _ in range(args.items)
+    ]
+
+    with PredictionClient(args.url, pool_size=args.pool_size, batch_size=args.batch_size) as client:
+        started_at = time.perf_counter()
+        results = client.predict_many(items, batched=not args.unbatched)
+        elapsed = time.perf_counter() - started_at
+
+        n_errors = sum("error" in result for result in results)
+        print(f"Items: {len(results)} in {elapsed:.2f}s ({len(results) / elapsed:.0f} items/s) | Item errors: {n_errors}")
+        print(f"Client latency per call: {client.latency_stats()}")
@@ -0,0 +1,8 @@
+from src.asgi import create_asgi_app
+
+# Creates the ASGI instance (served by uvicorn, or gunicorn with uvicorn workers)
+app = create_asgi_app()
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5000)
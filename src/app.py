@@ -1,5 +1,17 @@
-from flask import Flask, jsonify
+import os
+import time
+from flask import Flask, Response, g, jsonify
+from src.config import settings
 from src.routes.predict_routes import predict_bp
+from src.routes.admin_routes import admin_bp
+from src.services.prediction_service import prediction_service
+from src.services.micro_batcher import micro_batcher
+from src.services.model_watcher import model_watcher
+from src.services.metrics import metrics
+from src.services.admission import admission_controller
+from src.services.audit_log import audit_logger
+from src.services.drift_monitor import drift_monitor
+from src.services.shadow_scorer import shadow_scorer
 
 def create_app():
     """
@@ -7,13 +19,115 @@ def create_app():
     Creates and configures the Flask application.
     """
     app = Flask(__name__)
+    app.config['MAX_CONTENT_LENGTH'] = settings.MAX_CONTENT_LENGTH
     app.register_blueprint(predict_bp)
+    app.register_blueprint(admin_bp)
+
+    # Off in a preloaded gunicorn master: a reload running there while it
+    # forks would leave the children a copy of the held reload lock
+    if model_watcher is not None and settings.MODEL_WATCH_AUTOSTART:
+        model_watcher.start()
+
+    # Runs once per worker, before it accepts traffic
+    if prediction_service is not None:
+        prediction_service.warm_up(settings.WARMUP_GRID_POINTS, settings.WARMUP_MAX_WEIGHT_GR)
+
+    @app.before_request
+    def start_timer():
+        g.request_started_at = time.perf_counter()
+        if model_watcher is not None:
+            # No-op unless this worker's watcher is not running yet
+            model_watcher.start()
+
+    @app.after_request
+    def record_request(response):
+        """
+        Counts every response by status code and times the whole request.
+        """
+        if metrics is not None:
+            metrics.count_status(response.status_code)
+            if 'request_started_at' in g:
+                metrics.observe('request', time.perf_counter() - g.request_started_at)
+        return response
+
+    @app.errorhandler(413)
+    def request_too_large(e):
+        """
+        Returns a JSON error when the request body exceeds MAX_CONTENT_LENGTH.
+        """
+        return jsonify({"error": f"Request body too large. Maximum is {settings.MAX_CONTENT_LENGTH} bytes."}), 413
 
     @app.route('/health')
     def health():
         """
-        A simple health check endpoint.
+        Liveness check: the process answers. Use /ready to know whether
+        it can serve predictions.
+        Also reports the served model version, and the prediction cache
+        micro-batching, audit log and shadow scorer counters when enabled,
+        and the admission counters.
+        """
+        response = {"status": "up", "service": "ML Prediction API"}
+        if prediction_service is not None:
+            response["model_version"] = prediction_service.model_version
+        if prediction_service is not None and prediction_service.cache is not None:
+            response["prediction_cache"] = prediction_service.cache.stats()
+        if micro_batcher is not None:
+            response["micro_batching"] = micro_batcher.stats()
+        response["admission"] = admission_controller.stats()
+        if audit_logger is not None:
+            response["audit_log"] = audit_logger.stats()
+        if shadow_scorer is not None:
+            response["shadow"] = shadow_scorer.stats()
+        return jsonify(response)
+
+    @app.route('/ready')
+    def ready():
+        """
+        Readiness check: 200 once this worker loaded the artifacts and its
+        warm-up succeeded, 503 otherwise. Reports the warm-up and the
+        loaded artifact versions.
+        """
+        if prediction_service is None:
+            return jsonify({"status": "not ready", "error": "PredictionService failed to initialize. Check server logs."}), 503
+
+        artifacts = prediction_service.artifacts
+        response = {
+            "status": "ready" if prediction_service.ready else "not ready",
+            "worker_pid": os.getpid(),
+            "warm_up": prediction_service.warm_up_status,
+            "model_version": artifacts.version,
+            "artifact_versions": artifacts.file_versions
+        }
+        return jsonify(response), 200 if prediction_service.ready else 503
+
+    @app.route('/drift')
+    def drift():
+        """
+        Input-drift scores per package_size against the training profile,
+        merged over all gunicorn workers when METRICS_DIR is set.
+        """
+        if drift_monitor is None:
+            return jsonify({"error": "Drift monitoring is disabled."}), 404
+        return jsonify(drift_monitor.scores())
+
+    @app.route('/shadow')
+    def shadow():
+        """
+        Agreement and per-class confusion counts of the shadow model against
+        the served one, merged over all gunicorn workers when METRICS_DIR is set.
+        """
+        if shadow_scorer is None:
+            return jsonify({"error": "Shadow scoring is disabled."}), 404
+        return jsonify(shadow_scorer.report())
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """
+        Latency histograms and request counts in Prometheus text format,
+        aggregated over all gunicorn workers when METRICS_DIR is set.
         """
-        return jsonify({"status": "up", "service": "ML Prediction API"})
+        if metrics is None:
+            return jsonify({"error": "Metrics are disabled."}), 404
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
     return app
\ No newline at end of file
@@ -0,0 +1,463 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from a2wsgi import WSGIMiddleware
+from pydantic import ValidationError
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+from src.app import create_app
+from src.config import settings
+from src.controllers.predict_controller import PredictionController, prediction_controller
+from src.models import columnar
+from src.models.fast_io import echo_requested, encode_batch, encode_prediction, validate_batch_items, validate_request
+from src.services.admission import Rejection, default_max_in_flight
+from src.services.audit_log import audit_record
+from src.services import process_inference
+from src.services.model_watcher import model_watcher
+
+API_PREFIX = '/vinicius_rubens/api'
+
+
+def _json_response(data: Dict[str, Any], status_code: int, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    JSON response laid out like Flask's jsonify (sorted keys, compact, trailing newline).
+    """
+    body = json.dumps(data, sort_keys=True, separators=(',', ':')) + "\n"
+    return Response(body, status_code=status_code, media_type='application/json', headers=headers)
+
+
+class AsyncPredictionHandlers:
+    """
+    asyncio handlers for the prediction routes.
+
+    They share the PredictionController's collaborators (service,
+    micro-batcher, admission control, audit log, drift monitor, shadow scorer) and its
+    validation and serialization helpers, so requests and responses match
+    the Flask routes. Parsing and framing run on the event loop; the model
+    calls run on a bounded executor, or are awaited on the micro-batcher's
+    futures without holding a thread.
+    """
+
+    def __init__(self, controller: PredictionController, executor_kind: str, max_workers: int, max_pending: int):
+        """
+        Args:
+            controller (PredictionController): Controller whose collaborators are reused.
+            executor_kind (str): 'thread' or 'process'.
+            max_workers (int): Executor size.
+            max_pending (int): Inference calls queued or running at once; more wait their turn.
+
+        Raises:
+            ValueError: If executor_kind is unknown.
+        """
+        if executor_kind not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor '{executor_kind}'. Expected 'thread' or 'process'.")
+        self.controller = controller
+        self.executor_kind = executor_kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.executor: Optional[Executor] = None
+        self._executor_version: Optional[str] = None
+        self._pending: Optional[asyncio.Semaphore] = None
+
+    # --- Lifecycle ---
+    def start(self):
+        """
+        Creates the executor. Called on startup, in the serving process.
+        """
+        if self.executor_kind == 'process' and self.controller.service is not None:
+            self.executor = self._new_process_pool()
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._pending = asyncio.Semaphore(self.max_pending)
+
+    def stop(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+    def _new_process_pool(self) -> ProcessPoolExecutor:
+        """
+        Process pool whose workers load the artifact set served right now.
+
+        Workers start from a clean forkserver process, not by forking this
+        one: its background threads (model watcher, micro-batcher, audit
+        log, shadow scorer) could hold a lock at fork time that the child
+        would then wait on forever.
+        """
+        artifacts = self.controller.service.artifacts
+        self._executor_version = artifacts.version
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=multiprocessing.get_context("forkserver"),
+            initializer=process_inference.init_worker, initargs=(dict(artifacts.paths), artifacts.version)
+        )
+
+    def _current_executor(self) -> Executor:
+        """
+        Executor for the next call. A process pool is replaced once the
+        service serves another version after a hot reload; calls already
+        sent to the old pool finish there.
+        """
+        if self.executor_kind == 'process' and self._executor_version is not None:
+            version = self.controller.service.model_version
+            if version != self._executor_version:
+                print(f"[ASGI_INFO] Model reloaded: {self._executor_version} -> {version}. Restarting the inference processes.")
+                previous, self.executor = self.executor, self._new_process_pool()
+                previous.shutdown(wait=False)
+        return self.executor
+
+    # --- Helpers ---
+    async def _call(self, on_thread: bool, fn, args: tuple, timeout: Optional[float] = None):
+        """
+        Runs fn on the executor (or the default thread pool), with at most
+        max_pending calls queued or running.
+
+        A call cannot be interrupted once it is submitted, so its slot is
+        released when the call finishes, not when the caller stops waiting
+        (timeout or client gone). The timeout covers the wait for a slot.
+
+        Raises:
+            asyncio.TimeoutError: If the result is not there within timeout seconds.
+        """
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        await self._acquire_slot(timeout)
+        try:
+            future = loop.run_in_executor(None if on_thread else self._current_executor(), fn, *args)
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(self._release_slot)
+
+        remaining = None if timeout is None else max(timeout - (loop.time() - started_at), 0.0)
+        return await asyncio.wait_for(asyncio.shield(future), remaining)
+
+    async def _acquire_slot(self, timeout: Optional[float]):
+        """
+        Takes a max_pending slot, waiting at most timeout seconds.
+        A slot granted just as the wait is abandoned is given back.
+        """
+        acquire = asyncio.ensure_future(self._pending.acquire())
+        try:
+            await asyncio.wait_for(asyncio.shield(acquire), timeout)
+        except BaseException:
+            acquire.cancel()
+            acquire.add_done_callback(lambda task: task.cancelled() or self._pending.release())
+            raise
+
+    def _release_slot(self, future: "asyncio.Future"):
+        self._pending.release()
+        if not future.cancelled():
+            # Marks an error as seen when the caller had already given up
+            future.exception()
+
+    async def _run(self, fn, *args, timeout: Optional[float] = None):
+        return await self._call(False, fn, args, timeout)
+
+    async def _predict_one(self, package_weight: float, package_size: str, timeout: Optional[float]) -> Tuple[str, str]:
+        service = self.controller.service
+        if self.controller.batcher is not None:
+            # Shielded: cancelling the batcher's Future would break the flush that resolves it
+            future = asyncio.wrap_future(self.controller.batcher.submit(package_weight, package_size))
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        fn = process_inference.predict_versioned if self._executor_version is not None else service.predict_versioned
+        return await self._run(fn, package_weight, package_size, timeout=timeout)
+
+    async def _predict_batch(self, package_weights: List[float], package_sizes: List[str]) -> Tuple[List[Optional[str]], str]:
+        fn = process_inference.predict_batch_versioned if self._executor_version is not None else self.controller.service.predict_batch_versioned
+        return await self._run(fn, package_weights, package_sizes)
+
+    def _observe(self, stage: str, started_at: float) -> float:
+        now = time.perf_counter()
+        if self.controller.metrics is not None:
+            self.controller.metrics.observe(stage, now - started_at)
+        return now
+
+    def _shed_response(self, rejection: Rejection) -> Response:
+        headers = {'Retry-After': str(rejection.retry_after_s)} if rejection.retry_after_s is not None else None
+        return _json_response({"error": PredictionController.SHED_MESSAGES[rejection.reason]}, rejection.status_code, headers)
+
+    @staticmethod
+    async def _read_body(request: Request, max_bytes: int) -> Optional[bytes]:
+        """
+        Reads the request body, or returns None as soon as it is known to
+        exceed max_bytes: from Content-Length before reading anything, else
+        while it streams in. Never buffers more than max_bytes.
+        """
+        content_length = request.headers.get('content-length', '')
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            return None
+
+        chunks = []
+        received = 0
+        async for data in request.stream():
+            received += len(data)
+            if received > max_bytes:
+                return None
+            chunks.append(data)
+        return b''.join(chunks)
+
+    async def _read_json(self, request: Request) -> Tuple[Any, Optional[Response]]:
+        """
+        Parses a JSON body. Returns (data, None) or (None, error response).
+        """
+        if request.headers.get('content-type', '').split(';')[0].strip() != 'application/json':
+            return None, _json_response({"error": "Unsupported Media Type. Expected 'application/json'."}, 415)
+        body = await self._read_body(request, settings.MAX_CONTENT_LENGTH)
+        if body is None:
+            return None, _json_response({"error": f"Request body too large. Maximum is {settings.MAX_CONTENT_LENGTH} bytes."}, 413)
+        try:
+            return json.loads(body), None
+        except ValueError:
+            return None, _json_response({"error": "Invalid request. Malformed JSON."}, 400)
+
+    def _count(self, response: Response, started_at: float) -> Response:
+        """
+        Status and whole-request metrics, like the Flask after_request hook.
+        """
+        metrics = self.controller.metrics
+        if metrics is not None:
+            metrics.count_status(response.status_code)
+            metrics.observe('request', time.perf_counter() - started_at)
+        return response
+
+    # --- Routes ---
+    async def predict(self, request: Request) -> Response:
+        """
+        POST /predict. Same admission control, validation and response as the Flask route.
+        """
+        request_started_at = time.perf_counter()
+        controller = self.controller
+        if not controller.service:
+            return self._count(_json_response({"error": "Service is not available. Check server logs."}, 503), request_started_at)
+
+        deadline = None
+        if controller.admission is not None:
+            try:
+                deadline = controller.admission.parse_deadline(
+                    request.headers.get(settings.REQUEST_TIMEOUT_HEADER), request.headers.get(settings.REQUEST_DEADLINE_HEADER)
+                )
+            except ValueError as e:
+                return self._count(_json_response({"error": f"Bad Request: {e}"}, 400), request_started_at)
+            rejection = controller.admission.admit(deadline)
+            if rejection is not None:
+                return self._count(self._shed_response(rejection), request_started_at)
+
+        try:
+            response = await self._predict(request, deadline)
+        finally:
+            if controller.admission is not None:
+                controller.admission.release(time.perf_counter() - request_started_at)
+        return self._count(response, request_started_at)
+
+    async def _predict(self, request: Request, deadline: Optional[float]) -> Response:
+        controller = self.controller
+        started_at = time.perf_counter()
+
+        raw_data, error = await self._read_json(request)
+        if error is not None:
+            return error
+        started_at = self._observe('json_parse', started_at)
+        if not raw_data:
+            return _json_response({"error": "Invalid request. No JSON data received."}, 400)
+        if not isinstance(raw_data, dict):
+            return _json_response({"error": "Invalid request. Expected a JSON object."}, 400)
+
+        try:
+            item = validate_request(raw_data)
+        except ValidationError as e:
+            return _json_response({"error": "Invalid input.", "details": e.json()}, 422)
+        started_at = self._observe('validation', started_at)
+
+        timeout = settings.MICRO_BATCH_RESULT_TIMEOUT_SECONDS if controller.batcher is not None else None
+        if deadline is not None:
+            remaining = max(deadline - time.time(), 0.0)
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        try:
+            label, model_version = await self._predict_one(item.package_weight, item.package_size, timeout)
+        except ValueError as e:
+            if controller.audit is not None:
+                controller.audit.log(audit_record('predict', item.package_weight, item.package_size, None, None, str(e)))
+            return _json_response({"error": f"Bad Request: {e}"}, 400)
+        except queue.Full:
+            if controller.admission is not None:
+                return self._shed_response(controller.admission.reject('queue_full'))
+            return _json_response({"error": "Service is overloaded. Try again later."}, 503)
+        except asyncio.TimeoutError:
+            if deadline is not None and time.time() >= deadline:
+                return _json_response({"error": "Request deadline exceeded."}, 504)
+            print("[ASGI_ERROR] Timed out waiting for a prediction.")
+            return _json_response({"error": "An internal server error occurred."}, 500)
+        except Exception as e:
+            print(f"[ASGI_ERROR] Unexpected error: {e}")
+            return _json_response({"error": "An internal server error occurred."}, 500)
+        started_at = self._observe('predict', started_at)
+        controller.record_scored('predict', [item.package_weight], [item.package_size], [label], model_version)
+
+        body = encode_prediction(item, label, model_version, echo_requested(request.query_params.get('echo')))
+        response = Response(body, media_type='application/json')
+        self._observe('serialization', started_at)
+        return response
+
+    async def predict_batch(self, request: Request) -> Response:
+        """
+        POST /predict/batch. Same validation and per-item results as the Flask route.
+        """
+        started_at = time.perf_counter()
+        return self._count(await self._predict_batch_response(request), started_at)
+
+    async def _predict_batch_response(self, request: Request) -> Response:
+        if not self.controller.service:
+            return _json_response({"error": "Service is not available. Check server logs."}, 503)
+
+        raw_data, error = await self._read_json(request)
+        if error is not None:
+            return error
+        if not raw_data:
+            return _json_response({"error": "Invalid request. No JSON data received."}, 400)
+        if not isinstance(raw_data, list):
+            return _json_response({"error": "Invalid request. Expected a JSON array of items."}, 400)
+        if len(raw_data) > settings.MAX_BATCH_SIZE:
+            return _json_response({"error": f"Batch too large. Maximum is {settings.MAX_BATCH_SIZE} items."}, 413)
+
+        items, item_errors = validate_batch_items(raw_data)
+        valid_idx = [i for i, item in enumerate(items) if item is not None]
+        package_weights = [items[i].package_weight for i in valid_idx]
+        package_sizes = [items[i].package_size for i in valid_idx]
+
+        try:
+            labels, model_version = await self._predict_batch(package_weights, package_sizes)
+        except ValueError as e:
+            return _json_response({"error": f"Bad Request: {e}"}, 400)
+        except Exception as e:
+            print(f"[ASGI_ERROR] Unexpected error: {e}")
+            return _json_response({"error": "An internal server error occurred."}, 500)
+        self.controller.record_scored('predict_batch', package_weights, package_sizes, labels, model_version)
+
+        details = {i: json.dumps(errors) for i, errors in item_errors.items()}
+        body = encode_batch(items, dict(zip(valid_idx, labels)), details, model_version, echo_requested(request.query_params.get('echo')))
+        return Response(body, media_type='application/json')
+
+    async def predict_columnar(self, request: Request) -> Response:
+        """
+        POST /predict/columnar. Same binary format and results as the Flask route.
+        """
+        started_at = time.perf_counter()
+        return self._count(await self._predict_columnar_response(request), started_at)
+
+    async def _predict_columnar_response(self, request: Request) -> Response:
+        if not self.controller.service:
+            return _json_response({"error": "Service is not available. Check server logs."}, 503)
+        if request.headers.get('content-type', '').split(';')[0].strip() != columnar.CONTENT_TYPE:
+            return _json_response({"error": f"Unsupported Media Type. Expected '{columnar.CONTENT_TYPE}'."}, 415)
+
+        body = await self._read_body(request, settings.COLUMNAR_MAX_CONTENT_LENGTH)
+        if body is None:
+            return _json_response({"error": f"Request body too large. Maximum is {settings.COLUMNAR_MAX_CONTENT_LENGTH} bytes."}, 413)
+
+        try:
+            result = await self._run_on_thread(self.controller.score_columnar, body)
+        except ValueError as e:
+            return _json_response({"error": f"Bad Request: {e}"}, 400)
+        except Exception as e:
+            print(f"[ASGI_ERROR] Unexpected error: {e}")
+            return _json_response({"error": "An internal server error occurred."}, 500)
+        return Response(result, media_type=columnar.CONTENT_TYPE)
+
+    async def predict_stream(self, request: Request) -> Response:
+        """
+        POST /predict/stream. Reads the NDJSON body as it arrives and streams
+        one result per input line, in order. Each chunk is scored on the
+        executor, so other connections keep being served meanwhile.
+        """
+        started_at = time.perf_counter()
+        if not self.controller.service:
+            return self._count(_json_response({"error": "Service is not available. Check server logs."}, 503), started_at)
+        return self._count(StreamingResponse(self._stream_results(request), media_type='application/x-ndjson'), started_at)
+
+    async def _stream_results(self, request: Request):
+        controller = self.controller
+        chunk: List[Tuple[int, Any]] = []
+        line_number = 0
+        received = 0
+        pending = b''
+
+        async for data in request.stream():
+            received += len(data)
+            if received > settings.STREAM_MAX_CONTENT_LENGTH:
+                yield json.dumps({"error": f"Stream too large. Maximum is {settings.STREAM_MAX_CONTENT_LENGTH} bytes."}) + "\n"
+                return
+
+            lines = (pending + data).split(b'\n')
+            pending = lines.pop()
+            for raw_line in lines:
+                line_number += 1
+                if not raw_line.strip():
+                    continue
+                chunk.append((line_number, controller.parse_stream_line(raw_line)))
+                if len(chunk) >= settings.STREAM_CHUNK_SIZE:
+                    yield await self._run_stream_chunk(chunk)
+                    chunk = []
+
+        if pending.strip():
+            chunk.append((line_number + 1, controller.parse_stream_line(pending)))
+        if chunk:
+            yield await self._run_stream_chunk(chunk)
+
+    async def _run_on_thread(self, fn, *args):
+        """
+        Runs fn on the default thread pool, within the max_pending bound.
+        For calls that go through the controller (audit log, drift monitor),
+        which must stay in the serving process.
+        """
+        return await self._call(True, fn, args)
+
+    async def _run_stream_chunk(self, chunk: List[Tuple[int, Any]]) -> str:
+        return await self._run_on_thread(lambda: ''.join(self.controller.score_stream_chunk(chunk)))
+
+
+def create_asgi_app() -> Starlette:
+    """
+    Creates the asyncio (ASGI) application.
+
+    The prediction routes run natively on the event loop. Every other route
+    (/health, /ready, /metrics, /drift, /shadow, /admin) is served by the Flask app
+    itself through a WSGI adapter, so both modes expose the same API.
+    """
+    flask_app = create_app()
+    if prediction_controller.admission is not None:
+        # The event loop admits far more requests than a WSGI worker has threads
+        prediction_controller.admission.max_in_flight = default_max_in_flight(asgi=True)
+    handlers = AsyncPredictionHandlers(
+        prediction_controller,
+        executor_kind = settings.ASGI_EXECUTOR,
+        max_workers = settings.ASGI_EXECUTOR_WORKERS or os.cpu_count() or 1,
+        max_pending = settings.ASGI_MAX_PENDING_INFERENCES
+    )
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Started here as well: the event loop runs in the serving process
+        if model_watcher is not None:
+            model_watcher.start()
+        handlers.start()
+        yield
+        handlers.stop()
+
+    routes = [
+        Route(f'{API_PREFIX}/predict', handlers.predict, methods=['POST']),
+        Route(f'{API_PREFIX}/predict/batch', handlers.predict_batch, methods=['POST']),
+        Route(f'{API_PREFIX}/predict/columnar', handlers.predict_columnar, methods=['POST']),
+        Route(f'{API_PREFIX}/predict/stream', handlers.predict_stream, methods=['POST']),
+        Mount('/', app=WSGIMiddleware(flask_app))
+    ]
+    return Starlette(routes=routes, lifespan=lifespan)
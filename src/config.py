@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Optional
 
 class Settings(BaseSettings):
     """
@@ -9,6 +10,94 @@ class Settings(BaseSettings):
     SIZE_ENCODER_PATH: str = "pre_processing/data/artifacts/package_size_encoder.pkl"
     TYPE_ENCODER_PATH: str = "pre_processing/data/artifacts/product_type_encoder.pkl"
 
+    # Portable forest artifact (see modelling/src/export_forest.py).
+    # When set, it is memory-mapped and served instead of MODEL_PATH.
+    FOREST_ARRAYS_PATH: Optional[str] = None
+
+    # Hot model reload
+    ADMIN_TOKEN: Optional[str] = None            # Required in X-Admin-Token by /admin/reload (unset = endpoint disabled)
+    MODEL_WATCH_INTERVAL_SECONDS: float = 0.0    # Poll the artifact files for changes (0 = off)
+    MODEL_WATCH_AUTOSTART: bool = True           # Start the watcher in create_app() (gunicorn_preload.py starts it per worker)
+    ADMIN_RELOAD_ARTIFACTS_DIR: Optional[str] = None  # Paths in the /admin/reload body must be inside it (unset = refused)
+
+    # Boot-time warm-up, gates /ready
+    WARMUP_GRID_POINTS: int = 64        # Weights scored per package_size (0 = skip)
+    WARMUP_MAX_WEIGHT_GR: float = 2000.0
+
+    # Compile the forest into a weight-threshold lookup table at startup
+    USE_COMPILED_FOREST: bool = True
+    COMPILED_FOREST_VERIFY_POINTS: int = 20000 # Grid points checked against model.predict (0 = skip)
+
+    # Prediction cache (opt-in)
+    PREDICTION_CACHE_ENABLED: bool = False
+    PREDICTION_CACHE_MAX_SIZE: int = 10000
+    PREDICTION_CACHE_TTL_SECONDS: float = 0.0 # 0 = evict by LRU only
+    WEIGHT_QUANTIZATION_DECIMALS: int = 2     # Scale readings carry two decimals
+
+    # Micro-batching of concurrent /predict calls (opt-in)
+    MICRO_BATCHING_ENABLED: bool = False
+    MICRO_BATCH_MAX_SIZE: int = 64
+    MICRO_BATCH_MAX_WAIT_US: int = 500          # Max time the oldest request waits for a flush
+    MICRO_BATCH_MAX_QUEUE_SIZE: int = 10000     # 0 = unbounded
+    MICRO_BATCH_RESULT_TIMEOUT_SECONDS: float = 5.0
+
+    # Metrics (/metrics, Prometheus text format)
+    METRICS_ENABLED: bool = True
+    METRICS_DIR: Optional[str] = None # Shared dir to aggregate across gunicorn workers
+
+    # Admission control on /predict
+    ADMISSION_MAX_IN_FLIGHT: Optional[int] = None  # Concurrent requests per worker (unset = unlimited, or
+                                                   # ASGI_MAX_PENDING_INFERENCES in ASGI mode; 0 = unlimited)
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1         # Retry-After on 429/503
+    REQUEST_TIMEOUT_HEADER: str = "X-Request-Timeout-Ms"  # Client time left in ms (preferred: no clock skew)
+    REQUEST_DEADLINE_HEADER: str = "X-Request-Deadline"   # Client deadline, Unix time in ms (fallback)
+
+    # Audit log of every scored input (opt-in)
+    AUDIT_LOG_ENABLED: bool = False
+    AUDIT_LOG_DIR: str = "audit_logs"
+    AUDIT_LOG_FORMAT: str = "jsonl"                 # 'jsonl' or 'parquet' (zstd)
+    AUDIT_LOG_MAX_QUEUE_SIZE: int = 100000
+    AUDIT_LOG_BATCH_SIZE: int = 1000                # Max records per write
+    AUDIT_LOG_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_LOG_MAX_FILE_BYTES: int = 100 * 1024 ** 2 # Rotate past this size
+    AUDIT_LOG_QUEUE_FULL_POLICY: str = "drop"       # 'drop' or 'block'
+    AUDIT_LOG_BLOCK_TIMEOUT_SECONDS: float = 0.05   # 'block' waits this long, then drops (0 = forever)
+
+    # Input-drift monitor (opt-in); counters are merged over workers through METRICS_DIR
+    DRIFT_MONITOR_ENABLED: bool = False
+    DRIFT_PROFILE_PATH: str = "pre_processing/data/artifacts/reference_profile.json"
+    DRIFT_MIN_SAMPLES: int = 500  # Live samples per package_size before drift is scored
+    DRIFT_WINDOW_SECONDS: int = 3600  # Scores the current and previous window (0 = all traffic)
+
+    # Shadow scoring of a candidate model on live traffic (opt-in)
+    SHADOW_MODEL_PATH: Optional[str] = None         # model.pkl or ForestArrays directory (unset = off)
+    SHADOW_SIZE_ENCODER_PATH: Optional[str] = None  # Defaults to SIZE_ENCODER_PATH
+    SHADOW_TYPE_ENCODER_PATH: Optional[str] = None  # Defaults to TYPE_ENCODER_PATH
+    SHADOW_WORKERS: int = 1                         # Scoring threads per server process
+    SHADOW_MAX_PENDING_ITEMS: int = 100000          # Inputs waiting for the shadow model; more are dropped
+    SHADOW_BATCH_SIZE: int = 1024                   # Max inputs per shadow model call
+    SHADOW_FLUSH_INTERVAL_SECONDS: float = 0.05     # Max time an input waits for its batch to fill
+
+    # Request limits
+    MAX_BATCH_SIZE: int = 1000            # Max items accepted by /predict/batch
+    MAX_CONTENT_LENGTH: int = 1024 * 1024 # Max request body size in bytes (1 MiB)
+
+    # Request validation and response serialization
+    FAST_IO_ENABLED: bool = True     # Native-float validation and byte-fragment responses (pydantic on fallback)
+    ECHO_INPUT_DEFAULT: bool = True  # Echo 'input_received' unless the client sends ?echo=false
+
+    # Binary columnar batches (/predict/columnar)
+    COLUMNAR_MAX_CONTENT_LENGTH: int = 64 * 1024 ** 2  # Max body size in bytes (64 MiB, ~13M readings)
+
+    # NDJSON streaming (/predict/stream)
+    STREAM_CHUNK_SIZE: int = 1000                 # Lines scored per vectorized call
+    STREAM_MAX_CONTENT_LENGTH: int = 1024 ** 3  # Max manifest size in bytes (1 GiB)
+
+    # asyncio serving mode (src/asgi.py)
+    ASGI_EXECUTOR: str = "thread"           # 'thread' or 'process' (restarted with the new version on hot reload)
+    ASGI_EXECUTOR_WORKERS: int = 0          # Inference workers per server process (0 = CPU count)
+    ASGI_MAX_PENDING_INFERENCES: int = 256  # Inference calls queued on the executor; more wait on the event loop
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,87 @@
+import hmac
+import os
+from flask import request, jsonify
+from typing import Any, Optional
+from src.config import settings
+from src.services.prediction_service import PredictionService
+
+class AdminController:
+    """
+    Handles the operational /admin endpoints.
+    Every request must carry settings.ADMIN_TOKEN in the X-Admin-Token
+    header. Without a configured token the endpoints answer 404.
+    """
+    def __init__(self, service: Optional[PredictionService]):
+        """
+        Initializes the controller with an injected prediction service.
+        """
+        self.service = service
+
+    @staticmethod
+    def _authorized() -> bool:
+        token = request.headers.get('X-Admin-Token', '')
+        return hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
+
+    @staticmethod
+    def _artifact_path(value: Any) -> str:
+        """
+        Resolves a path override from the request body.
+
+        Raises:
+            ValueError: If overrides are disabled, or the path is not a string
+                inside settings.ADMIN_RELOAD_ARTIFACTS_DIR.
+        """
+        if not settings.ADMIN_RELOAD_ARTIFACTS_DIR:
+            raise ValueError("Artifact path overrides are disabled. Set ADMIN_RELOAD_ARTIFACTS_DIR to allow them.")
+        if not isinstance(value, str):
+            raise ValueError("Artifact paths must be strings.")
+
+        root = os.path.realpath(settings.ADMIN_RELOAD_ARTIFACTS_DIR)
+        path = os.path.realpath(value)
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"Artifact paths must be inside '{settings.ADMIN_RELOAD_ARTIFACTS_DIR}'.")
+        return path
+
+    def reload(self):
+        """
+        Handles POST /admin/reload (start a hot reload) and
+        GET /admin/reload (status of the last reload).
+        
+        The optional JSON body may override 'model_path',
+        'size_encoder_path' and 'type_encoder_path'. Artifacts are
+        unpickled, so overrides are only accepted when they resolve inside
+        settings.ADMIN_RELOAD_ARTIFACTS_DIR (symlinks included).
+        The reload applies to the worker process that receives the
+        request only; with several gunicorn workers, use the file
+        watcher (MODEL_WATCH_INTERVAL_SECONDS) instead.
+        """
+        if not settings.ADMIN_TOKEN:
+            return jsonify({"error": "Not found."}), 404
+        if not self._authorized():
+            return jsonify({"error": "Unauthorized."}), 401
+        if not self.service:
+            return jsonify({"error": "Service is not available. Check server logs."}), 503
+
+        if request.method == 'GET':
+            return jsonify(self.service.reload_status()), 200
+
+        raw_data = request.get_json(silent=True) or {}
+        if not isinstance(raw_data, dict):
+            return jsonify({"error": "Invalid request. Expected a JSON object."}), 400
+
+        paths = {}
+        try:
+            for key in ('model_path', 'size_encoder_path', 'type_encoder_path'):
+                if raw_data.get(key) is not None:
+                    paths[key] = self._artifact_path(raw_data[key])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if not self.service.reload(**paths):
+            return jsonify({"error": "A reload is already in progress.", **self.service.reload_status()}), 409
+
+        return jsonify(self.service.reload_status()), 202
+
+# --- Singleton ---
+from src.services.prediction_service import prediction_service
+admin_controller = AdminController(prediction_service)
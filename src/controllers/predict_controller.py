@@ -1,8 +1,25 @@
-from flask import request, jsonify
+import json
+import queue
+import time
+import numpy as np
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from flask import Response, request, jsonify, stream_with_context
 from pydantic import ValidationError
-from typing import Optional
+from typing import Optional, Dict, List, Any, Iterator, Tuple
+from src.config import settings
 from src.services.prediction_service import PredictionService
+from src.services.micro_batcher import MicroBatcher
+from src.services.metrics import Metrics
+from src.services.admission import AdmissionController, Rejection
+from src.services.audit_log import AuditLogger, audit_record
+from src.services.drift_monitor import DriftMonitor
+from src.services.shadow_scorer import ShadowScorer
 from src.models.schemas import PredictionRequest
+from src.models.fast_io import (
+    validate_request, validate_batch_items, validate_batch_pydantic,
+    echo_requested, encode_prediction, encode_batch
+)
+from src.models import columnar
 
 class PredictionController:
     """
@@ -10,51 +27,430 @@ class PredictionController:
     It validates input using Pydantic schemas and uses the
     PredictionService to get a result.
     """
-    def __init__(self, service: Optional[PredictionService]):
+    def __init__(
+        self, service: Optional[PredictionService], batcher: Optional[MicroBatcher] = None,
+        metrics: Optional[Metrics] = None, fast_io: bool = True,
+        admission: Optional[AdmissionController] = None, audit: Optional[AuditLogger] = None,
+        drift: Optional[DriftMonitor] = None, shadow: Optional[ShadowScorer] = None
+    ):
         """
         Initializes the controller with an injected prediction service.
+        When a MicroBatcher is given, single predictions are routed through it.
+        When Metrics are given, the stages of predict() are timed.
+        When fast_io is set, inputs are validated into native floats and
+        responses are built from byte fragments (see src/models/fast_io.py).
+        When an AdmissionController is given, predict() sheds requests it rejects.
+        When an AuditLogger is given, every scored input is queued to it.
+        When a DriftMonitor is given, every scored input updates its sketches.
+        When a ShadowScorer is given, every scored input is handed off to it.
         """
         if service is None:
             print("[CONTROLLER_FATAL] PredictionService is None. The controller cannot operate.")
         self.service = service
+        self.batcher = batcher
+        self.metrics = metrics
+        self.fast_io = fast_io
+        self.admission = admission
+        self.audit = audit
+        self.drift = drift
+        self.shadow = shadow
+
+    def record_scored(
+        self, endpoint: str, package_weights: List[float], package_sizes: List[str],
+        labels: List[Optional[str]], model_version: Optional[str]
+    ):
+        """
+        Feeds scored inputs to the drift monitor and the shadow scorer and
+        queues one audit record per input. Never waits on disk I/O or on
+        the shadow model.
+        """
+        if self.drift is not None:
+            self.drift.observe_many(package_weights, package_sizes, labels)
+        if self.shadow is not None:
+            self.shadow.submit(package_weights, package_sizes, labels)
+        if self.audit is None:
+            return
+        self.audit.log_many(
+            audit_record(
+                endpoint, weight, size, label, model_version,
+                None if label is not None else f"Invalid or unknown 'package_size' value: '{size}'"
+            )
+            for weight, size, label in zip(package_weights, package_sizes, labels)
+        )
+
+    def _observe(self, stage: str, started_at: float) -> float:
+        """
+        Records the time elapsed since started_at and returns the current time.
+        """
+        now = time.perf_counter()
+        if self.metrics is not None:
+            self.metrics.observe(stage, now - started_at)
+        return now
+
+    # Error message per shed reason
+    SHED_MESSAGES = {
+        'in_flight_limit': "Service is overloaded. Try again later.",
+        'queue_full': "Service is overloaded. Try again later.",
+        'deadline_expired': "Request deadline exceeded.",
+        'deadline_unmeetable': "Request deadline cannot be met."
+    }
+
+    def _shed_response(self, rejection: Rejection) -> Response:
+        """
+        Builds the immediate error response of a shed request.
+        """
+        response = jsonify({"error": self.SHED_MESSAGES[rejection.reason]})
+        response.status_code = rejection.status_code
+        if rejection.retry_after_s is not None:
+            response.headers['Retry-After'] = str(rejection.retry_after_s)
+        return response
 
     def predict(self):
         """
         Handles the POST /predict request.
-        Validates JSON, calls the service, and formats the response.
+        Runs admission control, then validates JSON, calls the service,
+        and formats the response.
         """
         if not self.service:
             return jsonify({"error": "Service is not available. Check server logs."}), 503
 
+        if self.admission is None:
+            return self._predict(deadline=None)
+
+        try:
+            deadline = self.admission.parse_deadline(
+                request.headers.get(settings.REQUEST_TIMEOUT_HEADER), request.headers.get(settings.REQUEST_DEADLINE_HEADER)
+            )
+        except ValueError as e:
+            return jsonify({"error": f"Bad Request: {e}"}), 400
+
+        rejection = self.admission.admit(deadline)
+        if rejection is not None:
+            return self._shed_response(rejection)
+
+        started_at = time.perf_counter()
+        try:
+            return self._predict(deadline)
+        finally:
+            self.admission.release(time.perf_counter() - started_at)
+
+    def _predict(self, deadline: Optional[float]):
+        """
+        Body of predict() for an admitted request.
+        deadline (Unix time in seconds) caps the wait for a micro-batch.
+        """
+        started_at = time.perf_counter()
         try:
             raw_data = request.get_json()
+            started_at = self._observe('json_parse', started_at)
             if not raw_data:
                 return jsonify({"error": "Invalid request. No JSON data received."}), 400
             
-            input_data = PredictionRequest(**raw_data)
+            if self.fast_io:
+                input_data = validate_request(raw_data)
+                package_weight, package_size = input_data.package_weight, input_data.package_size
+            else:
+                input_data = PredictionRequest(**raw_data)
+                package_weight, package_size = float(input_data.package_weight_gr), input_data.package_size
+            started_at = self._observe('validation', started_at)
         
         except ValidationError as e:
             return jsonify({"error": "Invalid input.", "details": e.json()}), 422
 
+        echo = echo_requested(request.args.get('echo'))
+
+        # Prediction
+        try:
+            if self.batcher is not None:
+                timeout = settings.MICRO_BATCH_RESULT_TIMEOUT_SECONDS
+                if deadline is not None:
+                    timeout = max(min(timeout, deadline - time.time()), 0.0)
+                prediction_label, model_version = self.batcher.predict_versioned(
+                    package_weight=package_weight,
+                    package_size=package_size,
+                    timeout=timeout
+                )
+            else:
+                prediction_label, model_version = self.service.predict_versioned(
+                    package_weight=package_weight, 
+                    package_size=package_size
+                )
+            started_at = self._observe('predict', started_at)
+            self.record_scored('predict', [package_weight], [package_size], [prediction_label], model_version)
+
+            if self.fast_io:
+                response = Response(
+                    encode_prediction(input_data, prediction_label, model_version, echo),
+                    mimetype='application/json'
+                )
+            else:
+                response_data = {
+                    "predicted_product_type": prediction_label,
+                    "model_version": model_version
+                }
+                if echo:
+                    response_data["input_received"] = input_data.model_dump()
+                response = jsonify(response_data)
+            self._observe('serialization', started_at)
+            return response, 200
+
+        except ValueError as e:
+            if self.audit is not None:
+                self.audit.log(audit_record('predict', package_weight, package_size, None, None, str(e)))
+            return jsonify({"error": f"Bad Request: {e}"}), 400
+        except queue.Full:
+            if self.admission is not None:
+                return self._shed_response(self.admission.reject('queue_full'))
+            return jsonify({"error": "Service is overloaded. Try again later."}), 503
+        except FutureTimeoutError:
+            if deadline is not None and time.time() >= deadline:
+                return jsonify({"error": "Request deadline exceeded."}), 504
+            print("[CONTROLLER_ERROR] Timed out waiting for a micro-batch.")
+            return jsonify({"error": "An internal server error occurred."}), 500
+        except Exception as e:
+            print(f"[CONTROLLER_ERROR] Unexpected error: {e}")
+            return jsonify({"error": "An internal server error occurred."}), 500
+
+    def predict_batch(self):
+        """
+        Handles the POST /predict/batch request.
+        Validates the JSON array, scores all valid items in one
+        vectorized call and returns per-item results in input order.
+        """
+        if not self.service:
+            return jsonify({"error": "Service is not available. Check server logs."}), 503
+
+        raw_data = request.get_json()
+        if not raw_data:
+            return jsonify({"error": "Invalid request. No JSON data received."}), 400
+
+        if not isinstance(raw_data, list):
+            return jsonify({"error": "Invalid request. Expected a JSON array of items."}), 400
+
+        if len(raw_data) > settings.MAX_BATCH_SIZE:
+            return jsonify({"error": f"Batch too large. Maximum is {settings.MAX_BATCH_SIZE} items."}), 413
+
+        echo = echo_requested(request.args.get('echo'))
+
+        # Validate the whole array at once, then split errors per item
+        if self.fast_io:
+            items, item_errors = validate_batch_items(raw_data)
+        else:
+            items, item_errors = validate_batch_pydantic(raw_data)
+
+        valid_idx = [i for i, item in enumerate(items) if item is not None]
+
         # Prediction
         try:
-            prediction_label = self.service.predict(
-                package_weight=float(input_data.package_weight_gr), 
-                package_size=input_data.package_size
+            if self.fast_io:
+                package_weights = [items[i].package_weight for i in valid_idx]
+            else:
+                package_weights = [float(items[i].package_weight_gr) for i in valid_idx]
+            package_sizes = [items[i].package_size for i in valid_idx]
+            prediction_labels, model_version = self.service.predict_batch_versioned(
+                package_weights=package_weights,
+                package_sizes=package_sizes
             )
-            
-            response_data = {
-                "input_received": input_data.model_dump(),
-                "predicted_product_type": prediction_label
-            }
-            return jsonify(response_data), 200
+        except ValueError as e:
+            return jsonify({"error": f"Bad Request: {e}"}), 400
+        except Exception as e:
+            print(f"[CONTROLLER_ERROR] Unexpected error: {e}")
+            return jsonify({"error": "An internal server error occurred."}), 500
+
+        predictions = dict(zip(valid_idx, prediction_labels))
+        self.record_scored('predict_batch', package_weights, package_sizes, prediction_labels, model_version)
 
+        if self.fast_io:
+            details = {i: json.dumps(errors) for i, errors in item_errors.items()}
+            body = encode_batch(items, predictions, details, model_version, echo)
+            return Response(body, mimetype='application/json'), 200
+
+        results = []
+        for i, item in enumerate(items):
+            if item is None:
+                results.append({"index": i, "error": "Invalid input.", "details": json.dumps(item_errors[i])})
+            elif predictions[i] is None:
+                results.append({
+                    "index": i,
+                    "error": f"Bad Request: Invalid or unknown 'package_size' value: '{item.package_size}'"
+                })
+            else:
+                result = {"index": i, "predicted_product_type": predictions[i]}
+                if echo:
+                    result["input_received"] = item.model_dump()
+                results.append(result)
+
+        return jsonify({"results": results, "model_version": model_version}), 200
+
+    def predict_columnar(self):
+        """
+        Handles the POST /predict/columnar request.
+        Same scoring as /predict/batch on a binary columnar body (see
+        src/models/columnar.py): the weights and size codes are wrapped as
+        NumPy arrays straight from the request buffer and fed to the model,
+        with no JSON and no per-item objects.
+        """
+        if not self.service:
+            return jsonify({"error": "Service is not available. Check server logs."}), 503
+
+        if request.mimetype != columnar.CONTENT_TYPE:
+            return jsonify({"error": f"Unsupported Media Type. Expected '{columnar.CONTENT_TYPE}'."}), 415
+
+        # Blocks of readings can be far bigger than MAX_CONTENT_LENGTH
+        request.max_content_length = settings.COLUMNAR_MAX_CONTENT_LENGTH
+
+        try:
+            body = self.score_columnar(request.get_data(cache=False))
         except ValueError as e:
             return jsonify({"error": f"Bad Request: {e}"}), 400
         except Exception as e:
             print(f"[CONTROLLER_ERROR] Unexpected error: {e}")
             return jsonify({"error": "An internal server error occurred."}), 500
 
+        return Response(body, mimetype=columnar.CONTENT_TYPE), 200
+
+    def score_columnar(self, body: bytes) -> bytes:
+        """
+        Decodes a columnar request body, scores it and returns the encoded response.
+        Items with a non-positive or non-finite weight get the INVALID_WEIGHT
+        code, items with an unknown size the UNKNOWN_SIZE code.
+
+        Raises:
+            ValueError: If the body is malformed, or the model returns an unexpected class.
+        """
+        batch = columnar.decode_request(body)
+        weights, size_codes = batch.weights, batch.size_codes
+
+        valid = np.isfinite(weights) & (weights > 0)
+        all_valid = bool(valid.all())
+        if not all_valid:
+            weights, size_codes = weights[valid], size_codes[valid]
+
+        class_indexes, labels, model_version = self.service.predict_columnar_versioned(
+            weights, size_codes, batch.size_vocabulary
+        )
+
+        label_codes = np.where(class_indexes >= 0, class_indexes, columnar.UNKNOWN_SIZE)
+        if not all_valid:
+            label_codes_all = np.full(len(valid), columnar.INVALID_WEIGHT, dtype=np.int64)
+            label_codes_all[valid] = label_codes
+            label_codes = label_codes_all
+
+        if self.drift is not None or self.audit is not None or self.shadow is not None:
+            # Index -1 (unknown size) picks the trailing None
+            self.record_scored(
+                'predict_columnar', weights.tolist(),
+                np.asarray(batch.size_vocabulary, dtype=object)[size_codes].tolist(),
+                np.append(labels, None)[class_indexes].tolist(), model_version
+            )
+
+        return columnar.encode_response(label_codes, labels.tolist(), model_version)
+
+    def predict_stream(self):
+        """
+        Handles the POST /predict/stream request.
+        Reads an NDJSON body line by line, scores it in fixed-size chunks
+        and streams one NDJSON result per input line back, in input order.
+        Bad lines produce error records and do not abort the stream.
+        """
+        if not self.service:
+            return jsonify({"error": "Service is not available. Check server logs."}), 503
+
+        # Manifests can be far bigger than MAX_CONTENT_LENGTH
+        request.max_content_length = settings.STREAM_MAX_CONTENT_LENGTH
+
+        return Response(
+            stream_with_context(self._stream_results(request.stream)),
+            mimetype='application/x-ndjson'
+        )
+
+    def _stream_results(self, stream) -> Iterator[str]:
+        """
+        Generator behind predict_stream(). Memory is bounded by STREAM_CHUNK_SIZE.
+        """
+        chunk: List[Tuple[int, Any]] = []
+        line_number = 0
+
+        for raw_line in stream:
+            line_number += 1
+            if not raw_line.strip():
+                continue
+
+            chunk.append((line_number, self.parse_stream_line(raw_line)))
+            if len(chunk) >= settings.STREAM_CHUNK_SIZE:
+                yield from self.score_stream_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            yield from self.score_stream_chunk(chunk)
+
+    @staticmethod
+    def parse_stream_line(raw_line: bytes) -> Any:
+        """
+        Parses and validates one NDJSON line.
+        Returns a PredictionRequest, or an error record for a bad line.
+        """
+        try:
+            raw_data = json.loads(raw_line)
+        except ValueError:
+            return {"error": "Invalid JSON."}
+
+        if not isinstance(raw_data, dict):
+            return {"error": "Invalid input. Expected a JSON object."}
+
+        try:
+            return PredictionRequest(**raw_data)
+        except ValidationError as e:
+            return {"error": "Invalid input.", "details": e.json()}
+
+    def score_stream_chunk(self, chunk: List[Tuple[int, Any]]) -> Iterator[str]:
+        """
+        Scores the valid lines of a chunk in one call and yields NDJSON records.
+        """
+        valid = [(n, item) for n, item in chunk if isinstance(item, PredictionRequest)]
+
+        try:
+            package_weights = [float(item.package_weight_gr) for _, item in valid]
+            package_sizes = [item.package_size for _, item in valid]
+            labels, model_version = self.service.predict_batch_versioned(
+                package_weights=package_weights,
+                package_sizes=package_sizes
+            )
+            predictions = {n: label for (n, _), label in zip(valid, labels)}
+            chunk_error = None
+            self.record_scored('predict_stream', package_weights, package_sizes, labels, model_version)
+        except Exception as e:
+            print(f"[CONTROLLER_ERROR] Unexpected error while streaming: {e}")
+            predictions = {}
+            model_version = None
+            chunk_error = "An internal server error occurred."
+
+        for n, item in chunk:
+            if not isinstance(item, PredictionRequest):
+                record = {"line": n, **item}
+            elif chunk_error is not None:
+                record = {"line": n, "error": chunk_error}
+            elif predictions[n] is None:
+                record = {"line": n, "error": f"Bad Request: Invalid or unknown 'package_size' value: '{item.package_size}'"}
+            else:
+                record = {
+                    "line": n,
+                    "input_received": item.model_dump(),
+                    "predicted_product_type": predictions[n],
+                    "model_version": model_version
+                }
+            # Same output as Flask's json.dumps (sorted keys, Decimal as str), without an app context
+            yield json.dumps(record, sort_keys=True, default=str) + "\n"
+
 # --- Singleton ---
 from src.services.prediction_service import prediction_service
-prediction_controller = PredictionController(prediction_service)
\ No newline at end of file
+from src.services.micro_batcher import micro_batcher
+from src.services.metrics import metrics
+from src.services.admission import admission_controller
+from src.services.audit_log import audit_logger
+from src.services.drift_monitor import drift_monitor
+from src.services.shadow_scorer import shadow_scorer
+prediction_controller = PredictionController(
+    prediction_service, micro_batcher, metrics, settings.FAST_IO_ENABLED, admission_controller, audit_logger,
+    drift_monitor, shadow_scorer
+)
\ No newline at end of file
@@ -0,0 +1,177 @@
+import struct
+import numpy as np
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+# Binary columnar payloads of /predict/columnar. All integers are little-endian.
+#
+# Request:
+#   header   '<4sIHH'  magic b'PKC1', n_items (uint32), n_sizes (uint16), reserved (uint16, 0)
+#   sizes    n_sizes x (uint8 length, UTF-8 bytes)    package_size vocabulary
+#   padding  zero bytes up to a multiple of 4
+#   weights  float32[n_items]                         package weights in grams
+#   codes    uint8[n_items]                           index of each item's size in the vocabulary
+#
+# Response:
+#   header   '<4sIHH'  magic b'PKR1', n_items (uint32), n_labels (uint16), version length (uint16)
+#   version  UTF-8 bytes                              model version
+#   labels   n_labels x (uint8 length, UTF-8 bytes)   product_type vocabulary
+#   codes    uint8[n_items]                           index of each item's label, or one of the error codes
+#
+# float32 weights lose nothing: the trees compare float32 inputs (sklearn
+# casts X to float32, and the compiled table does the same).
+
+CONTENT_TYPE = 'application/x-package-columnar'
+
+REQUEST_MAGIC = b'PKC1'
+RESPONSE_MAGIC = b'PKR1'
+_HEADER = struct.Struct('<4sIHH')
+
+# Label codes reserved for per-item errors
+UNKNOWN_SIZE = 255
+INVALID_WEIGHT = 254
+MAX_VOCABULARY = 254
+
+
+class ColumnarBatch(NamedTuple):
+    """
+    A decoded request. weights and size_codes are read-only views of the
+    request body, not copies.
+    """
+    weights: np.ndarray
+    size_codes: np.ndarray
+    size_vocabulary: List[str]
+
+
+def _encode_vocabulary(values: Sequence[str]) -> bytes:
+    parts = []
+    for value in values:
+        data = value.encode('utf-8')
+        if len(data) > 255:
+            raise ValueError(f"Vocabulary entry too long (max 255 bytes): '{value[:32]}...'")
+        parts += (bytes((len(data),)), data)
+    return b''.join(parts)
+
+
+def _decode_vocabulary(view: memoryview, offset: int, n: int) -> Tuple[List[str], int]:
+    values = []
+    for _ in range(n):
+        if offset >= len(view):
+            raise ValueError("Truncated payload: vocabulary runs past the end.")
+        length = view[offset]
+        end = offset + 1 + length
+        if end > len(view):
+            raise ValueError("Truncated payload: vocabulary runs past the end.")
+        try:
+            values.append(bytes(view[offset + 1:end]).decode('utf-8'))
+        except UnicodeDecodeError:
+            raise ValueError("Vocabulary entry is not valid UTF-8.")
+        offset = end
+    return values, offset
+
+
+def _read_header(view: memoryview, magic: bytes) -> Tuple[int, int, int]:
+    if len(view) < _HEADER.size:
+        raise ValueError("Truncated payload: incomplete header.")
+    found, n_items, a, b = _HEADER.unpack_from(view)
+    if found != magic:
+        raise ValueError(f"Invalid payload: expected magic {magic!r}, got {found!r}.")
+    return n_items, a, b
+
+
+# --- Request ---
+def encode_request(package_weights: Sequence[float], package_sizes: Sequence[str]) -> bytes:
+    """
+    Encodes a batch into a request body.
+
+    Raises:
+        ValueError: If the sequences differ in length or there are too many distinct sizes.
+    """
+    if len(package_weights) != len(package_sizes):
+        raise ValueError("'package_weights' and 'package_sizes' must have the same length.")
+
+    vocabulary, size_codes = np.unique(np.asarray(package_sizes, dtype=object), return_inverse=True)
+    if len(vocabulary) > MAX_VOCABULARY:
+        raise ValueError(f"Too many distinct package sizes ({len(vocabulary)}). Maximum is {MAX_VOCABULARY}.")
+
+    head = _HEADER.pack(REQUEST_MAGIC, len(package_weights), len(vocabulary), 0) + _encode_vocabulary(vocabulary.tolist())
+    padding = b'\0' * (-len(head) % 4)
+    return b''.join((
+        head, padding,
+        np.asarray(package_weights, dtype='<f4').tobytes(),
+        size_codes.astype(np.uint8).tobytes()
+    ))
+
+
+def decode_request(body: bytes) -> ColumnarBatch:
+    """
+    Decodes a request body. The arrays wrap the body buffer without copying.
+
+    Raises:
+        ValueError: If the body is malformed.
+    """
+    view = memoryview(body)
+    n_items, n_sizes, _ = _read_header(view, REQUEST_MAGIC)
+    if n_sizes > MAX_VOCABULARY:
+        raise ValueError(f"Too many distinct package sizes ({n_sizes}). Maximum is {MAX_VOCABULARY}.")
+    vocabulary, offset = _decode_vocabulary(view, _HEADER.size, n_sizes)
+    offset += -offset % 4
+
+    expected = offset + n_items * 5
+    if len(view) != expected:
+        raise ValueError(f"Invalid payload: expected {expected} bytes for {n_items} items, got {len(view)}.")
+
+    weights = np.frombuffer(body, dtype='<f4', count=n_items, offset=offset)
+    size_codes = np.frombuffer(body, dtype=np.uint8, count=n_items, offset=offset + n_items * 4)
+    if n_items and int(size_codes.max()) >= n_sizes:
+        raise ValueError("Invalid payload: size code outside the vocabulary.")
+    return ColumnarBatch(weights, size_codes, vocabulary)
+
+
+# --- Response ---
+def encode_response(label_codes: np.ndarray, labels: Sequence[str], model_version: str) -> bytes:
+    """
+    Encodes the results. label_codes index labels, or are UNKNOWN_SIZE / INVALID_WEIGHT.
+
+    Raises:
+        ValueError: If there are more labels than free codes.
+    """
+    if len(labels) > MAX_VOCABULARY:
+        raise ValueError(f"Too many labels ({len(labels)}). Maximum is {MAX_VOCABULARY}.")
+    version = model_version.encode('utf-8')
+    return b''.join((
+        _HEADER.pack(RESPONSE_MAGIC, len(label_codes), len(labels), len(version)),
+        version,
+        _encode_vocabulary(labels),
+        np.asarray(label_codes, dtype=np.uint8).tobytes()
+    ))
+
+
+def decode_response(body: bytes) -> Tuple[np.ndarray, List[str], str]:
+    """
+    Decodes a response body.
+
+    Returns:
+        Tuple: (label codes, label vocabulary, model version).
+
+    Raises:
+        ValueError: If the body is malformed.
+    """
+    view = memoryview(body)
+    n_items, n_labels, version_length = _read_header(view, RESPONSE_MAGIC)
+    offset = _HEADER.size + version_length
+    if offset > len(view):
+        raise ValueError("Truncated payload: model version runs past the end.")
+    model_version = bytes(view[_HEADER.size:offset]).decode('utf-8')
+    labels, offset = _decode_vocabulary(view, offset, n_labels)
+    if len(view) != offset + n_items:
+        raise ValueError(f"Invalid payload: expected {offset + n_items} bytes for {n_items} items, got {len(view)}.")
+    return np.frombuffer(body, dtype=np.uint8, count=n_items, offset=offset), labels, model_version
+
+
+def decode_labels(body: bytes) -> Tuple[List[Optional[str]], str]:
+    """
+    Decodes a response body into one label per item, None for the items in error.
+    """
+    label_codes, labels, model_version = decode_response(body)
+    lookup = labels + [None] * (256 - len(labels))
+    return [lookup[code] for code in label_codes.tolist()], model_version
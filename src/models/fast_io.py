@@ -0,0 +1,218 @@
+import json
+import math
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+
+from src.config import settings
+from src.models.schemas import PredictionRequest, PredictionBatchRequest
+
+# Larger ints take the pydantic path (float() could overflow)
+MAX_FAST_INT = 2 ** 53
+
+
+class FastInput(NamedTuple):
+    """
+    A validated prediction input in native types.
+    weight_text is the weight as the pydantic path echoes it
+    (str of the validated Decimal).
+    """
+    package_weight: float
+    package_size: str
+    weight_text: str
+
+    @classmethod
+    def from_request(cls, item: PredictionRequest) -> "FastInput":
+        """
+        Converts an input validated by PredictionRequest.
+        """
+        return cls(float(item.package_weight_gr), item.package_size, str(item.package_weight_gr))
+
+
+def fast_validate(raw_data: Any) -> Optional[FastInput]:
+    """
+    Validates the common payload shape without pydantic: exactly the two
+    fields, a finite positive int/float weight and a str size.
+
+    Returns None for anything else. The caller then validates the payload
+    with PredictionRequest, so errors (and unusual but valid inputs such as
+    numeric strings) keep exactly the pydantic semantics.
+    """
+    if type(raw_data) is not dict or len(raw_data) != 2:
+        return None
+
+    package_size = raw_data.get('package_size')
+    if type(package_size) is not str:
+        return None
+
+    weight = raw_data.get('package_weight_gr')
+    weight_type = type(weight)
+    if weight_type is float:
+        if not 0.0 < weight < math.inf:
+            return None
+        weight_text = repr(weight)
+        if 'e' in weight_text:
+            # pydantic builds the Decimal from str(float), which prints exponents differently
+            weight_text = str(Decimal(weight_text))
+        return FastInput(weight, package_size, weight_text)
+
+    if weight_type is int:
+        if not 0 < weight < MAX_FAST_INT:
+            return None
+        return FastInput(float(weight), package_size, str(weight))
+
+    return None
+
+
+def validate_request(raw_data: Any) -> FastInput:
+    """
+    Fast validation with the pydantic fallback.
+
+    Raises:
+        ValidationError: Exactly as PredictionRequest(**raw_data) would.
+    """
+    item = fast_validate(raw_data)
+    if item is None:
+        item = FastInput.from_request(PredictionRequest(**raw_data))
+    return item
+
+
+def validate_batch(raw_data: List[Any]) -> Optional[List[FastInput]]:
+    """
+    Fast validation of a batch array.
+    Returns None if any item needs the pydantic path.
+    """
+    items = []
+    for raw_item in raw_data:
+        item = fast_validate(raw_item)
+        if item is None:
+            return None
+        items.append(item)
+    return items
+
+
+def validate_batch_pydantic(raw_data: List[Any]) -> Tuple[List[Optional[PredictionRequest]], Dict[int, List[Any]]]:
+    """
+    Validates a batch array with PredictionBatchRequest.
+
+    Returns:
+        Tuple: (items, None for invalid ones; pydantic errors per invalid index,
+            with the index removed from each error 'loc').
+    """
+    item_errors: Dict[int, List[Any]] = {}
+    try:
+        return PredictionBatchRequest.model_validate(raw_data).root, item_errors
+    except ValidationError as e:
+        for error in json.loads(e.json()):
+            index, *field_loc = error["loc"]
+            error["loc"] = field_loc
+            item_errors.setdefault(index, []).append(error)
+    items = [
+        None if i in item_errors else PredictionRequest(**item)
+        for i, item in enumerate(raw_data)
+    ]
+    return items, item_errors
+
+
+def validate_batch_items(raw_data: List[Any]) -> Tuple[List[Optional[FastInput]], Dict[int, List[Any]]]:
+    """
+    Fast batch validation with the pydantic fallback.
+    Same return shape as validate_batch_pydantic(), with FastInput items.
+    """
+    items = validate_batch(raw_data)
+    if items is not None:
+        return items, {}
+    requests, item_errors = validate_batch_pydantic(raw_data)
+    return [None if item is None else FastInput.from_request(item) for item in requests], item_errors
+
+
+def echo_requested(value: Optional[str]) -> bool:
+    """
+    Whether to echo 'input_received', from the ?echo= query value.
+    Falls back to ECHO_INPUT_DEFAULT when the flag is absent.
+    """
+    if value is None:
+        return settings.ECHO_INPUT_DEFAULT
+    return value.lower() not in ('0', 'false', 'no')
+
+
+# --- Serialization ---
+# Byte fragments of the responses, with keys in the order jsonify writes them
+# (sorted, compact separators), so the bodies match the jsonify path.
+_INPUT_PREFIX = b'"input_received":{"package_size":'
+_WEIGHT_PREFIX = b',"package_weight_gr":"'
+_WEIGHT_SUFFIX = b'"}'
+_VERSION_PREFIX = b'"model_version":'
+_LABEL_PREFIX = b'"predicted_product_type":'
+_INDEX_PREFIX = b'{"index":'
+_RESULTS_PREFIX = b',"results":['
+_BATCH_SUFFIX = b']}\n'
+
+
+@lru_cache(maxsize=4096)
+def json_string(value: str) -> bytes:
+    """
+    A str as a JSON string literal. Labels, versions and sizes repeat,
+    so they are encoded once.
+    """
+    return json.dumps(value).encode('ascii')
+
+
+def _input_fragment(item: FastInput) -> bytes:
+    return b''.join((
+        _INPUT_PREFIX, json_string(item.package_size),
+        _WEIGHT_PREFIX, item.weight_text.encode('ascii'), _WEIGHT_SUFFIX
+    ))
+
+
+def encode_prediction(item: FastInput, label: str, model_version: str, echo: bool) -> bytes:
+    """
+    Body of a /predict response. The input is echoed only if echo is set.
+    """
+    parts = [b'{']
+    if echo:
+        parts += (_input_fragment(item), b',')
+    parts += (_VERSION_PREFIX, json_string(model_version), b',', _LABEL_PREFIX, json_string(label), b'}\n')
+    return b''.join(parts)
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    """
+    Fallback for error records: same layout as jsonify.
+    """
+    return json.dumps(record, sort_keys=True, separators=(',', ':')).encode('ascii')
+
+
+def encode_batch(
+    items: Sequence[Optional[FastInput]], labels: Dict[int, Optional[str]],
+    item_errors: Dict[int, str], model_version: str, echo: bool
+) -> bytes:
+    """
+    Body of a /predict/batch response.
+
+    Args:
+        items: Validated inputs, None for items that failed validation.
+        labels: Predicted label per valid index (None for an unknown size).
+        item_errors: JSON validation details per invalid index.
+        model_version: Version that scored the batch.
+        echo: Whether to echo each valid input.
+    """
+    results = []
+    for i, item in enumerate(items):
+        if item is None:
+            results.append(encode_record({"index": i, "error": "Invalid input.", "details": item_errors[i]}))
+        elif labels[i] is None:
+            results.append(encode_record({
+                "index": i,
+                "error": f"Bad Request: Invalid or unknown 'package_size' value: '{item.package_size}'"
+            }))
+        else:
+            parts = [_INDEX_PREFIX, str(i).encode('ascii'), b',']
+            if echo:
+                parts += (_input_fragment(item), b',')
+            parts += (_LABEL_PREFIX, json_string(labels[i]), b'}')
+            results.append(b''.join(parts))
+
+    return b''.join((b'{', _VERSION_PREFIX, json_string(model_version), _RESULTS_PREFIX, b','.join(results), _BATCH_SUFFIX))
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, condecimal
+from pydantic import BaseModel, Field, RootModel, condecimal
 from decimal import Decimal
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 class PredictionRequest(BaseModel):
     """
@@ -28,12 +28,39 @@ class PredictionRequest(BaseModel):
         """
         extra = "forbid"
 
+class PredictionBatchRequest(RootModel[List[PredictionRequest]]):
+    """
+    Schema for the batch prediction payload.
+    A JSON array of PredictionRequest items, validated together.
+    """
+
 class PredictionResponse(BaseModel):
     """
     Schema for a successful prediction response.
     """
     input_received: PredictionRequest
     predicted_product_type: str
+    model_version: str
+
+class BatchItemResult(BaseModel):
+    """
+    Schema for a single item of a batch response.
+    Holds either a prediction or an error, never both.
+    """
+    index: int
+    input_received: Optional[PredictionRequest] = None
+    predicted_product_type: Optional[str] = None
+    error: Optional[str] = None
+    details: Optional[str] = None
+
+class PredictionBatchResponse(BaseModel):
+    """
+    Schema for a batch prediction response.
+    Results are returned in the same order as the input items,
+    all scored by the same model version.
+    """
+    results: List[BatchItemResult]
+    model_version: str
 
 class ErrorResponse(BaseModel):
     """
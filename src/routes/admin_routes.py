@@ -0,0 +1,5 @@
+from flask import Blueprint
+from src.controllers.admin_controller import admin_controller
+
+admin_bp = Blueprint('admin_bp', __name__, url_prefix='/vinicius_rubens/api/admin')
+admin_bp.route('/reload', methods=['GET', 'POST'])(admin_controller.reload)
@@ -2,4 +2,7 @@ from flask import Blueprint
 from src.controllers.predict_controller import prediction_controller
 
 predict_bp = Blueprint('predict_bp', __name__, url_prefix='/vinicius_rubens/api')
-predict_bp.route('/predict', methods=['POST'])(prediction_controller.predict)
\ No newline at end of file
+predict_bp.route('/predict', methods=['POST'])(prediction_controller.predict)
+predict_bp.route('/predict/batch', methods=['POST'])(prediction_controller.predict_batch)
+predict_bp.route('/predict/columnar', methods=['POST'])(prediction_controller.predict_columnar)
+predict_bp.route('/predict/stream', methods=['POST'])(prediction_controller.predict_stream)
\ No newline at end of file
@@ -0,0 +1,183 @@
+import math
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from src.config import settings
+from src.services.metrics import Metrics, metrics
+
+
+class Rejection(NamedTuple):
+    """
+    Why a request was shed, and the HTTP status to answer with.
+    """
+    reason: str
+    status_code: int
+    retry_after_s: Optional[int]
+
+
+class AdmissionController:
+    """
+    Per-worker admission control in front of /predict.
+
+    A request is shed, before it reaches the model, when:
+    - the worker already has max_in_flight requests in progress (429);
+    - its client deadline has passed, or is closer than the typical
+      service time of this worker, so the answer would arrive too late (504).
+      Clients send the time they have left (timeout header) or, as a
+      fallback, an absolute Unix time (deadline header).
+
+    Shed requests are answered immediately, so latency stays bounded
+    under overload instead of growing with the queue.
+    """
+
+    REASONS = Metrics.SHED_REASONS
+
+    def __init__(
+        self, max_in_flight: int = 0, retry_after_s: int = 1,
+        metrics: Optional[Metrics] = None, ewma_alpha: float = 0.1
+    ):
+        """
+        Args:
+            max_in_flight (int): Maximum concurrent requests per worker. 0 means unlimited.
+            retry_after_s (int): Retry-After sent with 429/503 responses.
+            metrics (Optional[Metrics]): Receives shed counts by reason.
+            ewma_alpha (float): Weight of the newest sample in the service time average.
+        """
+        self.max_in_flight = max_in_flight
+        self.retry_after_s = retry_after_s
+        self.metrics = metrics
+        self.ewma_alpha = ewma_alpha
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._max_in_flight_seen = 0
+        self._service_time_s = 0.0
+        self._admitted = 0
+        self._shed = dict.fromkeys(self.REASONS, 0)
+
+    @staticmethod
+    def parse_deadline(timeout_header: Optional[str], deadline_header: Optional[str] = None) -> Optional[float]:
+        """
+        Turns the client's deadline headers into a deadline on this server's clock.
+
+        The timeout header (time budget left, in milliseconds) is preferred:
+        it does not depend on the client and server clocks agreeing. The
+        deadline header (absolute Unix time in milliseconds) is only used
+        when no timeout is sent.
+
+        Returns:
+            Optional[float]: Deadline as Unix time in seconds, or None without headers.
+
+        Raises:
+            ValueError: If a header is not a finite number.
+        """
+        if timeout_header is not None:
+            try:
+                timeout_ms = float(timeout_header)
+            except ValueError:
+                timeout_ms = math.nan
+            if not math.isfinite(timeout_ms):
+                raise ValueError(f"Invalid timeout header value: '{timeout_header}'. Expected milliseconds left.")
+            return time.time() + timeout_ms / 1000
+
+        if deadline_header is not None:
+            try:
+                deadline_ms = float(deadline_header)
+            except ValueError:
+                deadline_ms = math.nan
+            if not math.isfinite(deadline_ms):
+                raise ValueError(f"Invalid deadline header value: '{deadline_header}'. Expected Unix time in milliseconds.")
+            return deadline_ms / 1000
+
+        return None
+
+    def admit(self, deadline: Optional[float] = None) -> Optional[Rejection]:
+        """
+        Admits a request (counted in flight until release()) or rejects it.
+
+        Args:
+            deadline (Optional[float]): Client deadline, Unix time in seconds.
+
+        Returns:
+            Optional[Rejection]: None if admitted.
+        """
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return self.reject('deadline_expired')
+            if remaining < self._service_time_s:
+                return self.reject('deadline_unmeetable')
+
+        with self._lock:
+            if self.max_in_flight and self._in_flight >= self.max_in_flight:
+                admitted = False
+            else:
+                admitted = True
+                self._in_flight += 1
+                self._admitted += 1
+                self._max_in_flight_seen = max(self._max_in_flight_seen, self._in_flight)
+
+        return None if admitted else self.reject('in_flight_limit')
+
+    def release(self, service_time_s: float):
+        """
+        Ends an admitted request and updates the service time average.
+        """
+        with self._lock:
+            self._in_flight -= 1
+            if self._service_time_s == 0.0:
+                self._service_time_s = service_time_s
+            else:
+                self._service_time_s += self.ewma_alpha * (service_time_s - self._service_time_s)
+
+    def reject(self, reason: str) -> Rejection:
+        """
+        Counts one shed request and returns how to answer it.
+        """
+        with self._lock:
+            self._shed[reason] += 1
+        if self.metrics is not None:
+            self.metrics.count_shed(reason)
+
+        if reason == 'in_flight_limit':
+            return Rejection(reason, 429, self.retry_after_s)
+        if reason == 'queue_full':
+            return Rejection(reason, 503, self.retry_after_s)
+        # The client gave up already: a retry cannot help
+        return Rejection(reason, 504, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of the admission counters.
+        """
+        with self._lock:
+            return {
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._max_in_flight_seen,
+                "admitted": self._admitted,
+                "shed": dict(self._shed),
+                "avg_service_time_ms": round(self._service_time_s * 1000, 3)
+            }
+
+
+def default_max_in_flight(asgi: bool = False) -> int:
+    """
+    ADMISSION_MAX_IN_FLIGHT, or when unset: unlimited for a WSGI worker,
+    which never runs more requests than the server gives it threads, and
+    the inference calls its event loop may queue for an ASGI worker,
+    which would otherwise accept every connection.
+    """
+    if settings.ADMISSION_MAX_IN_FLIGHT is not None:
+        return settings.ADMISSION_MAX_IN_FLIGHT
+    return settings.ASGI_MAX_PENDING_INFERENCES if asgi else 0
+
+
+# --- Singleton Instance ---
+# src/asgi.py switches it to the ASGI default
+admission_controller = AdmissionController(
+    max_in_flight = default_max_in_flight(),
+    retry_after_s = settings.ADMISSION_RETRY_AFTER_SECONDS,
+    metrics = metrics
+)
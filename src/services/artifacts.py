@@ -0,0 +1,195 @@
+import hashlib
+import joblib
+import os
+import warnings
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+
+from src.config import settings
+from src.services.forest_table import ForestTable
+from src.services.forest_engine import ForestArrays
+
+
+class ArtifactSet:
+    """
+    One consistent, immutable set of serving artifacts: the model, both
+    encoders and everything derived from them (lookups, compiled table).
+
+    PredictionService swaps whole ArtifactSets atomically, so a request
+    that grabbed a set keeps using it even if a reload happens meanwhile.
+    """
+
+    def __init__(
+        self, model: Any, size_encoder: Any, type_encoder: Any,
+        version: str, paths: Dict[str, str], forest_table: Optional[ForestTable] = None,
+        file_versions: Optional[Dict[str, str]] = None
+    ):
+        """
+        Args:
+            model (Any): The fitted forest (pickled estimator or ForestArrays).
+            size_encoder (Any): LabelEncoder for 'package_size'.
+            type_encoder (Any): LabelEncoder for 'product_type'.
+            version (str): Content hash of the artifact files.
+            paths (Dict[str, str]): Paths the artifacts were loaded from.
+            forest_table (Optional[ForestTable]): Compiled lookup table, if any.
+            file_versions (Optional[Dict[str, str]]): Content hash of each artifact, by path key.
+        """
+        self.model = model
+        self.size_encoder = size_encoder
+        self.type_encoder = type_encoder
+        self.version = version
+        self.paths = paths
+        self.forest_table = forest_table
+        self.file_versions = file_versions or {}
+
+        # Plain dict lookups from the encoders' classes_, so the hot path
+        # does not go through LabelEncoder input checks
+        self.size_codes = {label: code for code, label in enumerate(size_encoder.classes_.tolist())}
+        self.type_labels = dict(enumerate(type_encoder.classes_.tolist()))
+        self.size_classes = np.asarray(size_encoder.classes_)
+        self.type_classes = np.asarray(type_encoder.classes_, dtype=object)
+
+    def freeze(self):
+        """
+        Marks the set's NumPy arrays read-only. Used before gunicorn forks
+        workers from a preloaded master (see gunicorn_preload.py): the array
+        buffers then stay shared copy-on-write pages, since no code path can
+        write into them. Reference counts live in the small object headers,
+        not in the buffers.
+        """
+        arrays = [self.size_classes, self.type_classes]
+        if self.forest_table is not None:
+            table = self.forest_table
+            arrays += [table.classes, *table.thresholds, *table.proba, *table.class_index]
+        if isinstance(self.model, ForestArrays):
+            model = self.model
+            arrays += [model.feature, model.threshold, model.left, model.right, model.value, model.roots, model.classes_]
+
+        for array in arrays:
+            if isinstance(array, np.ndarray):
+                array.setflags(write=False)
+
+    def model_predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Calls model.predict on an ndarray in MODEL_EXPECTED_COLS order.
+
+        sklearn models fitted on a DataFrame warn on every ndarray call. The
+        columns are already in the fitted order, so the warning is silenced
+        for this call only, leaving the process warning filters untouched.
+        """
+        if getattr(self.model, 'feature_names_in_', None) is None:
+            return self.model.predict(X)
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+            return self.model.predict(X)
+
+    @classmethod
+    def load(
+        cls, model_path: str, size_encoder_path: str, type_encoder_path: str,
+        compile_forest: bool = False
+    ) -> "ArtifactSet":
+        """
+        Loads and prepares a full artifact set.
+
+        Args:
+            model_path (str): Path to the model.pkl file, or to a ForestArrays
+                directory exported by modelling/src/export_forest.py.
+            size_encoder_path (str): Path to the package_size_encoder.pkl file.
+            type_encoder_path (str): Path to the product_type_encoder.pkl file.
+            compile_forest (bool): Compile the model into a ForestTable for
+                O(log n) inference. Falls back to the model on failure.
+
+        Raises:
+            FileNotFoundError: If an artifact is missing.
+        """
+        print(f"Loading model from: {model_path}")
+        if os.path.isdir(model_path):
+            model = ForestArrays.load(model_path, mmap=True)
+        else:
+            model = joblib.load(model_path)
+
+        print(f"Loading size encoder from: {size_encoder_path}")
+        size_encoder = joblib.load(size_encoder_path)
+
+        print(f"Loading target encoder from: {type_encoder_path}")
+        type_encoder = joblib.load(type_encoder_path)
+
+        paths = {
+            "model_path": model_path,
+            "size_encoder_path": size_encoder_path,
+            "type_encoder_path": type_encoder_path
+        }
+        version, file_versions = artifact_versions(paths)
+        artifacts = cls(
+            model, size_encoder, type_encoder,
+            version=version, paths=paths, file_versions=file_versions
+        )
+        if compile_forest:
+            artifacts.forest_table = compile_forest_table(model, len(artifacts.size_classes))
+        return artifacts
+
+
+def artifact_version(*paths: str) -> str:
+    """
+    Derives a short version id from the content of the artifact files.
+    Directories (ForestArrays) are hashed file by file, in name order.
+    """
+    return artifact_versions({str(i): path for i, path in enumerate(paths)})[0]
+
+
+def artifact_versions(paths: Dict[str, str]) -> Tuple[str, Dict[str, str]]:
+    """
+    Same as artifact_version(), plus a short version id per artifact,
+    computed in the same single read of the files.
+
+    Returns:
+        Tuple[str, Dict[str, str]]: (combined version, version by path key).
+    """
+    digest = hashlib.sha256()
+    file_versions = {}
+    for key, path in paths.items():
+        if os.path.isdir(path):
+            files = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+        else:
+            files = [path]
+
+        file_digest = hashlib.sha256()
+        for file_path in files:
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+                    file_digest.update(block)
+        file_versions[key] = file_digest.hexdigest()[:12]
+
+    return digest.hexdigest()[:12], file_versions
+
+
+def compile_forest_table(model: Any, n_size_codes: int) -> Optional[ForestTable]:
+    """
+    Compiles the model into a ForestTable and checks it against model.predict.
+
+    Returns:
+        Optional[ForestTable]: The table, or None if the model cannot be
+            compiled or the table disagrees with the model.
+    """
+    print("Compiling forest into a lookup table...")
+    try:
+        table = ForestTable.compile(model, n_size_codes=n_size_codes)
+
+        if settings.COMPILED_FOREST_VERIFY_POINTS > 0:
+            feature_names = getattr(model, 'feature_names_in_', None)
+            mismatches = table.verify(
+                model, n_points=settings.COMPILED_FOREST_VERIFY_POINTS,
+                feature_names=None if feature_names is None else list(feature_names)
+            )
+            if mismatches:
+                print(f"[SERVICE_WARNING] Compiled forest disagrees with the model on {mismatches} points. Using the model.")
+                return None
+
+    except Exception as e:
+        print(f"[SERVICE_WARNING] Could not compile forest, using the model instead: {e}")
+        return None
+
+    n_intervals = sum(t.size + 1 for t in table.thresholds)
+    print(f"Forest compiled into {n_intervals} weight intervals.")
+    return table
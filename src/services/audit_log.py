@@ -0,0 +1,357 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.config import settings
+from src.services.metrics import Metrics, metrics
+
+# Marks the end of the queue on shutdown
+_STOP = object()
+
+
+def audit_record(
+    endpoint: str, package_weight: float, package_size: str,
+    label: Optional[str], model_version: Optional[str], error: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Builds one audit record: an input and what the API answered for it.
+    """
+    return {
+        'ts': time.time(),
+        'endpoint': endpoint,
+        'package_weight_gr': package_weight,
+        'package_size': package_size,
+        'predicted_product_type': label,
+        'model_version': model_version,
+        'error': error
+    }
+
+
+class _JsonlSink:
+    """
+    Appends records as JSON lines, one file at a time.
+    """
+    extension = 'jsonl'
+
+    def __init__(self, path: str):
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, records: List[Dict[str, Any]]):
+        self._file.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+        self._file.flush()
+
+    def size(self) -> int:
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetSink:
+    """
+    Writes each drained batch as a zstd-compressed row group of one Parquet file.
+    """
+    extension = 'parquet'
+
+    def __init__(self, path: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([
+            ('ts', pa.float64()), ('endpoint', pa.string()), ('package_weight_gr', pa.float64()),
+            ('package_size', pa.string()), ('predicted_product_type', pa.string()),
+            ('model_version', pa.string()), ('error', pa.string())
+        ])
+        self._file = open(path, 'wb')
+        self._writer = pq.ParquetWriter(self._file, self._schema, compression='zstd')
+
+    def write(self, records: List[Dict[str, Any]]):
+        self._writer.write_table(self._pa.Table.from_pylist(records, schema=self._schema))
+
+    def size(self) -> int:
+        return self._file.tell()
+
+    def close(self):
+        # Writes the footer: the file is only readable after this
+        self._writer.close()
+        self._file.close()
+
+
+class AuditLogger:
+    """
+    Non-blocking audit log of every scored input.
+
+    Requests push records onto a bounded in-memory queue and return.
+    A background thread drains the queue in batches (up to batch_size
+    records, or whatever arrived within flush_interval_s) and writes them
+    to size-rotated files in the directory, one file series per process:
+    'audit-<pid>-<UTC start time>-<seq>.jsonl' or '.parquet'.
+
+    When the queue is full, records are dropped ('drop') or the request
+    waits for room up to block_timeout_s ('block'). Both written and
+    dropped records are counted.
+    """
+
+    SINKS = {'jsonl': _JsonlSink, 'parquet': _ParquetSink}
+
+    def __init__(
+        self, directory: str, file_format: str = 'jsonl', max_queue_size: int = 10000,
+        batch_size: int = 1000, flush_interval_s: float = 1.0, max_file_bytes: int = 100 * 1024 ** 2,
+        queue_full_policy: str = 'drop', block_timeout_s: float = 0.0, metrics: Optional[Metrics] = None
+    ):
+        """
+        Args:
+            directory (str): Where the audit files are written.
+            file_format (str): 'jsonl' or 'parquet'.
+            max_queue_size (int): Maximum queued records.
+            batch_size (int): Maximum records per write.
+            flush_interval_s (float): Maximum time a record waits in the queue.
+            max_file_bytes (int): Rotate to a new file past this size.
+            queue_full_policy (str): 'drop' or 'block' when the queue is full.
+            block_timeout_s (float): Wait limit of the 'block' policy. 0 waits forever.
+            metrics (Optional[Metrics]): Receives written and dropped record counts.
+
+        Raises:
+            ValueError: If the format or the policy is unknown.
+        """
+        if file_format not in self.SINKS:
+            raise ValueError(f"Unknown audit log format '{file_format}'. Expected one of {list(self.SINKS)}.")
+        if queue_full_policy not in ('drop', 'block'):
+            raise ValueError(f"Unknown queue full policy '{queue_full_policy}'. Expected 'drop' or 'block'.")
+
+        self.directory = directory
+        self.file_format = file_format
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_file_bytes = max_file_bytes
+        self.block = queue_full_policy == 'block'
+        self.block_timeout_s = block_timeout_s or None
+        self.metrics = metrics
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._closed = False
+
+        self._sink: Any = None
+        self._file_seq = 0
+        self._series = ''
+        self._written = 0
+        self._dropped = 0
+        self._files = 0
+        self._write_errors = 0
+
+    def _ensure_started(self):
+        """
+        Starts the writer thread on first use, and again after a fork
+        (threads do not survive fork, e.g. gunicorn --preload).
+        """
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._sink = None
+                self._file_seq = 0
+                self._series = f"audit-{self._pid}-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}"
+                self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+                self._thread.start()
+
+    def log(self, record: Dict[str, Any]) -> bool:
+        """
+        Queues one record. Never raises on a full queue.
+
+        Returns:
+            bool: False if the record was dropped.
+        """
+        if self._closed:
+            self._count_dropped(1)
+            return False
+        self._ensure_started()
+
+        try:
+            if self.block:
+                self._queue.put(record, timeout=self.block_timeout_s)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            self._count_dropped(1)
+            return False
+        return True
+
+    def log_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Queues several records. Returns how many were accepted.
+
+        With the block policy, block_timeout_s bounds the whole call, not
+        each record: once it has run out, the remaining records are dropped.
+        """
+        records = list(records)
+        if self._closed:
+            self._count_dropped(len(records))
+            return 0
+        self._ensure_started()
+
+        deadline = None if self.block_timeout_s is None else time.monotonic() + self.block_timeout_s
+        accepted = 0
+        for record in records:
+            try:
+                if self.block:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._queue.put(record, timeout=remaining)
+                else:
+                    self._queue.put_nowait(record)
+            except queue.Full:
+                if self.block:
+                    break
+                continue
+            accepted += 1
+
+        if accepted < len(records):
+            self._count_dropped(len(records) - accepted)
+        return accepted
+
+    def _run(self):
+        """
+        Drain loop of the background thread.
+        """
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                self._close_sink()
+                return
+
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval_s
+            stop = False
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write(batch)
+            if stop:
+                self._drain()
+                self._close_sink()
+                return
+
+    def _drain(self):
+        """
+        Writes whatever is still queued after shutdown was requested.
+        """
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                batch.append(item)
+        for start in range(0, len(batch), self.batch_size):
+            self._write(batch[start:start + self.batch_size])
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        """
+        Writes one batch, rotating the file first if it grew past max_file_bytes.
+        A failed write drops the batch and is counted, the thread keeps running.
+        """
+        try:
+            if self._sink is not None and self._sink.size() >= self.max_file_bytes:
+                self._close_sink()
+            if self._sink is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._file_seq += 1
+                sink_class = self.SINKS[self.file_format]
+                path = os.path.join(self.directory, f"{self._series}-{self._file_seq:05d}.{sink_class.extension}")
+                self._sink = sink_class(path)
+                with self._lock:
+                    self._files += 1
+            self._sink.write(batch)
+        except Exception as e:
+            print(f"[AUDIT_ERROR] Could not write {len(batch)} audit records: {e}")
+            with self._lock:
+                self._write_errors += 1
+            self._count_dropped(len(batch))
+            return
+
+        with self._lock:
+            self._written += len(batch)
+        if self.metrics is not None:
+            self.metrics.count_audit('written', len(batch))
+
+    def _close_sink(self):
+        if self._sink is not None:
+            try:
+                self._sink.close()
+            except Exception as e:
+                print(f"[AUDIT_ERROR] Could not close the audit file: {e}")
+            self._sink = None
+
+    def _count_dropped(self, n: int):
+        with self._lock:
+            self._dropped += n
+        if self.metrics is not None:
+            self.metrics.count_audit('dropped', n)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """
+        Stops accepting records, writes everything queued and closes the file.
+        """
+        self._closed = True
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print("[AUDIT_WARNING] Queue still full at shutdown. Queued audit records may be lost.")
+            return
+        thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of the audit log counters of this process.
+        """
+        with self._lock:
+            return {
+                "format": self.file_format,
+                "written": self._written,
+                "dropped": self._dropped,
+                "files": self._files,
+                "write_errors": self._write_errors,
+                "queue_depth": self._queue.qsize()
+            }
+
+
+# --- Singleton Instance ---
+# Only created when the audit log is enabled.
+audit_logger: Optional[AuditLogger] = None
+if settings.AUDIT_LOG_ENABLED:
+    audit_logger = AuditLogger(
+        directory = settings.AUDIT_LOG_DIR,
+        file_format = settings.AUDIT_LOG_FORMAT,
+        max_queue_size = settings.AUDIT_LOG_MAX_QUEUE_SIZE,
+        batch_size = settings.AUDIT_LOG_BATCH_SIZE,
+        flush_interval_s = settings.AUDIT_LOG_FLUSH_INTERVAL_SECONDS,
+        max_file_bytes = settings.AUDIT_LOG_MAX_FILE_BYTES,
+        queue_full_policy = settings.AUDIT_LOG_QUEUE_FULL_POLICY,
+        block_timeout_s = settings.AUDIT_LOG_BLOCK_TIMEOUT_SECONDS,
+        metrics = metrics
+    )
+    atexit.register(audit_logger.close)
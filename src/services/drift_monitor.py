@@ -0,0 +1,209 @@
+import bisect
+import json
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.config import settings
+from src.services.metrics import SharedCounters
+
+
+def psi(expected: np.ndarray, actual: np.ndarray, epsilon: float = 1e-4) -> float:
+    """
+    Population Stability Index between two distributions over the same bins.
+    Empty bins are floored at epsilon so the log stays finite.
+    """
+    expected = np.maximum(expected, epsilon)
+    actual = np.maximum(actual, epsilon)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+class DriftMonitor:
+    """
+    Online input-drift monitor for the prediction path.
+
+    For every package_size of the reference profile (saved next to the
+    encoders by pre_processing/src/build_dataset.py) it keeps:
+    - a fixed-bin histogram of the live weights, on the profile's
+      equal-frequency bin edges;
+    - the frequency of each predicted product_type.
+
+    Memory is fixed by the profile and an update is one bisect over ~20
+    edges plus two counter increments. No raw traffic is kept. Counters are
+    SharedCounters, so with a shared directory every gunicorn worker writes
+    its own file and scores() merges them by summing.
+
+    Counts are kept in two slots of window_seconds each, the current and
+    the previous wall-clock window, so every worker rotates at the same
+    time. A slot is cleared when it is reused, and scores() merges both:
+    drift is measured on the last one to two windows of traffic, not on
+    everything seen since the counters were created.
+
+    Drift is scored with the Population Stability Index (PSI) of the live
+    distribution against the profile.
+    """
+
+    # PSI rule of thumb: < 0.1 stable, < 0.25 moderate shift, above significant
+    PSI_THRESHOLDS = ((0.1, "stable"), (0.25, "moderate"))
+
+    def __init__(
+        self, profile: Dict[str, Any], directory: Optional[str] = None, min_samples: int = 500,
+        window_seconds: int = 3600
+    ):
+        """
+        Args:
+            profile (Dict[str, Any]): Reference profile, as saved by build_dataset.py.
+            directory (Optional[str]): Shared directory for multi-process merging.
+            min_samples (int): Live samples needed before a size gets a drift status.
+            window_seconds (int): Length of a counting window. 0 never rotates.
+        """
+        self.profile = profile
+        self.min_samples = min_samples
+        self.window_seconds = window_seconds
+
+        sizes = profile["sizes"]
+        self.classes: List[str] = sorted({label for size in sizes.values() for label in size["class_fractions"]})
+        self._class_index = {label: i for i, label in enumerate(self.classes)}
+
+        # Per size: (offset of its weight bins, edges, offset of its class counts).
+        # The last class slot counts labels absent from the profile.
+        self._layout: Dict[str, tuple] = {}
+        offset = 0
+        for size, reference in sizes.items():
+            edges = list(reference["weight_edges"])
+            class_offset = offset + len(edges) + 1
+            self._layout[size] = (offset, edges, class_offset)
+            offset = class_offset + len(self.classes) + 1
+
+        # Per slot: the counters above, then the number of the window it counts
+        self._slot_size = offset + 1
+        self.counters = SharedCounters('drift', 2 * self._slot_size, directory)
+
+    @classmethod
+    def load(
+        cls, path: str, directory: Optional[str] = None, min_samples: int = 500, window_seconds: int = 3600
+    ) -> "DriftMonitor":
+        """
+        Builds a monitor from a reference profile JSON file.
+
+        Raises:
+            FileNotFoundError: If the profile does not exist.
+        """
+        with open(path) as f:
+            return cls(json.load(f), directory, min_samples, window_seconds)
+
+    def _window(self) -> int:
+        """
+        Number of the current wall-clock window (always 0 without rotation).
+        """
+        return int(time.time() // self.window_seconds) if self.window_seconds > 0 else 0
+
+    def _add(self, indexes: List[int]):
+        window = self._window()
+        self.counters.add_many_in_slot(
+            (window % 2) * self._slot_size, self._slot_size, float(window), indexes, [1.0] * len(indexes)
+        )
+
+    def _window_counts(self) -> np.ndarray:
+        """
+        Counts of the current and previous windows, merged over every process.
+        """
+        window = self._window()
+        counts = np.zeros(self._slot_size - 1, dtype=np.float64)
+        for values in self.counters.per_process():
+            for start in (0, self._slot_size):
+                if values[start + self._slot_size - 1] in (window, window - 1):
+                    counts += values[start:start + self._slot_size - 1]
+        return counts
+
+    def _indexes(self, package_weight: float, package_size: str, label: Optional[str]) -> Optional[tuple]:
+        layout = self._layout.get(package_size)
+        if layout is None:
+            return None
+        offset, edges, class_offset = layout
+        class_index = self._class_index.get(label, len(self.classes))
+        return offset + bisect.bisect_right(edges, package_weight), class_offset + class_index
+
+    def observe(self, package_weight: float, package_size: str, label: Optional[str]):
+        """
+        Records one scored input. Sizes unknown to the profile are ignored.
+        """
+        indexes = self._indexes(package_weight, package_size, label)
+        if indexes is not None:
+            self._add(list(indexes))
+
+    def observe_many(
+        self, package_weights: Sequence[float], package_sizes: Sequence[str], labels: Sequence[Optional[str]]
+    ):
+        """
+        Records several scored inputs under a single counter update.
+        """
+        indexes: List[int] = []
+        for weight, size, label in zip(package_weights, package_sizes, labels):
+            item_indexes = self._indexes(weight, size, label)
+            if item_indexes is not None:
+                indexes.extend(item_indexes)
+        if indexes:
+            self._add(indexes)
+
+    def _status(self, score: float) -> str:
+        for threshold, status in self.PSI_THRESHOLDS:
+            if score < threshold:
+                return status
+        return "significant"
+
+    def scores(self) -> Dict[str, Any]:
+        """
+        Drift scores per package_size over the recent windows, merged over every process.
+        """
+        counts = self._window_counts()
+        sizes = {}
+
+        for size, (offset, edges, class_offset) in self._layout.items():
+            reference = self.profile["sizes"][size]
+            weight_counts = counts[offset:class_offset]
+            class_counts = counts[class_offset:class_offset + len(self.classes) + 1]
+            n = int(weight_counts.sum())
+
+            result: Dict[str, Any] = {"live_count": n, "reference_count": reference["count"]}
+            if n < self.min_samples:
+                result["status"] = "insufficient_data"
+                sizes[size] = result
+                continue
+
+            expected_classes = np.array(
+                [reference["class_fractions"].get(label, 0.0) for label in self.classes] + [0.0]
+            )
+            weight_psi = psi(np.asarray(reference["weight_fractions"]), weight_counts / n)
+            class_psi = psi(expected_classes, class_counts / n)
+
+            result.update({
+                "weight_psi": round(weight_psi, 6),
+                "class_psi": round(class_psi, 6),
+                "status": self._status(max(weight_psi, class_psi)),
+                "weight_fractions": [round(float(v), 6) for v in weight_counts / n],
+                "class_fractions": {
+                    label: round(float(v), 6)
+                    for label, v in zip(self.classes + ["<other>"], class_counts / n) if v or label != "<other>"
+                }
+            })
+            sizes[size] = result
+
+        return {
+            "profile_created_at": self.profile.get("created_at"),
+            "min_samples": self.min_samples,
+            "window_seconds": self.window_seconds,
+            "sizes": sizes
+        }
+
+
+# --- Singleton Instance ---
+# Only created when drift monitoring is enabled and the profile loads.
+drift_monitor: Optional[DriftMonitor] = None
+if settings.DRIFT_MONITOR_ENABLED:
+    try:
+        drift_monitor = DriftMonitor.load(
+            settings.DRIFT_PROFILE_PATH, settings.METRICS_DIR, settings.DRIFT_MIN_SAMPLES, settings.DRIFT_WINDOW_SECONDS
+        )
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[DRIFT_ERROR] Could not load the reference profile, drift monitoring is off: {e}")
@@ -0,0 +1,198 @@
+import json
+import os
+import numpy as np
+from typing import Any, Iterator
+
+from src.services.forest_table import TreeArrays, extract_trees, model_classes
+
+
+class ForestArrays:
+    """
+    A random forest stored as flat NumPy arrays, with a vectorized
+    pure-NumPy traversal engine.
+
+    All trees are concatenated into one node table. Leaves point to
+    themselves (left == right == node id, threshold == +inf), so every
+    sample can be advanced max_depth times without branching on leaves.
+
+    Saved as one .npy file per array plus a small meta.json, so each
+    gunicorn worker can np.load(..., mmap_mode='r') the same read-only
+    files and share their pages through the OS page cache.
+    """
+
+    ARRAY_NAMES = ('feature', 'threshold', 'left', 'right', 'value', 'roots', 'classes')
+    FORMAT_VERSION = 1
+
+    # Rows traversed at once, bounds the (rows, trees) work arrays
+    ROWS_PER_BLOCK = 4096
+
+    def __init__(
+        self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+        value: np.ndarray, roots: np.ndarray, classes: np.ndarray, max_depth: int
+    ):
+        """
+        Args:
+            feature (np.ndarray): Split feature per node (0 for leaves).
+            threshold (np.ndarray): Split threshold per node (+inf for leaves).
+            left (np.ndarray): Global id of the left child (self for leaves).
+            right (np.ndarray): Global id of the right child (self for leaves).
+            value (np.ndarray): Class probabilities per node, shape (n_nodes, n_classes).
+            roots (np.ndarray): Global id of the root of every tree.
+            classes (np.ndarray): Class labels, in probability column order.
+            max_depth (int): Depth of the deepest tree.
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = max_depth
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @classmethod
+    def from_trees(cls, trees: list, classes: np.ndarray) -> "ForestArrays":
+        """
+        Builds the flat node table from per-tree TreeArrays.
+        """
+        sizes = [len(tree.feature) for tree in trees]
+        roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+
+        feature, threshold, left, right, value = [], [], [], [], []
+        max_depth = 0
+        for tree, offset in zip(trees, roots):
+            node_ids = np.arange(len(tree.feature), dtype=np.int64) + offset
+            is_leaf = tree.feature < 0
+
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(np.where(is_leaf, node_ids, tree.left + offset))
+            right.append(np.where(is_leaf, node_ids, tree.right + offset))
+            value.append(tree.value)
+            max_depth = max(max_depth, cls._tree_depth(tree))
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.int32),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            left=np.concatenate(left).astype(np.int32),
+            right=np.concatenate(right).astype(np.int32),
+            value=np.concatenate(value).astype(np.float64),
+            roots=roots.astype(np.int32),
+            classes=np.asarray(classes),
+            max_depth=max_depth
+        )
+
+    @classmethod
+    def from_model(cls, model: Any) -> "ForestArrays":
+        """
+        Converts a fitted sklearn or cuML RandomForestClassifier.
+        """
+        return cls.from_trees(extract_trees(model), model_classes(model))
+
+    @staticmethod
+    def _tree_depth(tree: TreeArrays) -> int:
+        depth = np.zeros(len(tree.feature), dtype=np.int64)
+        # Children always have a larger id than their parent in both sklearn and cuML dumps
+        for node in range(len(tree.feature)):
+            if tree.feature[node] >= 0:
+                depth[tree.left[node]] = depth[node] + 1
+                depth[tree.right[node]] = depth[node] + 1
+        return int(depth.max())
+
+    def iter_trees(self) -> Iterator[TreeArrays]:
+        """
+        Yields every tree back as TreeArrays with local node ids (see ForestTable).
+        """
+        ends = np.append(self.roots[1:], len(self.feature))
+        for start, end in zip(self.roots.tolist(), ends.tolist()):
+            node_ids = np.arange(start, end)
+            is_leaf = self.left[start:end] == node_ids
+            yield TreeArrays(
+                feature=np.where(is_leaf, -1, self.feature[start:end]).astype(np.int64),
+                threshold=np.asarray(self.threshold[start:end], dtype=np.float64),
+                left=np.where(is_leaf, -1, self.left[start:end] - start).astype(np.int64),
+                right=np.where(is_leaf, -1, self.right[start:end] - start).astype(np.int64),
+                value=np.asarray(self.value[start:end])
+            )
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Mean class probabilities over all trees.
+
+        Args:
+            X (np.ndarray): Feature matrix, shape (n_samples, n_features).
+
+        Returns:
+            np.ndarray: Probabilities, shape (n_samples, n_classes).
+        """
+        # The trained models score float32 inputs, compare on the same values
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        proba = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+
+        for start in range(0, X.shape[0], self.ROWS_PER_BLOCK):
+            block = X[start:start + self.ROWS_PER_BLOCK]
+            rows = np.arange(block.shape[0])[:, None]
+            nodes = np.broadcast_to(self.roots, (block.shape[0], self.n_estimators))
+
+            for _ in range(self.max_depth):
+                go_left = block[rows, self.feature[nodes]] <= self.threshold[nodes]
+                nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+            proba[start:start + block.shape[0]] = self.value[nodes].mean(axis=1)
+
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predicted class per row (same values as the source model's predict()).
+        """
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def save(self, directory: str):
+        """
+        Writes the arrays as .npy files plus meta.json into directory.
+        """
+        os.makedirs(directory, exist_ok=True)
+        arrays = {name: getattr(self, name) for name in self.ARRAY_NAMES if name != 'classes'}
+        arrays['classes'] = self.classes_
+
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(array), allow_pickle=False)
+
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump({
+                "format_version": self.FORMAT_VERSION,
+                "n_estimators": self.n_estimators,
+                "n_nodes": len(self.feature),
+                "max_depth": self.max_depth
+            }, f, indent=4)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "ForestArrays":
+        """
+        Loads a forest written by save().
+
+        Args:
+            directory (str): The artifact directory.
+            mmap (bool): Memory-map the arrays read-only instead of reading them.
+
+        Raises:
+            FileNotFoundError: If the directory or one of its files is missing.
+            ValueError: If the format version is not supported.
+        """
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+
+        if meta.get("format_version") != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported forest artifact format: {meta.get('format_version')}")
+
+        mmap_mode = 'r' if mmap else None
+        arrays = {
+            name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in cls.ARRAY_NAMES
+        }
+        return cls(max_depth=meta["max_depth"], **arrays)
@@ -0,0 +1,333 @@
+import json
+import bisect
+import numpy as np
+from typing import Any, List, NamedTuple, Optional
+
+
+class TreeArrays(NamedTuple):
+    """
+    Flat, array-based view of a single decision tree.
+
+    Leaves are marked with feature == -1. 'value' holds the class
+    probabilities of every node, shape (n_nodes, n_classes).
+    """
+    feature: np.ndarray
+    threshold: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    value: np.ndarray
+
+
+def _sklearn_tree_arrays(estimator: Any) -> TreeArrays:
+    """
+    Converts a fitted sklearn DecisionTreeClassifier into TreeArrays.
+    """
+    tree = estimator.tree_
+    left = tree.children_left.astype(np.int64)
+    is_leaf = left == -1
+
+    value = tree.value[:, 0, :].astype(np.float64)
+    totals = value.sum(axis=1, keepdims=True)
+    value = np.divide(value, totals, out=np.zeros_like(value), where=totals > 0)
+
+    return TreeArrays(
+        feature=np.where(is_leaf, -1, tree.feature).astype(np.int64),
+        threshold=tree.threshold.astype(np.float64),
+        left=left,
+        right=tree.children_right.astype(np.int64),
+        value=value
+    )
+
+
+def _cuml_tree_arrays(tree_json: dict, n_classes: int) -> TreeArrays:
+    """
+    Converts one tree of a cuML RandomForestClassifier JSON dump into TreeArrays.
+
+    cuML sends a sample left when x <= split_threshold, same as sklearn.
+    """
+    nodes = []
+    stack = [tree_json]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.get("children", []))
+
+    position = {node["nodeid"]: i for i, node in enumerate(nodes)}
+    n_nodes = len(nodes)
+
+    feature = np.full(n_nodes, -1, dtype=np.int64)
+    threshold = np.zeros(n_nodes, dtype=np.float64)
+    left = np.full(n_nodes, -1, dtype=np.int64)
+    right = np.full(n_nodes, -1, dtype=np.int64)
+    value = np.zeros((n_nodes, n_classes), dtype=np.float64)
+
+    for i, node in enumerate(nodes):
+        if "children" in node:
+            feature[i] = node["split_feature"]
+            threshold[i] = node["split_threshold"]
+            left[i] = position[node["yes"]]
+            right[i] = position[node["no"]]
+        else:
+            leaf_value = node["leaf_value"]
+            if isinstance(leaf_value, list):
+                value[i] = leaf_value
+            else:
+                # Older cuML versions store the voted class id instead of probabilities
+                value[i, int(leaf_value)] = 1.0
+
+    # The root was visited first, so it is node 0 as the traversal code expects
+    return TreeArrays(feature, threshold, left, right, value)
+
+
+def extract_trees(model: Any) -> List[TreeArrays]:
+    """
+    Extracts every tree of a fitted random forest as TreeArrays.
+
+    Supports sklearn RandomForestClassifier, cuML RandomForestClassifier,
+    ForestArrays and a single sklearn DecisionTreeClassifier.
+
+    Args:
+        model (Any): The fitted forest.
+
+    Returns:
+        List[TreeArrays]: One entry per tree.
+
+    Raises:
+        TypeError: If the model type is not supported.
+    """
+    if hasattr(model, "iter_trees"):
+        # ForestArrays (see forest_engine.py)
+        return list(model.iter_trees())
+
+    if hasattr(model, "estimators_"):
+        return [_sklearn_tree_arrays(estimator) for estimator in model.estimators_]
+
+    if hasattr(model, "tree_"):
+        # A single tree, e.g. a forest distilled by modelling/src/compress_forest.py
+        return [_sklearn_tree_arrays(model)]
+
+    if hasattr(model, "get_json"):
+        n_classes = len(model_classes(model))
+        return [_cuml_tree_arrays(tree, n_classes) for tree in json.loads(model.get_json())]
+
+    raise TypeError(f"Cannot extract trees from model of type '{type(model).__name__}'.")
+
+
+def model_classes(model: Any) -> np.ndarray:
+    """
+    Returns the class labels the model predicts, in probability column order.
+    """
+    classes = getattr(model, "classes_", None)
+    if classes is None:
+        n_classes = getattr(model, "num_classes", None) or getattr(model, "n_classes_")
+        classes = np.arange(n_classes)
+    if hasattr(classes, "get"):
+        # CuPy array -> NumPy array
+        classes = classes.get()
+    return np.asarray(classes)
+
+
+def tree_predict_proba(tree: TreeArrays, X: np.ndarray) -> np.ndarray:
+    """
+    Vectorized traversal of one tree for all rows of X.
+
+    Args:
+        tree (TreeArrays): The tree to evaluate.
+        X (np.ndarray): Feature matrix, shape (n_samples, n_features).
+
+    Returns:
+        np.ndarray: Class probabilities, shape (n_samples, n_classes).
+    """
+    rows = np.arange(X.shape[0])
+    node = np.zeros(X.shape[0], dtype=np.int64)
+    active = tree.feature[node] >= 0
+
+    while active.any():
+        n = node[active]
+        go_left = X[rows[active], tree.feature[n]] <= tree.threshold[n]
+        node[active] = np.where(go_left, tree.left[n], tree.right[n])
+        active = tree.feature[node] >= 0
+
+    return tree.value[node]
+
+
+class ForestTable:
+    """
+    A random forest compiled into a piecewise-constant lookup table.
+
+    The model has only two features: a continuous weight and a size code
+    with a handful of values. For a fixed size code, the forest output only
+    changes at the weight split thresholds, so each size code is stored as
+    a sorted array of thresholds plus the class and vote fractions of
+    every interval between them. Inference becomes a np.searchsorted call.
+    """
+
+    def __init__(self, thresholds: List[np.ndarray], proba: List[np.ndarray], classes: np.ndarray):
+        """
+        Args:
+            thresholds (List[np.ndarray]): Per size code, sorted weight thresholds (n,).
+            proba (List[np.ndarray]): Per size code, vote fractions per interval (n + 1, n_classes).
+            classes (np.ndarray): Class labels, in probability column order.
+        """
+        self.thresholds = thresholds
+        self.proba = proba
+        self.classes = classes
+        self.class_index = [p.argmax(axis=1) for p in proba]
+
+        # Plain Python copies for the scalar path, where bisect beats NumPy call overhead
+        self._thresholds_list = [t.tolist() for t in thresholds]
+        self._classes_list = [classes[i].tolist() for i in self.class_index]
+
+    @classmethod
+    def compile(
+        cls, model: Any, n_size_codes: int,
+        weight_feature: int = 0, size_feature: int = 1
+    ) -> "ForestTable":
+        """
+        Compiles a fitted forest into a ForestTable.
+
+        Args:
+            model (Any): The fitted forest (see extract_trees()).
+            n_size_codes (int): Number of encoded 'package_size' values.
+            weight_feature (int): Column index of 'package_weight_gr'.
+            size_feature (int): Column index of 'package_size'.
+
+        Returns:
+            ForestTable: The compiled table.
+        """
+        trees = extract_trees(model)
+        classes = model_classes(model)
+
+        all_thresholds = np.unique(np.concatenate(
+            [tree.threshold[tree.feature == weight_feature] for tree in trees] + [np.empty(0)]
+        ))
+
+        # One representative weight per interval (t[i-1], t[i]]: its right edge,
+        # plus any value above the last threshold
+        points = np.append(all_thresholds, np.inf if all_thresholds.size == 0 else all_thresholds[-1] + 1.0)
+
+        thresholds, proba = [], []
+        for size_code in range(n_size_codes):
+            X = np.zeros((points.size, 2), dtype=np.float64)
+            X[:, weight_feature] = points
+            X[:, size_feature] = size_code
+
+            votes = sum(tree_predict_proba(tree, X) for tree in trees) / len(trees)
+
+            # Merge neighbouring intervals with identical votes
+            changes = np.flatnonzero(np.any(votes[1:] != votes[:-1], axis=1))
+            thresholds.append(all_thresholds[changes])
+            proba.append(votes[np.append(changes, points.size - 1)])
+
+        return cls(thresholds, proba, classes)
+
+    def _interval_index(self, weights: np.ndarray, size_code: int) -> np.ndarray:
+        # Models score float32 inputs, so compare on the same rounded values
+        weights = np.asarray(weights, dtype=np.float32).astype(np.float64)
+        return np.searchsorted(self.thresholds[size_code], weights, side="left")
+
+    def predict(self, weights: np.ndarray, size_codes: np.ndarray) -> np.ndarray:
+        """
+        Predicts the class of every (weight, size code) pair.
+
+        Args:
+            weights (np.ndarray): Package weights in grams.
+            size_codes (np.ndarray): Encoded package sizes, aligned with the weights.
+
+        Returns:
+            np.ndarray: The predicted classes (same values as model.predict).
+        """
+        weights = np.asarray(weights)
+        size_codes = np.asarray(size_codes)
+        class_index = np.empty(weights.shape[0], dtype=np.int64)
+
+        for size_code in np.unique(size_codes).tolist():
+            mask = size_codes == size_code
+            intervals = self._interval_index(weights[mask], size_code)
+            class_index[mask] = self.class_index[size_code][intervals]
+
+        return self.classes[class_index]
+
+    def predict_one(self, weight: float, size_code: int) -> Any:
+        """
+        Scalar version of predict() for the single-request path.
+        """
+        interval = bisect.bisect_left(self._thresholds_list[size_code], float(np.float32(weight)))
+        return self._classes_list[size_code][interval]
+
+    def predict_proba(self, weights: np.ndarray, size_codes: np.ndarray) -> np.ndarray:
+        """
+        Returns the forest vote fractions of every (weight, size code) pair.
+        """
+        weights = np.asarray(weights)
+        size_codes = np.asarray(size_codes)
+        proba = np.empty((weights.shape[0], len(self.classes)), dtype=np.float64)
+
+        for size_code in np.unique(size_codes).tolist():
+            mask = size_codes == size_code
+            proba[mask] = self.proba[size_code][self._interval_index(weights[mask], size_code)]
+
+        return proba
+
+    def verify(self, model: Any, n_points: int, feature_names: Optional[List[str]] = None) -> int:
+        """
+        Checks the table against model.predict over a dense weight grid.
+
+        The grid spans all thresholds with a margin and also includes every
+        threshold itself and its float32 neighbours, where an off-by-one in
+        the interval logic would show up first.
+
+        Args:
+            model (Any): The forest the table was compiled from.
+            n_points (int): Number of evenly spaced grid points per size code.
+            feature_names (Optional[List[str]]): Column names for the model input, if needed.
+
+        Returns:
+            int: Number of grid points where the table and the model disagree.
+        """
+        known = np.concatenate(self.thresholds)
+        if known.size == 0:
+            known = np.array([0.0, 1000.0])
+        low, high = known.min(), known.max()
+        margin = max(high - low, 1.0) * 0.1
+
+        grid = np.linspace(low - margin, high + margin, n_points)
+        edges = known.astype(np.float32)
+        grid = np.concatenate([
+            grid, edges,
+            np.nextafter(edges, np.float32(-np.inf)), np.nextafter(edges, np.float32(np.inf))
+        ]).astype(np.float64)
+
+        mismatches = 0
+        for size_code in range(len(self.thresholds)):
+            size_codes = np.full(grid.size, size_code)
+            X = np.column_stack([grid, size_codes]).astype(np.float64)
+            if feature_names is not None:
+                import pandas as pd
+                X = pd.DataFrame(X, columns=feature_names)
+
+            expected = np.asarray(model.predict(X))
+            if hasattr(expected, "get"):
+                expected = expected.get()
+
+            mismatches += int(np.sum(self.predict(grid, size_codes) != expected.ravel()))
+
+        return mismatches
+
+
+if __name__ == "__main__":
+    # Offline compile + equivalence check against the served artifacts
+    import joblib
+    from src.config import settings
+    from src.services.prediction_service import PredictionService
+
+    model = joblib.load(settings.MODEL_PATH)
+    size_encoder = joblib.load(settings.SIZE_ENCODER_PATH)
+
+    table = ForestTable.compile(model, n_size_codes=len(size_encoder.classes_))
+    for size_code, size_label in enumerate(size_encoder.classes_):
+        print(f"{size_label}: {table.thresholds[size_code].size + 1} intervals")
+
+    mismatches = table.verify(model, n_points=100_000, feature_names=PredictionService.MODEL_EXPECTED_COLS)
+    print(f"Mismatches against model.predict: {mismatches}")
+    raise SystemExit(1 if mismatches else 0)
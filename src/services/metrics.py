@@ -0,0 +1,293 @@
+import bisect
+import glob
+import os
+import threading
+import numpy as np
+from typing import List, Optional, Sequence
+
+from src.config import settings
+
+
+class SharedCounters:
+    """
+    A fixed-size array of float64 counters that can be summed across processes.
+
+    Without a directory the counters live in process memory. With a
+    directory, every process writes to its own memory-mapped file
+    '<name>_<pid>.db' and aggregate() sums all files, so gunicorn
+    workers never contend on a shared lock. Files are created lazily,
+    so a process forked after import gets its own file. A file left by
+    a dead process with the same pid is reopened and added to, never
+    truncated, so aggregated counters never go backwards.
+    """
+
+    def __init__(self, name: str, size: int, directory: Optional[str] = None):
+        """
+        Args:
+            name (str): File name prefix, unique per counter set.
+            size (int): Number of counters.
+            directory (Optional[str]): Shared directory for multi-process mode.
+        """
+        self.name = name
+        self.size = size
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._values: Optional[np.ndarray] = None
+        self._pid: Optional[int] = None
+
+    def _local_values(self) -> np.ndarray:
+        """
+        Returns this process's counter array, creating it on first use.
+        """
+        if self._values is not None and self._pid == os.getpid():
+            return self._values
+
+        if self.directory is None:
+            values = np.zeros(self.size, dtype=np.float64)
+        else:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f'{self.name}_{os.getpid()}.db')
+            reuse = os.path.exists(path) and os.path.getsize(path) == self.size * np.dtype(np.float64).itemsize
+            values = np.memmap(path, dtype=np.float64, mode='r+' if reuse else 'w+', shape=(self.size,))
+
+        self._values, self._pid = values, os.getpid()
+        return values
+
+    def add(self, index: int, amount: float = 1.0):
+        """
+        Adds amount to one counter of this process.
+        """
+        with self._lock:
+            self._local_values()[index] += amount
+
+    def add_many(self, indexes: Sequence[int], amounts: Sequence[float]):
+        """
+        Adds several amounts under a single lock acquisition.
+        """
+        with self._lock:
+            values = self._local_values()
+            for index, amount in zip(indexes, amounts):
+                values[index] += amount
+
+    def add_many_in_slot(
+        self, start: int, size: int, stamp: float, indexes: Sequence[int], amounts: Sequence[float]
+    ):
+        """
+        Adds amounts to the slot of size counters at start, whose last
+        counter holds a stamp (e.g. a time window number). A slot stamped
+        with another value is zeroed and restamped first. Indexes are
+        relative to start.
+        """
+        with self._lock:
+            values = self._local_values()
+            if values[start + size - 1] != stamp:
+                values[start:start + size - 1] = 0.0
+                values[start + size - 1] = stamp
+            for index, amount in zip(indexes, amounts):
+                values[start + index] += amount
+
+    def per_process(self) -> List[np.ndarray]:
+        """
+        Returns the counters of every process, one array each.
+        """
+        if self.directory is None:
+            with self._lock:
+                return [self._local_values().copy()]
+
+        arrays = []
+        for path in glob.glob(os.path.join(self.directory, f'{self.name}_*.db')):
+            values = np.fromfile(path, dtype=np.float64)
+            if values.size == self.size:
+                arrays.append(values)
+        return arrays
+
+    def aggregate(self) -> np.ndarray:
+        """
+        Returns the sum of the counters of every process.
+        """
+        total = np.zeros(self.size, dtype=np.float64)
+        for values in self.per_process():
+            total += values
+        return total
+
+
+class Metrics:
+    """
+    Fixed-bucket latency histograms per stage and HTTP request counts
+    per status code, rendered in Prometheus text format.
+    """
+
+    # Histogram bucket upper bounds, in seconds
+    BUCKETS = (
+        5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+        1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0
+    )
+
+    STAGES = (
+        'request', 'json_parse', 'validation', 'predict', 'serialization',
+        'size_encoding', 'inference', 'label_decoding', 'shadow_inference',
+        'batch_queue_wait'
+    )
+
+    # Micro-batch size histogram bucket upper bounds (see src/services/micro_batcher.py)
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+    STATUS_CODES = (200, 202, 400, 401, 404, 405, 409, 413, 415, 422, 429, 500, 503, 504)
+
+    # Why admission control shed a request (see src/services/admission.py)
+    SHED_REASONS = ('in_flight_limit', 'deadline_expired', 'deadline_unmeetable', 'queue_full')
+
+    # Outcomes of audit log records (see src/services/audit_log.py)
+    AUDIT_RESULTS = ('written', 'dropped')
+
+    # Outcomes of shadow-scored inputs (see src/services/shadow_scorer.py)
+    SHADOW_RESULTS = ('agree', 'disagree', 'dropped', 'error', 'unscored')
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+            directory (Optional[str]): Shared directory for multi-process aggregation.
+        """
+        # Per stage: one count per bucket (+Inf included), then sum, then count
+        self._stride = len(self.BUCKETS) + 3
+        self._stage_offset = {stage: i * self._stride for i, stage in enumerate(self.STAGES)}
+        self._status_index = {code: i for i, code in enumerate(self.STATUS_CODES)}
+
+        self.histograms = SharedCounters('histograms', len(self.STAGES) * self._stride, directory)
+        # Last slot counts any status code not listed in STATUS_CODES
+        self.statuses = SharedCounters('statuses', len(self.STATUS_CODES) + 1, directory)
+        self._shed_index = {reason: i for i, reason in enumerate(self.SHED_REASONS)}
+        self.shed = SharedCounters('shed', len(self.SHED_REASONS), directory)
+        self._audit_index = {result: i for i, result in enumerate(self.AUDIT_RESULTS)}
+        self.audit = SharedCounters('audit', len(self.AUDIT_RESULTS), directory)
+        self._shadow_index = {result: i for i, result in enumerate(self.SHADOW_RESULTS)}
+        self.shadow = SharedCounters('shadow', len(self.SHADOW_RESULTS), directory)
+        # One count per batch size bucket (+Inf included), then items, then batches
+        self.batches = SharedCounters('batches', len(self.BATCH_SIZE_BUCKETS) + 3, directory)
+
+    def observe(self, stage: str, seconds: float):
+        """
+        Records one duration for a stage.
+        """
+        offset = self._stage_offset[stage]
+        bucket = bisect.bisect_left(self.BUCKETS, seconds)
+        self.histograms.add_many(
+            (offset + bucket, offset + self._stride - 2, offset + self._stride - 1),
+            (1.0, seconds, 1.0)
+        )
+
+    def observe_many(self, stage: str, durations: Sequence[float]):
+        """
+        Records several durations for a stage under a single lock acquisition.
+        """
+        offset = self._stage_offset[stage]
+        indexes: List[int] = []
+        amounts: List[float] = []
+        for seconds in durations:
+            bucket = bisect.bisect_left(self.BUCKETS, seconds)
+            indexes += (offset + bucket, offset + self._stride - 2, offset + self._stride - 1)
+            amounts += (1.0, seconds, 1.0)
+        self.histograms.add_many(indexes, amounts)
+
+    def count_batch(self, size: int):
+        """
+        Counts one micro-batch of size requests.
+        """
+        n_buckets = len(self.BATCH_SIZE_BUCKETS) + 1
+        self.batches.add_many(
+            (bisect.bisect_left(self.BATCH_SIZE_BUCKETS, size), n_buckets, n_buckets + 1),
+            (1.0, size, 1.0)
+        )
+
+    def count_status(self, status_code: int):
+        """
+        Counts one HTTP response by status code.
+        """
+        self.statuses.add(self._status_index.get(status_code, len(self.STATUS_CODES)))
+
+    def count_shed(self, reason: str):
+        """
+        Counts one request shed by admission control.
+        """
+        self.shed.add(self._shed_index[reason])
+
+    def count_audit(self, result: str, n: int):
+        """
+        Counts n audit log records as written or dropped.
+        """
+        self.audit.add(self._audit_index[result], n)
+
+    def count_shadow(self, result: str, n: int):
+        """
+        Counts n shadow-scored inputs by outcome.
+        """
+        self.shadow.add(self._shadow_index[result], n)
+
+    def render(self) -> str:
+        """
+        Returns all metrics, aggregated over every process, in Prometheus text format.
+        """
+        histograms = self.histograms.aggregate()
+        lines: List[str] = [
+            "# HELP prediction_stage_duration_seconds Time spent in each stage of a prediction request.",
+            "# TYPE prediction_stage_duration_seconds histogram"
+        ]
+        bounds = [repr(bound) for bound in self.BUCKETS] + ["+Inf"]
+
+        for stage, offset in self._stage_offset.items():
+            counts = histograms[offset:offset + len(bounds)]
+            for bound, cumulative in zip(bounds, np.cumsum(counts)):
+                lines.append(f'prediction_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {int(cumulative)}')
+            lines.append(f'prediction_stage_duration_seconds_sum{{stage="{stage}"}} {float(histograms[offset + self._stride - 2])!r}')
+            lines.append(f'prediction_stage_duration_seconds_count{{stage="{stage}"}} {int(histograms[offset + self._stride - 1])}')
+
+        statuses = self.statuses.aggregate()
+        lines += [
+            "# HELP http_requests_total HTTP responses by status code.",
+            "# TYPE http_requests_total counter"
+        ]
+        for code, index in list(self._status_index.items()) + [("other", len(self.STATUS_CODES))]:
+            lines.append(f'http_requests_total{{status="{code}"}} {int(statuses[index])}')
+
+        shed = self.shed.aggregate()
+        lines += [
+            "# HELP prediction_requests_shed_total Requests rejected by admission control, by reason.",
+            "# TYPE prediction_requests_shed_total counter"
+        ]
+        for reason, index in self._shed_index.items():
+            lines.append(f'prediction_requests_shed_total{{reason="{reason}"}} {int(shed[index])}')
+
+        audit = self.audit.aggregate()
+        lines += [
+            "# HELP prediction_audit_records_total Audit log records, by outcome.",
+            "# TYPE prediction_audit_records_total counter"
+        ]
+        for result, index in self._audit_index.items():
+            lines.append(f'prediction_audit_records_total{{result="{result}"}} {int(audit[index])}')
+
+        shadow = self.shadow.aggregate()
+        lines += [
+            "# HELP prediction_shadow_items_total Inputs handed to the shadow model, by outcome.",
+            "# TYPE prediction_shadow_items_total counter"
+        ]
+        for result, index in self._shadow_index.items():
+            lines.append(f'prediction_shadow_items_total{{result="{result}"}} {int(shadow[index])}')
+
+        batches = self.batches.aggregate()
+        n_buckets = len(self.BATCH_SIZE_BUCKETS) + 1
+        lines += [
+            "# HELP prediction_micro_batch_size Requests per micro-batch model call.",
+            "# TYPE prediction_micro_batch_size histogram"
+        ]
+        batch_bounds = [str(bound) for bound in self.BATCH_SIZE_BUCKETS] + ["+Inf"]
+        for bound, cumulative in zip(batch_bounds, np.cumsum(batches[:n_buckets])):
+            lines.append(f'prediction_micro_batch_size_bucket{{le="{bound}"}} {int(cumulative)}')
+        lines.append(f'prediction_micro_batch_size_sum {int(batches[n_buckets])}')
+        lines.append(f'prediction_micro_batch_size_count {int(batches[n_buckets + 1])}')
+
+        return "\n".join(lines) + "\n"
+
+
+# --- Singleton Instance ---
+# METRICS_DIR must be shared by all gunicorn workers (see start_api.sh).
+metrics: Optional[Metrics] = Metrics(settings.METRICS_DIR) if settings.METRICS_ENABLED else None
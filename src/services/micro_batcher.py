@@ -0,0 +1,261 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.config import settings
+from src.services.metrics import Metrics, metrics
+from src.services.prediction_service import prediction_service
+
+
+class _PendingPrediction(NamedTuple):
+    package_weight: float
+    package_size: str
+    enqueued_at: float
+    future: Future
+
+
+# Marks the end of the queue on shutdown
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single predictions into one vectorized model call.
+
+    Requests are queued and a background thread flushes them as soon as
+    the batch reaches max_batch_size or the oldest request has waited
+    max_wait_us microseconds. Each caller blocks on its own Future,
+    which resolves to (label, model version) of the batch that scored it.
+    With a lookup, inputs it answers (e.g. prediction cache hits) resolve
+    at once, without waiting for a batch.
+    """
+
+    # Upper bounds of the batch size histogram buckets
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+    def __init__(
+        self, predict_batch: Callable[[Sequence[float], Sequence[str]], Tuple[List[Optional[str]], str]],
+        max_batch_size: int, max_wait_us: int, max_queue_size: int = 0,
+        lookup: Optional[Callable[[float, str], Optional[Tuple[str, str]]]] = None,
+        metrics: Optional[Metrics] = None
+    ):
+        """
+        Args:
+            predict_batch (Callable): Vectorized scorer returning (labels, model version),
+                e.g. PredictionService.predict_batch_versioned.
+            max_batch_size (int): Flush when this many requests are queued.
+            max_wait_us (int): Flush when the oldest request waited this long (microseconds).
+            max_queue_size (int): Maximum queued requests. 0 means unbounded.
+            lookup (Optional[Callable]): Returns (label, model version) for an input
+                that needs no scoring, or None, e.g. PredictionService.cached_versioned.
+            metrics (Optional[Metrics]): Receives batch sizes and queue waits.
+        """
+        self.predict_batch = predict_batch
+        self.lookup = lookup
+        self.metrics = metrics
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_us / 1e6
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._closed = False
+
+        self._batches = 0
+        self._items = 0
+        self._max_batch = 0
+        self._batch_size_counts = [0] * (len(self.BATCH_SIZE_BUCKETS) + 1)
+        self._wait_sum_s = 0.0
+        self._wait_max_s = 0.0
+
+    def _ensure_started(self):
+        """
+        Starts the flush thread on first use, and again after a fork
+        (threads do not survive fork, e.g. gunicorn --preload).
+        """
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, package_weight: float, package_size: str) -> Future:
+        """
+        Queues one prediction and returns a Future resolving to (label, model version).
+
+        Raises:
+            RuntimeError: If the batcher is closed.
+            queue.Full: If the queue is bounded and full.
+        """
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed.")
+
+        future: Future = Future()
+        if self.lookup is not None:
+            hit = self.lookup(package_weight, package_size)
+            if hit is not None:
+                future.set_result(hit)
+                return future
+
+        self._ensure_started()
+        self._queue.put_nowait(_PendingPrediction(package_weight, package_size, time.perf_counter(), future))
+        return future
+
+    def predict_versioned(
+        self, package_weight: float, package_size: str, timeout: Optional[float] = None
+    ) -> Tuple[str, str]:
+        """
+        Blocking drop-in for PredictionService.predict_versioned().
+
+        Raises:
+            ValueError: If the input 'package_size' is unknown.
+        """
+        return self.submit(package_weight, package_size).result(timeout=timeout)
+
+    def _run(self):
+        """
+        Flush loop of the background thread.
+        """
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = [first]
+            deadline = first.enqueued_at + self.max_wait_s
+            stop = False
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+            if stop:
+                self._drain()
+                return
+
+    def _drain(self):
+        """
+        Flushes whatever is still queued after shutdown was requested.
+        """
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                batch.append(item)
+        for start in range(0, len(batch), self.max_batch_size):
+            self._flush(batch[start:start + self.max_batch_size])
+
+    def _flush(self, batch: List[_PendingPrediction]):
+        """
+        Scores one batch with a single model call and resolves its futures.
+        """
+        started_at = time.perf_counter()
+        self._record(batch, started_at)
+
+        try:
+            labels, model_version = self.predict_batch(
+                [item.package_weight for item in batch],
+                [item.package_size for item in batch]
+            )
+        except Exception as e:
+            for item in batch:
+                item.future.set_exception(e)
+            return
+
+        for item, label in zip(batch, labels):
+            if label is None:
+                item.future.set_exception(
+                    ValueError(f"Invalid or unknown 'package_size' value: '{item.package_size}'")
+                )
+            else:
+                item.future.set_result((label, model_version))
+
+    def _record(self, batch: List[_PendingPrediction], flushed_at: float):
+        """
+        Updates the batch size and queue wait counters.
+        """
+        size = len(batch)
+        waits = [flushed_at - item.enqueued_at for item in batch]
+
+        bucket = next(
+            (i for i, bound in enumerate(self.BATCH_SIZE_BUCKETS) if size <= bound),
+            len(self.BATCH_SIZE_BUCKETS)
+        )
+        with self._lock:
+            self._batches += 1
+            self._items += size
+            self._max_batch = max(self._max_batch, size)
+            self._batch_size_counts[bucket] += 1
+            self._wait_sum_s += sum(waits)
+            self._wait_max_s = max(self._wait_max_s, max(waits))
+
+        if self.metrics is not None:
+            self.metrics.count_batch(size)
+            self.metrics.observe_many('batch_queue_wait', waits)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """
+        Stops accepting requests, flushes everything queued and stops the thread.
+        """
+        self._closed = True
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print("[BATCHER_WARNING] Queue still full at shutdown. Pending requests may be lost.")
+            return
+        thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of the batching counters.
+        """
+        with self._lock:
+            bounds = [str(bound) for bound in self.BATCH_SIZE_BUCKETS] + ["+Inf"]
+            return {
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+                "max_batch_size": self._max_batch,
+                "batch_size_histogram": dict(zip(bounds, self._batch_size_counts)),
+                "avg_queue_wait_us": round(self._wait_sum_s / self._items * 1e6, 1) if self._items else 0.0,
+                "max_queue_wait_us": round(self._wait_max_s * 1e6, 1),
+                "queue_depth": self._queue.qsize()
+            }
+
+
+# --- Singleton Instance ---
+# Only created when micro-batching is enabled and the service is available.
+micro_batcher: Optional[MicroBatcher] = None
+if settings.MICRO_BATCHING_ENABLED and prediction_service is not None:
+    # Behind the prediction cache when it is on: hits skip the queue, and
+    # misses are scored on quantized weights and stored, like the direct path
+    micro_batcher = MicroBatcher(
+        predict_batch = prediction_service.predict_batch_caching_versioned,
+        max_batch_size = settings.MICRO_BATCH_MAX_SIZE,
+        max_wait_us = settings.MICRO_BATCH_MAX_WAIT_US,
+        max_queue_size = settings.MICRO_BATCH_MAX_QUEUE_SIZE,
+        lookup = prediction_service.cached_versioned if prediction_service.cache is not None else None,
+        metrics = metrics
+    )
+    atexit.register(micro_batcher.close)
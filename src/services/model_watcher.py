@@ -0,0 +1,110 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from src.config import settings
+from src.services.artifacts import artifact_versions
+from src.services.prediction_service import PredictionService, prediction_service
+
+
+class ModelWatcher:
+    """
+    Polls the artifact files of a PredictionService and triggers a hot
+    reload when they change.
+
+    A change is only acted upon once the files look the same on two
+    consecutive polls, so a reload never starts on a half-copied file.
+    A reload that fails is retried on the next poll until it succeeds or
+    the files change again. Deploy new artifacts by writing them next to
+    the old ones and renaming them into place.
+    """
+
+    def __init__(self, service: PredictionService, interval_s: float):
+        """
+        Args:
+            service (PredictionService): The service to reload.
+            interval_s (float): Seconds between two polls.
+        """
+        self.service = service
+        self.interval_s = interval_s
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _fingerprint(path: str) -> Tuple:
+        """
+        (mtime, size) of a file, or of every file of a ForestArrays directory.
+        """
+        try:
+            if os.path.isdir(path):
+                return tuple(
+                    (name, os.stat(os.path.join(path, name)).st_mtime_ns, os.stat(os.path.join(path, name)).st_size)
+                    for name in sorted(os.listdir(path))
+                )
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            # Missing while being replaced, the next poll will see it again
+            return ()
+
+    def _snapshot(self) -> Dict[str, Tuple]:
+        return {key: self._fingerprint(path) for key, path in self.service.artifacts.paths.items()}
+
+    def start(self):
+        """
+        Starts the polling thread, once per process (threads do not survive fork).
+        """
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        """
+        Polling loop of the background thread.
+        """
+        current = self._snapshot()
+        pending: Optional[Dict[str, Tuple]] = None
+        try:
+            if artifact_versions(self.service.artifacts.paths)[0] != self.service.model_version:
+                # Replaced since they were loaded, e.g. by a preloaded gunicorn
+                # master that forked this worker: reload once they settle
+                current = {}
+        except OSError:
+            pass
+
+        while not self._stop.wait(self.interval_s):
+            snapshot = self._snapshot()
+            if snapshot == current or not all(snapshot.values()):
+                pending = None
+                continue
+
+            if snapshot != pending:
+                # Changed since the last poll, wait until it settles
+                pending = snapshot
+                continue
+
+            print("[WATCHER_INFO] Artifact files changed. Reloading model...")
+            if not self.service.reload(wait=True):
+                # Another reload is running, try again on the next poll
+                continue
+            if self.service.reload_status()["state"] == "ok":
+                current = snapshot
+                pending = None
+            else:
+                print(f"[WATCHER_WARNING] Reload failed, retrying in {self.interval_s}s.")
+
+
+# --- Singleton Instance ---
+# Only created when file watching is enabled and the service is available.
+model_watcher: Optional[ModelWatcher] = None
+if settings.MODEL_WATCH_INTERVAL_SECONDS > 0 and prediction_service is not None:
+    model_watcher = ModelWatcher(prediction_service, settings.MODEL_WATCH_INTERVAL_SECONDS)
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class PredictionCache:
+    """
+    Bounded, thread-safe LRU cache for single predictions.
+
+    Entries are evicted when the cache is full (least recently used first)
+    and, if a TTL is set, when they are older than the TTL.
+    Weights are quantized before building the key, so readings that only
+    differ beyond the scale precision share one entry.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float = 0.0, weight_decimals: int = 2):
+        """
+        Args:
+            max_size (int): Maximum number of entries kept.
+            ttl_seconds (float): Entry lifetime in seconds. 0 disables expiry.
+            weight_decimals (int): Decimals kept when quantizing weights.
+
+        Raises:
+            ValueError: If max_size is not positive.
+        """
+        if max_size <= 0:
+            raise ValueError("'max_size' must be a positive integer.")
+
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.weight_decimals = weight_decimals
+
+        self._entries: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def quantize(self, weight: float) -> float:
+        """
+        Rounds a weight to the cache precision.
+        """
+        return round(weight, self.weight_decimals)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns the cached value for key, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if self.ttl_seconds and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Stores value under key, evicting the least recently used entry if full.
+        """
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0.0
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drops all entries. Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of the cache counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -1,7 +1,15 @@
-import joblib
-import pandas as pd
+import os
+import threading
+import time
+import numpy as np
+from datetime import datetime, timezone
 from src.config import settings
-from typing import Optional, Any
+from src.services.artifacts import ArtifactSet
+from src.services.forest_table import ForestTable
+from src.services.prediction_cache import PredictionCache
+from src.services.metrics import Metrics, metrics
+from typing import Optional, Any, Dict, List, Sequence, Tuple
+
 
 class PredictionService:
     """
@@ -9,37 +17,59 @@ class PredictionService:
     
     This class loads artifacts on initialization and provides
     a clean method for making predictions.
+    
+    predict() is the allocation-light hot path: plain dict lookups for
+    encoding/decoding and a reused per-thread input buffer. The original
+    pandas/sklearn-encoder path is kept as predict_reference().
+    
+    Artifacts live in an immutable ArtifactSet that reload() replaces
+    atomically: every request reads the current set once and finishes
+    on it, and the *_versioned methods report which version served it.
     """
     
     # Expected feature order for the model
     MODEL_EXPECTED_COLS = ['package_weight_gr', 'package_size']
 
-    def __init__(self, model_path: str, size_encoder_path: str, type_encoder_path: str):
+    # Grid scored on a reload candidate before it is swapped in
+    RELOAD_WARM_UP_POINTS = 64
+    WARM_UP_MAX_WEIGHT_GR = 2000.0
+
+    def __init__(
+        self, model_path: str, size_encoder_path: str, type_encoder_path: str,
+        compile_forest: bool = False, cache: Optional[PredictionCache] = None,
+        metrics: Optional[Metrics] = None
+    ):
         """
         Initializes the service by loading all required artifacts.
         
         Args:
-            model_path (str): Path to the model.pkl file.
+            model_path (str): Path to the model.pkl file, or to a ForestArrays
+                directory exported by modelling/src/export_forest.py.
             size_encoder_path (str): Path to the package_size_encoder.pkl file.
             type_encoder_path (str): Path to the product_type_encoder.pkl file.
+            compile_forest (bool): Compile the model into a ForestTable for
+                O(log n) inference. Falls back to the model on failure.
+            cache (Optional[PredictionCache]): Optional cache in front of predict().
+            metrics (Optional[Metrics]): Receives per-stage timings of predict().
             
         Raises:
             RuntimeError: If any artifact fails to load.
         """
         print("Initializing PredictionService...")
-        self.model: Optional[Any] = None
-        self.size_encoder: Optional[Any] = None
-        self.type_encoder: Optional[Any] = None
+        self.compile_forest = compile_forest
+        self.cache = cache
+        self.metrics = metrics
+        self._thread_local = threading.local()
+        self._reload_lock = threading.Lock()
+        self._reload_status: Dict[str, Any] = {"state": "idle"}
+        os.register_at_fork(after_in_child=self._reset_reload_state)
+        self.warm_up_status: Dict[str, Any] = {"state": "pending"}
+        self.shadow_artifacts: Optional[ArtifactSet] = None
         
         try:
-            print(f"Loading model from: {model_path}")
-            self.model = joblib.load(model_path)
-            
-            print(f"Loading size encoder from: {size_encoder_path}")
-            self.size_encoder = joblib.load(size_encoder_path)
-
-            print(f"Loading target encoder from: {type_encoder_path}")
-            self.type_encoder = joblib.load(type_encoder_path)
+            self._artifacts: ArtifactSet = ArtifactSet.load(
+                model_path, size_encoder_path, type_encoder_path, compile_forest=compile_forest
+            )
             
         except FileNotFoundError as e:
             print(f"[SERVICE_ERROR] Critical artifact not found: {e}")
@@ -48,7 +78,233 @@ class PredictionService:
             print(f"[SERVICE_ERROR] An unexpected error occurred during initialization: {e}")
             raise RuntimeError(f"Failed to initialize service. {e}")
             
-        print("PredictionService initialized successfully.")
+        print(f"PredictionService initialized successfully. Model version: {self.model_version}")
+
+    # --- Current artifacts ---
+    @property
+    def artifacts(self) -> ArtifactSet:
+        return self._artifacts
+
+    @property
+    def model(self) -> Any:
+        return self._artifacts.model
+
+    @property
+    def size_encoder(self) -> Any:
+        return self._artifacts.size_encoder
+
+    @property
+    def type_encoder(self) -> Any:
+        return self._artifacts.type_encoder
+
+    @property
+    def forest_table(self) -> Optional[ForestTable]:
+        return self._artifacts.forest_table
+
+    @property
+    def model_version(self) -> str:
+        return self._artifacts.version
+
+    def _input_buffer(self) -> np.ndarray:
+        """
+        Returns this thread's preallocated (1, 2) model input buffer.
+        """
+        buffer = getattr(self._thread_local, 'buffer', None)
+        if buffer is None:
+            buffer = self._thread_local.buffer = np.empty((1, len(self.MODEL_EXPECTED_COLS)), dtype=np.float64)
+        return buffer
+
+    # --- Hot reload ---
+    def reload(
+        self, model_path: Optional[str] = None, size_encoder_path: Optional[str] = None,
+        type_encoder_path: Optional[str] = None, wait: bool = False
+    ) -> bool:
+        """
+        Loads a new artifact set in the background, warms it up and swaps
+        it in atomically. In-flight requests finish on the old set.
+        Paths that are not given keep their current value.
+        
+        Args:
+            model_path (Optional[str]): New model path.
+            size_encoder_path (Optional[str]): New size encoder path.
+            type_encoder_path (Optional[str]): New target encoder path.
+            wait (bool): Block until the reload finished.
+            
+        Returns:
+            bool: False if another reload is already running.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+
+        paths = dict(self._artifacts.paths)
+        for key, value in (
+            ("model_path", model_path), ("size_encoder_path", size_encoder_path),
+            ("type_encoder_path", type_encoder_path)
+        ):
+            if value:
+                paths[key] = value
+
+        self._reload_status = {"state": "loading", "started_at": datetime.now(timezone.utc).isoformat(), "paths": paths}
+        thread = threading.Thread(target=self._reload, args=(paths,), name="model-reload", daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return True
+
+    def _reset_reload_state(self):
+        """
+        Runs in the child after a fork. A reload thread of the parent does
+        not exist there, so a reload lock it held would never be released.
+        """
+        self._reload_lock = threading.Lock()
+        if self._reload_status.get("state") == "loading":
+            self._reload_status = {**self._reload_status, "state": "failed", "error": "Interrupted by a fork."}
+
+    def _reload(self, paths: Dict[str, str]):
+        """
+        Body of the background reload. Always releases the reload lock.
+        """
+        try:
+            artifacts = ArtifactSet.load(**paths, compile_forest=self.compile_forest)
+            warm_up_started_at = time.perf_counter()
+            n_points = self._warm_up_artifacts(artifacts, self.RELOAD_WARM_UP_POINTS, self.WARM_UP_MAX_WEIGHT_GR)
+            warm_up_ms = (time.perf_counter() - warm_up_started_at) * 1000
+
+            previous_version = self._artifacts.version
+            self._artifacts = artifacts  # Atomic swap
+            if self.cache is not None:
+                # Old entries are keyed on the old version and would never hit again
+                self.cache.clear()
+
+            self.warm_up_status = {
+                "state": "ok", "points": n_points, "duration_ms": round(warm_up_ms, 3),
+                "model_version": artifacts.version, "trigger": "reload"
+            }
+            print(f"[SERVICE_INFO] Model reloaded: {previous_version} -> {artifacts.version}")
+            self._reload_status.update(state="ok", version=artifacts.version, previous_version=previous_version)
+        except Exception as e:
+            print(f"[SERVICE_ERROR] Model reload failed, keeping version {self._artifacts.version}: {e}")
+            self._reload_status.update(state="failed", error=str(e))
+        finally:
+            self._reload_status["finished_at"] = datetime.now(timezone.utc).isoformat()
+            self._reload_lock.release()
+
+    def _warm_up_artifacts(self, artifacts: ArtifactSet, n_points: int, max_weight: float) -> int:
+        """
+        Scores a weight grid for every known size on an artifact set,
+        through both the batch and the single path, so it is exercised
+        (and proven sane) before it receives traffic.
+        
+        Returns:
+            int: Number of (weight, size) points scored.
+            
+        Raises:
+            ValueError: If the set cannot score the grid, returns unknown
+                labels, or the two paths disagree.
+        """
+        weights = np.round(np.linspace(1.0, max_weight, n_points), 2).tolist()
+        known_labels = set(artifacts.type_labels.values())
+
+        for package_size in artifacts.size_codes:
+            labels = self._predict_batch(artifacts, weights, [package_size] * len(weights))
+            if any(label not in known_labels for label in labels):
+                raise ValueError(f"Warm-up failed for package_size '{package_size}'.")
+            for weight, label in zip(weights, labels):
+                if self._predict_one(artifacts, weight, package_size) != label:
+                    raise ValueError(f"Single and batch predictions disagree for ({weight}, '{package_size}').")
+
+        return len(weights) * len(artifacts.size_codes)
+
+    def warm_up(self, n_points: int, max_weight: float = WARM_UP_MAX_WEIGHT_GR) -> Dict[str, Any]:
+        """
+        Boot-time warm-up of the served artifact set: scores the grid, so
+        sklearn/NumPy lazy initialization and the per-thread buffers are paid
+        here, then fills the prediction cache (if any) with the grid.
+        The result is kept in warm_up_status and gates readiness.
+        
+        Args:
+            n_points (int): Weights per package size. 0 skips the warm-up.
+            max_weight (float): Largest weight of the grid, in grams.
+            
+        Returns:
+            Dict[str, Any]: The new warm_up_status.
+        """
+        artifacts = self._artifacts
+        if n_points <= 0:
+            self.warm_up_status = {"state": "skipped", "model_version": artifacts.version}
+            return self.warm_up_status
+
+        # Runs before the worker takes traffic: keep warm-up calls out of the latency histograms
+        service_metrics, self.metrics = self.metrics, None
+        started_at = time.perf_counter()
+        try:
+            scored = self._warm_up_artifacts(artifacts, n_points, max_weight)
+            if self.cache is not None:
+                for weight in np.round(np.linspace(1.0, max_weight, n_points), 2).tolist():
+                    for package_size in artifacts.size_codes:
+                        self.predict_versioned(weight, package_size)
+            status = {"state": "ok", "points": scored}
+        except Exception as e:
+            print(f"[SERVICE_ERROR] Warm-up failed: {e}")
+            status = {"state": "failed", "error": str(e)}
+        finally:
+            self.metrics = service_metrics
+
+        status["duration_ms"] = round((time.perf_counter() - started_at) * 1000, 3)
+        status["model_version"] = artifacts.version
+        status["trigger"] = "boot"
+        self.warm_up_status = status
+        print(f"[SERVICE_INFO] Warm-up {status['state']} in {status['duration_ms']} ms.")
+        return status
+
+    # --- Shadow model ---
+    def load_shadow(self, model_path: str, size_encoder_path: str, type_encoder_path: str):
+        """
+        Loads and warms up a candidate artifact set scored in shadow
+        (see src/services/shadow_scorer.py). Requests keep being served
+        by the primary set only.
+
+        Raises:
+            RuntimeError: If the shadow artifacts fail to load or to warm up.
+        """
+        try:
+            artifacts = ArtifactSet.load(
+                model_path, size_encoder_path, type_encoder_path, compile_forest=self.compile_forest
+            )
+            self._warm_up_artifacts(artifacts, self.RELOAD_WARM_UP_POINTS, self.WARM_UP_MAX_WEIGHT_GR)
+        except Exception as e:
+            print(f"[SERVICE_ERROR] Could not load the shadow artifacts: {e}")
+            raise RuntimeError(f"Failed to load shadow artifacts. {e}")
+
+        self.shadow_artifacts = artifacts
+        print(f"Shadow artifacts loaded. Shadow model version: {artifacts.version}")
+
+    def predict_batch_shadow(
+        self, package_weights: Sequence[float], package_sizes: Sequence[str]
+    ) -> Tuple[List[Optional[str]], str]:
+        """
+        Same as predict_batch_versioned(), on the shadow artifact set.
+
+        Raises:
+            RuntimeError: If no shadow set is loaded.
+        """
+        artifacts = self.shadow_artifacts
+        if artifacts is None:
+            raise RuntimeError("No shadow artifacts are loaded.")
+        return self._predict_batch(artifacts, package_weights, package_sizes), artifacts.version
+
+    @property
+    def ready(self) -> bool:
+        """
+        True once the boot warm-up succeeded (or was skipped).
+        """
+        return self.warm_up_status["state"] in ("ok", "skipped")
+
+    def reload_status(self) -> Dict[str, Any]:
+        """
+        Returns the state of the last reload and the version being served.
+        """
+        return {**self._reload_status, "serving_version": self.model_version}
 
     def predict(self, package_weight: float, package_size: str) -> str:
         """
@@ -65,12 +321,125 @@ class PredictionService:
             ValueError: If the input 'package_size' is unknown.
             ValueError: If the model returns an unexpected class.
         """
+        return self.predict_versioned(package_weight, package_size)[0]
+
+    def predict_versioned(self, package_weight: float, package_size: str) -> Tuple[str, str]:
+        """
+        Same as predict(), but also returns the model version that served it.
         
-        if not self.model or not self.size_encoder or not self.type_encoder:
-            raise RuntimeError("PredictionService is not fully initialized.")
+        Returns:
+            Tuple[str, str]: (predicted label, model version).
+        """
+        artifacts = self._artifacts
+
+        if self.cache is None:
+            return self._predict_one(artifacts, package_weight, package_size), artifacts.version
+
+        # Score the quantized weight, so a cached answer never depends on
+        # which reading of the same quantized value came first
+        package_weight = self.cache.quantize(package_weight)
+        cache_key = (package_weight, package_size, artifacts.version)
+
+        prediction_label = self.cache.get(cache_key)
+        if prediction_label is None:
+            prediction_label = self._predict_one(artifacts, package_weight, package_size)
+            self.cache.put(cache_key, prediction_label)
+
+        return prediction_label, artifacts.version
+
+    def cached_versioned(self, package_weight: float, package_size: str) -> Optional[Tuple[str, str]]:
+        """
+        Cache lookup of predict_versioned() that never scores.
+
+        Returns:
+            Optional[Tuple[str, str]]: (predicted label, model version), or None
+                on a miss or when the cache is off.
+        """
+        if self.cache is None:
+            return None
+        artifacts = self._artifacts
+        prediction_label = self.cache.get((self.cache.quantize(package_weight), package_size, artifacts.version))
+        return None if prediction_label is None else (prediction_label, artifacts.version)
+
+    def predict_batch_caching_versioned(
+        self, package_weights: Sequence[float], package_sizes: Sequence[str]
+    ) -> Tuple[List[Optional[str]], str]:
+        """
+        predict_batch_versioned() for inputs that already missed the cache
+        (see cached_versioned()), e.g. single requests coalesced by the
+        MicroBatcher. Weights are quantized exactly like predict_versioned()
+        does and the labels are stored in the cache, so an input gets the same
+        label on the batched and the direct path.
+        """
+        artifacts = self._artifacts
+        if self.cache is None:
+            return self._predict_batch(artifacts, package_weights, package_sizes), artifacts.version
+
+        package_weights = [self.cache.quantize(weight) for weight in package_weights]
+        labels = self._predict_batch(artifacts, package_weights, package_sizes)
+        for weight, size, label in zip(package_weights, package_sizes, labels):
+            if label is not None:
+                self.cache.put((weight, size, artifacts.version), label)
+
+        return labels, artifacts.version
+
+    def _predict_one(self, artifacts: ArtifactSet, package_weight: float, package_size: str) -> str:
+        """
+        Uncached body of predict(), on one artifact set.
+        """
+        started_at = time.perf_counter()
+        size_encoded = artifacts.size_codes.get(package_size)
+        if size_encoded is None:
+            print(f"[SERVICE_WARNING] Unknown 'package_size' value: {package_size}")
+            raise ValueError(f"Invalid or unknown 'package_size' value: '{package_size}'")
+
+        encoded_at = time.perf_counter()
+
+        # Prediction
+        if artifacts.forest_table is not None:
+            prediction_encoded = artifacts.forest_table.predict_one(package_weight, size_encoded)
+        else:
+            input_data = self._input_buffer()
+            input_data[0, 0] = package_weight
+            input_data[0, 1] = size_encoded
+            prediction_encoded = artifacts.model_predict(input_data)[0]
+        predicted_at = time.perf_counter()
+
+        # Decoding
+        prediction_label = artifacts.type_labels.get(prediction_encoded)
+        if prediction_label is None:
+            print(f"[SERVICE_ERROR] Model returned a class index '{prediction_encoded}' that the target encoder does not know.")
+            raise ValueError("Model prediction is incompatible with the target encoder.")
+
+        if self.metrics is not None:
+            self.metrics.observe('size_encoding', encoded_at - started_at)
+            self.metrics.observe('inference', predicted_at - encoded_at)
+            self.metrics.observe('label_decoding', time.perf_counter() - predicted_at)
+
+        return prediction_label
+
+    def predict_reference(self, package_weight: float, package_size: str) -> str:
+        """
+        Reference implementation of predict() using pandas and the sklearn
+        encoders directly. Slower, but kept to cross-check the hot path.
+        
+        Args:
+            package_weight (float): The package weight in grams.
+            package_size (str): The package size (e.g., "Small Package").
+            
+        Returns:
+            str: The predicted product label (e.g., "Smartphone").
+            
+        Raises:
+            ValueError: If the input 'package_size' is unknown.
+            ValueError: If the model returns an unexpected class.
+        """
+        import pandas as pd
+        
+        artifacts = self._artifacts
 
         try:
-            size_encoded = self.size_encoder.transform([package_size])[0]
+            size_encoded = artifacts.size_encoder.transform([package_size])[0]
         except ValueError as e:
             print(f"[SERVICE_WARNING] Unknown 'package_size' value: {package_size}")
             raise ValueError(f"Invalid or unknown 'package_size' value: '{package_size}'")
@@ -82,25 +451,155 @@ class PredictionService:
         )
 
         # Prediction
-        prediction_encoded = self.model.predict(input_data)[0]
+        prediction_encoded = artifacts.model.predict(input_data)[0]
 
         # Decoding
         try:
-            prediction_label = self.type_encoder.inverse_transform([prediction_encoded])[0]
+            prediction_label = artifacts.type_encoder.inverse_transform([prediction_encoded])[0]
         except ValueError as e:
             print(f"[SERVICE_ERROR] Model returned a class index '{prediction_encoded}' that the target encoder does not know.")
             raise ValueError("Model prediction is incompatible with the target encoder.")
 
         return prediction_label
 
+    def predict_batch(self, package_weights: Sequence[float], package_sizes: Sequence[str]) -> List[Optional[str]]:
+        """
+        Vectorized version of predict() for many packages at once.
+        
+        Sizes are encoded, the model is called and labels are decoded
+        in a single pass over all items with a known 'package_size'.
+        
+        Args:
+            package_weights (Sequence[float]): The package weights in grams.
+            package_sizes (Sequence[str]): The package sizes, aligned with the weights.
+            
+        Returns:
+            List[Optional[str]]: The predicted labels in input order.
+                None marks an item whose 'package_size' is unknown.
+            
+        Raises:
+            ValueError: If the weights and sizes have different lengths.
+            ValueError: If the model returns an unexpected class.
+        """
+        return self.predict_batch_versioned(package_weights, package_sizes)[0]
+
+    def predict_batch_versioned(
+        self, package_weights: Sequence[float], package_sizes: Sequence[str]
+    ) -> Tuple[List[Optional[str]], str]:
+        """
+        Same as predict_batch(), but also returns the model version that served it.
+        
+        Returns:
+            Tuple[List[Optional[str]], str]: (predicted labels, model version).
+        """
+        artifacts = self._artifacts
+        return self._predict_batch(artifacts, package_weights, package_sizes), artifacts.version
+
+    def _predict_batch(
+        self, artifacts: ArtifactSet, package_weights: Sequence[float], package_sizes: Sequence[str]
+    ) -> List[Optional[str]]:
+        """
+        Body of predict_batch(), on one artifact set.
+        """
+        if len(package_weights) != len(package_sizes):
+            raise ValueError("'package_weights' and 'package_sizes' must have the same length.")
+
+        results: List[Optional[str]] = [None] * len(package_sizes)
+        if not results:
+            return results
+
+        sizes = np.asarray(package_sizes, dtype=object)
+        weights = np.asarray(package_weights, dtype=np.float64)
+
+        # Encoder classes_ are sorted, so encoding is a binary search.
+        # Unknown sizes are reported per item instead of failing the whole batch
+        sizes_encoded = np.searchsorted(artifacts.size_classes, sizes)
+        sizes_encoded = np.minimum(sizes_encoded, len(artifacts.size_classes) - 1)
+        known_idx = np.flatnonzero(artifacts.size_classes[sizes_encoded] == sizes)
+        if known_idx.size == 0:
+            return results
+
+        predictions_encoded = self._predict_encoded(artifacts, weights[known_idx], sizes_encoded[known_idx])
+        prediction_labels = artifacts.type_classes[predictions_encoded]
+
+        for i, label in zip(known_idx.tolist(), prediction_labels.tolist()):
+            results[i] = label
+
+        return results
+
+    @staticmethod
+    def _predict_encoded(artifacts: ArtifactSet, weights: np.ndarray, sizes_encoded: np.ndarray) -> np.ndarray:
+        """
+        Model call on encoded inputs. Returns target encoder indexes.
+
+        Raises:
+            ValueError: If the model returns an unexpected class.
+        """
+        if artifacts.forest_table is not None:
+            predictions_encoded = artifacts.forest_table.predict(weights, sizes_encoded)
+        else:
+            predictions_encoded = artifacts.model_predict(np.column_stack([weights, sizes_encoded]))
+
+        predictions_encoded = np.asarray(predictions_encoded).ravel()
+        if not np.isin(predictions_encoded, np.arange(len(artifacts.type_classes))).all():
+            print(f"[SERVICE_ERROR] Model returned class indexes that the target encoder does not know.")
+            raise ValueError("Model prediction is incompatible with the target encoder.")
+        return predictions_encoded.astype(np.int64)
+
+    def predict_columnar_versioned(
+        self, weights: np.ndarray, size_codes: np.ndarray, size_vocabulary: Sequence[str]
+    ) -> Tuple[np.ndarray, np.ndarray, str]:
+        """
+        Columnar version of predict_batch_versioned() for pre-encoded inputs
+        (see src/models/columnar.py). The arrays are used as given, without
+        building per-item Python objects.
+
+        Args:
+            weights (np.ndarray): The package weights in grams.
+            size_codes (np.ndarray): Index of each item's size in size_vocabulary.
+            size_vocabulary (Sequence[str]): The package sizes the codes refer to.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, str]: (target encoder index per item,
+                -1 for an unknown 'package_size'; the target classes; model version).
+
+        Raises:
+            ValueError: If the weights and codes have different lengths.
+            ValueError: If the model returns an unexpected class.
+        """
+        if len(weights) != len(size_codes):
+            raise ValueError("'weights' and 'size_codes' must have the same length.")
+
+        artifacts = self._artifacts
+        results = np.full(len(weights), -1, dtype=np.int64)
+
+        # Maps the request's vocabulary onto the encoder codes once, then every item with one lookup
+        vocabulary_codes = np.array([artifacts.size_codes.get(size, -1) for size in size_vocabulary] + [-1], dtype=np.int64)
+        sizes_encoded = vocabulary_codes[size_codes]
+        known = sizes_encoded >= 0
+        if known.all():
+            if len(weights):
+                results[:] = self._predict_encoded(artifacts, weights, sizes_encoded)
+        elif known.any():
+            results[known] = self._predict_encoded(artifacts, weights[known], sizes_encoded[known])
+
+        return results, artifacts.type_classes, artifacts.version
+
 # --- Singleton Instance ---
 # Create a single instance of the service when the module is imported.
 # This ensures artifacts are loaded only ONCE at application startup.
 try:
     prediction_service = PredictionService(
-        model_path = settings.MODEL_PATH,
+        model_path = settings.FOREST_ARRAYS_PATH or settings.MODEL_PATH,
         size_encoder_path = settings.SIZE_ENCODER_PATH,
-        type_encoder_path = settings.TYPE_ENCODER_PATH
+        type_encoder_path = settings.TYPE_ENCODER_PATH,
+        compile_forest = settings.USE_COMPILED_FOREST,
+        cache = PredictionCache(
+            max_size = settings.PREDICTION_CACHE_MAX_SIZE,
+            ttl_seconds = settings.PREDICTION_CACHE_TTL_SECONDS,
+            weight_decimals = settings.WEIGHT_QUANTIZATION_DECIMALS
+        ) if settings.PREDICTION_CACHE_ENABLED else None,
+        metrics = metrics
     )
 except RuntimeError as e:
     print(f"[FATAL] Could not initialize PredictionService: {e}")
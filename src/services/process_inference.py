@@ -0,0 +1,36 @@
+from typing import Dict, List, Optional, Tuple
+
+# Entry points of the ASGI process executor (src/asgi.py, ASGI_EXECUTOR=process).
+# Kept out of src/asgi.py so a worker process only imports the prediction
+# service, not the web app and its background services.
+
+
+def init_worker(paths: Dict[str, str], version: str):
+    """
+    Loads the artifact set the parent serves, once per worker process.
+    Importing the module creates the PredictionService singleton from the
+    settings; if the parent serves another version (hot reload), the worker
+    reloads the parent's paths.
+
+    Raises:
+        RuntimeError: If the artifacts cannot be loaded.
+    """
+    from src.services.prediction_service import prediction_service
+
+    if prediction_service is None:
+        raise RuntimeError("PredictionService failed to initialize. Check the artifact paths.")
+    if prediction_service.model_version != version:
+        prediction_service.reload(**paths, wait=True)
+        status = prediction_service.reload_status()
+        if status["state"] != "ok":
+            raise RuntimeError(f"Could not load the served artifacts: {status.get('error')}")
+
+
+def predict_versioned(package_weight: float, package_size: str) -> Tuple[str, str]:
+    from src.services.prediction_service import prediction_service
+    return prediction_service.predict_versioned(package_weight, package_size)
+
+
+def predict_batch_versioned(package_weights: List[float], package_sizes: List[str]) -> Tuple[List[Optional[str]], str]:
+    from src.services.prediction_service import prediction_service
+    return prediction_service.predict_batch_versioned(package_weights, package_sizes)
@@ -0,0 +1,301 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.config import settings
+from src.services.metrics import Metrics, SharedCounters, metrics
+from src.services.prediction_service import PredictionService, prediction_service
+
+# Marks the end of the queue on shutdown, one per worker thread
+_STOP = object()
+
+
+class ShadowScorer:
+    """
+    Scores live traffic with a candidate model without touching request latency.
+
+    Requests are answered by the primary model only. Their scored inputs
+    and primary labels are then handed off to a bounded queue, and a small
+    pool of background threads scores them with the service's shadow
+    artifact set in batches (up to batch_size inputs, or whatever arrived
+    within flush_interval_s), recording:
+    - agreement with the primary labels (Metrics, 'agree'/'disagree');
+    - per-class confusion counts, primary label x shadow label;
+    - shadow model latency per call (Metrics, 'shadow_inference' stage).
+
+    Inputs the primary model did not score (unknown size, label None)
+    are not compared: they are counted as 'unscored' and kept out of the
+    agreement rate.
+
+    Handing off is a counter check and one queue put. When more than
+    max_pending_items inputs are waiting, new inputs are dropped and
+    counted instead of slowing the primary path down. The confusion
+    counters are SharedCounters, so with a shared directory /shadow merges
+    every gunicorn worker.
+    """
+
+    def __init__(
+        self, service: PredictionService, n_workers: int = 1, max_pending_items: int = 100000,
+        batch_size: int = 1024, flush_interval_s: float = 0.05,
+        metrics: Optional[Metrics] = None, directory: Optional[str] = None
+    ):
+        """
+        Args:
+            service (PredictionService): Service with its shadow artifacts loaded.
+            n_workers (int): Background scoring threads.
+            max_pending_items (int): Inputs waiting to be scored; more are dropped.
+            batch_size (int): Maximum inputs per shadow model call.
+            flush_interval_s (float): Maximum time an input waits for its batch to fill.
+            metrics (Optional[Metrics]): Receives outcome counts and shadow latency.
+            directory (Optional[str]): Shared directory for multi-process merging.
+
+        Raises:
+            ValueError: If the service has no shadow artifacts.
+        """
+        if service.shadow_artifacts is None:
+            raise ValueError("The service has no shadow artifacts loaded.")
+
+        self.service = service
+        self.n_workers = n_workers
+        self.max_pending_items = max_pending_items
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.metrics = metrics
+
+        # Confusion matrix over both label sets, plus a slot for anything else
+        # (None from the shadow model, or a label of a later reloaded version)
+        self.labels: List[str] = sorted(
+            set(service.artifacts.type_labels.values()) | set(service.shadow_artifacts.type_labels.values())
+        )
+        self._label_index = {label: i for i, label in enumerate(self.labels)}
+        self._n_slots = len(self.labels) + 1
+        self.confusion = SharedCounters('shadow_confusion', self._n_slots ** 2, directory)
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._pid: Optional[int] = None
+        self._closed = False
+
+        self._pending = 0
+        self._scored = 0
+        self._dropped = 0
+        self._unscored = 0
+        self._errors = 0
+        self._batches = 0
+        self._shadow_time_s = 0.0
+
+    def _ensure_started(self):
+        """
+        Starts the worker threads on first use, and again after a fork
+        (threads do not survive fork, e.g. gunicorn --preload).
+        """
+        if self._threads and self._pid == os.getpid():
+            return
+        with self._lock:
+            if not self._threads or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._pending = 0
+                self._queue = queue.Queue()
+                self._threads = [
+                    threading.Thread(target=self._run, name=f"shadow-scorer-{i}", daemon=True)
+                    for i in range(self.n_workers)
+                ]
+                for thread in self._threads:
+                    thread.start()
+
+    def submit(
+        self, package_weights: Sequence[float], package_sizes: Sequence[str], labels: Sequence[Optional[str]]
+    ) -> bool:
+        """
+        Hands scored inputs and their primary labels off to the shadow pool.
+        Never blocks.
+
+        Returns:
+            bool: False if the inputs were dropped.
+        """
+        scored = [i for i, label in enumerate(labels) if label is not None]
+        if len(scored) < len(labels):
+            self._count_unscored(len(labels) - len(scored))
+            package_weights = [package_weights[i] for i in scored]
+            package_sizes = [package_sizes[i] for i in scored]
+            labels = [labels[i] for i in scored]
+
+        n = len(package_weights)
+        if not n:
+            return True
+        if self._closed:
+            self._count_dropped(n)
+            return False
+        self._ensure_started()
+
+        with self._lock:
+            accepted = self._pending + n <= self.max_pending_items
+            if accepted:
+                self._pending += n
+        if not accepted:
+            self._count_dropped(n)
+            return False
+
+        self._queue.put_nowait((list(package_weights), list(package_sizes), list(labels)))
+        return True
+
+    def _run(self):
+        """
+        Scoring loop of one worker thread.
+        """
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            chunks = [first]
+            n_items = len(first[0])
+            deadline = time.monotonic() + self.flush_interval_s
+            stop = False
+
+            while n_items < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                chunks.append(item)
+                n_items += len(item[0])
+
+            self._score(chunks, n_items)
+            if stop:
+                return
+
+    def _score(self, chunks: List[Tuple[list, list, list]], n_items: int):
+        """
+        Scores the queued inputs with the shadow model and records the comparison.
+        """
+        package_weights = [w for chunk in chunks for w in chunk[0]]
+        package_sizes = [s for chunk in chunks for s in chunk[1]]
+        primary_labels = [label for chunk in chunks for label in chunk[2]]
+
+        try:
+            started_at = time.perf_counter()
+            shadow_labels, _ = self.service.predict_batch_shadow(package_weights, package_sizes)
+            elapsed = time.perf_counter() - started_at
+        except Exception as e:
+            print(f"[SHADOW_ERROR] Could not score {n_items} inputs with the shadow model: {e}")
+            with self._lock:
+                self._pending -= n_items
+                self._errors += n_items
+            if self.metrics is not None:
+                self.metrics.count_shadow('error', n_items)
+            return
+
+        other = len(self.labels)
+        cells: Dict[int, float] = {}
+        agree = 0
+        for primary, shadow in zip(primary_labels, shadow_labels):
+            # Same rule as report(): labels outside the known set never agree
+            agree += primary == shadow and primary in self._label_index
+            cell = self._label_index.get(primary, other) * self._n_slots + self._label_index.get(shadow, other)
+            cells[cell] = cells.get(cell, 0.0) + 1.0
+        self.confusion.add_many(list(cells), list(cells.values()))
+
+        with self._lock:
+            self._pending -= n_items
+            self._scored += n_items
+            self._batches += 1
+            self._shadow_time_s += elapsed
+        if self.metrics is not None:
+            self.metrics.observe('shadow_inference', elapsed)
+            self.metrics.count_shadow('agree', agree)
+            self.metrics.count_shadow('disagree', n_items - agree)
+
+    def _count_dropped(self, n: int):
+        with self._lock:
+            self._dropped += n
+        if self.metrics is not None:
+            self.metrics.count_shadow('dropped', n)
+
+    def _count_unscored(self, n: int):
+        with self._lock:
+            self._unscored += n
+        if self.metrics is not None:
+            self.metrics.count_shadow('unscored', n)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """
+        Stops accepting inputs and lets the workers finish what is queued.
+        """
+        self._closed = True
+        if not self._threads or self._pid != os.getpid():
+            return
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of the shadow counters of this process.
+        """
+        with self._lock:
+            return {
+                "workers": self.n_workers,
+                "pending": self._pending,
+                "scored": self._scored,
+                "dropped": self._dropped,
+                "unscored": self._unscored,
+                "errors": self._errors,
+                "batches": self._batches,
+                "avg_shadow_us_per_item": round(self._shadow_time_s / self._scored * 1e6, 3) if self._scored else None
+            }
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Agreement and per-class confusion counts, merged over every process.
+        Confusion is keyed by primary label, then shadow label.
+        """
+        counts = self.confusion.aggregate().reshape(self._n_slots, self._n_slots)
+        names = self.labels + ["<other>"]
+        total = int(counts.sum())
+        # '<other>' x '<other>' pairs two labels that may differ, so it never counts as agreement
+        agreed = int(sum(counts[i, i] for i in range(len(self.labels))))
+
+        return {
+            "primary_version": self.service.model_version,
+            "shadow_version": self.service.shadow_artifacts.version,
+            "compared": total,
+            "agreement_rate": round(agreed / total, 6) if total else None,
+            "confusion": {
+                primary: {shadow: int(counts[i, j]) for j, shadow in enumerate(names) if counts[i, j]}
+                for i, primary in enumerate(names) if counts[i].any()
+            }
+        }
+
+
+# --- Singleton Instance ---
+# Only created when a shadow model is configured and loads.
+shadow_scorer: Optional[ShadowScorer] = None
+if settings.SHADOW_MODEL_PATH and prediction_service is not None:
+    try:
+        prediction_service.load_shadow(
+            settings.SHADOW_MODEL_PATH,
+            settings.SHADOW_SIZE_ENCODER_PATH or settings.SIZE_ENCODER_PATH,
+            settings.SHADOW_TYPE_ENCODER_PATH or settings.TYPE_ENCODER_PATH
+        )
+        shadow_scorer = ShadowScorer(
+            prediction_service,
+            n_workers = settings.SHADOW_WORKERS,
+            max_pending_items = settings.SHADOW_MAX_PENDING_ITEMS,
+            batch_size = settings.SHADOW_BATCH_SIZE,
+            flush_interval_s = settings.SHADOW_FLUSH_INTERVAL_SECONDS,
+            metrics = metrics,
+            directory = settings.METRICS_DIR
+        )
+        atexit.register(shadow_scorer.close)
+    except RuntimeError as e:
+        print(f"[SHADOW_ERROR] Shadow scoring is off: {e}")
@@ -4,38 +4,63 @@
 HOST="127.0.0.1"      # 127.0.0.1 = localhost
 PORT="5000"
 WORKERS=4
+THREADS="${THREADS:-1}"  # Request threads per worker (>1 uses gunicorn's gthread worker)
+BACKLOG="${BACKLOG:-2048}"  # Pending connections the kernel queues before refusing new ones
 APP_MODULE="run:app"
+# PRELOAD=true loads the artifacts once in the master and forks the workers (see gunicorn_preload.py)
+PRELOAD="${PRELOAD:-false}"
 LOG_FILE="gunicorn.log"
-HEALTH_ENDPOINT="http://${HOST}:${PORT}/health"
+READY_ENDPOINT="http://${HOST}:${PORT}/ready"
+READY_TIMEOUT_S=120
+# Shared by all workers so /metrics aggregates every process
+export METRICS_DIR="${METRICS_DIR:-/tmp/prediction_api_metrics}"
 
 # === 1. Start Gunicorn in Background ===
 echo "Starting API server with Gunicorn..."
-echo "Host: $HOST, Port: $PORT, Workers: $WORKERS"
+echo "Host: $HOST, Port: $PORT, Workers: $WORKERS, Threads: $THREADS, Backlog: $BACKLOG"
 echo "Logs will be written to $LOG_FILE"
 
+# Start metrics from zero on every deploy
+rm -rf "$METRICS_DIR"
+mkdir -p "$METRICS_DIR"
+
+GUNICORN_CONFIG=""
+if [ "$PRELOAD" = "true" ]; then
+    GUNICORN_CONFIG="-c gunicorn_preload.py"
+fi
+
 # the final '&' runs in background.
-gunicorn --workers $WORKERS --bind ${HOST}:${PORT} $APP_MODULE > $LOG_FILE 2>&1 &
+gunicorn $GUNICORN_CONFIG --workers $WORKERS --threads $THREADS --backlog $BACKLOG --bind ${HOST}:${PORT} $APP_MODULE > $LOG_FILE 2>&1 &
 
 # gunicorn --workers 4 --bind 0.0.0.0:5000 run:app
 
-# === 2. Health Check Loop ===
-echo "Waiting for server to be ready at $HEALTH_ENDPOINT..."
+# === 2. Readiness Check Loop ===
+echo "Waiting for server to be ready at $READY_ENDPOINT..."
 
-# Loop until curl successfully connects (exit code 0)
-# -f: Fail silently (non-zero exit code on 4xx/5xx)
+# Loop until a worker answers 200 on /ready (artifacts loaded and warmed up)
+# -f: Fail silently (non-zero exit code on 4xx/5xx, e.g. 503 while not ready)
 # -s: Silent mode (don't show progress)
 # > /dev/null: Discard the output, we only care about the exit code
-while ! curl -f -s $HEALTH_ENDPOINT > /dev/null; do
+WAITED=0
+while ! curl -f -s $READY_ENDPOINT > /dev/null; do
+    if [ $WAITED -ge $READY_TIMEOUT_S ]; then
+        echo "Server not ready after ${READY_TIMEOUT_S}s. Last /ready response:"
+        curl -s $READY_ENDPOINT
+        echo ""
+        echo "Check $LOG_FILE for details."
+        exit 1
+    fi
     echo "Server not ready yet. Retrying in 2 seconds..."
     sleep 2
+    WAITED=$((WAITED + 2))
 done
 
 # === 3. Success ===
 echo ""
 echo "---------------------------------"
 echo "API is UP AND RUNNING!"
-echo "Final health check response:"
-curl $HEALTH_ENDPOINT
+echo "Final readiness check response:"
+curl $READY_ENDPOINT
 echo ""
 echo "---------------------------------"
 echo "Server is running in the background."
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.services.forest_table import ForestTable
+
+N_SIZE_CODES = 3
+
+
+@pytest.fixture(scope="module")
+def forest():
+    """
+    Small forest on synthetic (weight, size code) data, shaped like the served model.
+    """
+    rng = np.random.default_rng(0)
+    weights = rng.uniform(0.0, 1000.0, 3000).astype(np.float32)
+    size_codes = rng.integers(0, N_SIZE_CODES, 3000)
+    X = np.column_stack([weights, size_codes]).astype(np.float32)
+    y = np.where(weights + 150.0 * size_codes + rng.normal(0.0, 80.0, 3000) > 600.0, "large", "small")
+
+    model = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0)
+    return model.fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def table(forest):
+    return ForestTable.compile(forest, n_size_codes=N_SIZE_CODES)
+
+
+def _weights(table: ForestTable) -> np.ndarray:
+    """
+    An evenly spaced grid past both ends, every threshold and its float32 neighbours.
+    """
+    edges = np.concatenate(table.thresholds).astype(np.float32)
+    assert edges.size, "the forest should split on weight"
+    return np.concatenate([
+        np.linspace(-100.0, 1100.0, 5000, dtype=np.float32),
+        edges,
+        np.nextafter(edges, np.float32(-np.inf)),
+        np.nextafter(edges, np.float32(np.inf))
+    ])
+
+
+@pytest.mark.parametrize("size_code", range(N_SIZE_CODES))
+def test_predict_matches_model(forest, table, size_code):
+    weights = _weights(table)
+    size_codes = np.full(weights.size, size_code)
+    expected = forest.predict(np.column_stack([weights, size_codes]).astype(np.float32))
+
+    np.testing.assert_array_equal(table.predict(weights, size_codes), expected)
+
+
+@pytest.mark.parametrize("size_code", range(N_SIZE_CODES))
+def test_predict_one_matches_predict(table, size_code):
+    weights = _weights(table)
+    expected = table.predict(weights, np.full(weights.size, size_code))
+
+    assert [table.predict_one(float(w), size_code) for w in weights] == expected.tolist()
+
+
+def test_predict_proba_matches_model(forest, table):
+    weights = _weights(table)
+    size_codes = np.arange(weights.size) % N_SIZE_CODES
+    expected = forest.predict_proba(np.column_stack([weights, size_codes]).astype(np.float32))
+
+    np.testing.assert_allclose(table.predict_proba(weights, size_codes), expected)
+
+
+def test_verify_reports_no_mismatches(forest, table):
+    assert table.verify(forest, n_points=2000) == 0
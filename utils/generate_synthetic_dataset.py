@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Scalable version of create_synthetic_dataset.py: same columns and the
+# same kind of noise, generated chunk by chunk so any row count fits in memory.
+
+# --- Defaults ---
+# Same business rules as create_synthetic_dataset.py.
+# Structure: { 'product': {'mean_weight': grams, 'sizes': {'package_size': probability}} }
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "rows": 5000,
+    "chunk_size": 1_000_000,
+    "seed": 42,
+    "label_noise": 0.1,          # Share of rows whose label is flipped to another product
+    "weight_noise_std": 0.25,    # Std dev of the weight, as a share of the product mean
+    "products": {
+        "Smartphone": {"mean_weight": 220, "sizes": {"Small Package": 1.0}},
+        "Tablet":     {"mean_weight": 550, "sizes": {"Large Package": 1.0}}
+    }
+}
+# --------------------
+
+
+class GeneratorSpec:
+    """
+    The generation parameters as flat NumPy arrays, built once and
+    shared by every chunk.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Raises:
+            ValueError: If the config is inconsistent.
+        """
+        products = config["products"]
+        if len(products) < 2 and config["label_noise"] > 0:
+            raise ValueError("Label noise needs at least two products.")
+
+        self.product_names = np.array(list(products), dtype=object)
+        self.size_names = np.array(sorted({size for p in products.values() for size in p["sizes"]}), dtype=object)
+        self.mean_weights = np.array([p["mean_weight"] for p in products.values()], dtype=np.float64)
+        # Products are drawn uniformly unless a 'share' is given
+        shares = np.array([p.get("share", 1.0) for p in products.values()], dtype=np.float64)
+        self.product_p = shares / shares.sum()
+
+        # Cumulative size probabilities per product, shape (n_products, n_sizes)
+        size_p = np.zeros((len(self.product_names), len(self.size_names)))
+        size_index = {name: i for i, name in enumerate(self.size_names)}
+        for row, product in enumerate(products.values()):
+            for size, probability in product["sizes"].items():
+                size_p[row, size_index[size]] = probability
+        if not np.allclose(size_p.sum(axis=1), 1.0):
+            raise ValueError("Size probabilities of every product must sum to 1.")
+        self.size_cdf = np.cumsum(size_p, axis=1)
+
+        self.label_noise = float(config["label_noise"])
+        self.weight_noise_std = float(config["weight_noise_std"])
+
+
+def generate_chunk(spec: GeneratorSpec, seed: np.random.SeedSequence, first_id: int, n_rows: int) -> pd.DataFrame:
+    """
+    Generates one chunk with vectorized draws only.
+    The output depends on (seed, first_id, n_rows) alone, never on
+    which process generates it.
+    """
+    rng = np.random.default_rng(seed)
+    n_products = len(spec.product_names)
+
+    # True product, then its package size from the product's size distribution
+    true_product = rng.choice(n_products, size=n_rows, p=spec.product_p)
+    u = rng.random(n_rows)
+    size_code = (u[:, None] >= spec.size_cdf[true_product]).sum(axis=1)
+    size_code = np.minimum(size_code, len(spec.size_names) - 1) # Guards against cdf rounding
+
+    # Gaussian weight noise, relative to the product mean
+    mean = spec.mean_weights[true_product]
+    weights = np.round(rng.normal(mean, mean * spec.weight_noise_std), 2)
+    weights = np.where(weights < 0, mean, weights)
+
+    # Label noise: flip an exact share of rows to a different product
+    product = true_product.copy()
+    n_noisy = int(round(n_rows * spec.label_noise))
+    if n_noisy:
+        noisy = rng.choice(n_rows, size=n_noisy, replace=False)
+        product[noisy] = (true_product[noisy] + rng.integers(1, n_products, size=n_noisy)) % n_products
+
+    return pd.DataFrame({
+        'id': np.arange(first_id, first_id + n_rows, dtype=np.int64),
+        'package_weight_gr': weights,
+        'package_size': pd.Categorical.from_codes(size_code, categories=spec.size_names),
+        'product_type': pd.Categorical.from_codes(product, categories=spec.product_names)
+    })
+
+
+def _write_chunk(
+    spec: GeneratorSpec, seed: np.random.SeedSequence, index: int, first_id: int,
+    n_rows: int, output_dir: Optional[str]
+) -> Tuple[int, Any]:
+    """
+    Pool task: writes the chunk as one Parquet partition (output_dir given)
+    or returns it to the parent for the ordered CSV writer.
+    """
+    chunk = generate_chunk(spec, seed, first_id, n_rows)
+    if output_dir is None:
+        return index, chunk
+    chunk.to_parquet(os.path.join(output_dir, f'part-{index:05d}.parquet'), index=False)
+    return index, n_rows
+
+
+def run(config: Dict[str, Any], output: str, output_format: str, workers: int):
+    """
+    Generates config['rows'] rows in chunks of config['chunk_size'].
+
+    Every chunk gets its own child of SeedSequence(config['seed']), so
+    the dataset is identical for any number of workers. At most 2 chunks
+    per worker are in flight, so memory stays bounded for any row count.
+    """
+    spec = GeneratorSpec(config)
+    n_rows, chunk_size = config["rows"], config["chunk_size"]
+    n_chunks = max(1, -(-n_rows // chunk_size))
+    seeds = np.random.SeedSequence(config["seed"]).spawn(n_chunks)
+
+    print(f"Starting generation of {n_rows} rows in {n_chunks} chunks ({workers} workers)...")
+    print(f"Classes: {list(spec.product_names)}")
+    print(f"Label Noise: {spec.label_noise * 100}%")
+    print(f"Weight Noise (Std Dev): {spec.weight_noise_std * 100}% of the mean")
+
+    if output_format == 'parquet':
+        os.makedirs(output, exist_ok=True)
+        output_dir = output
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        if os.path.exists(output):
+            os.remove(output)
+        output_dir = None
+
+    started_at = time.perf_counter()
+    written = 0
+    next_index = 0
+    ready: Dict[int, Any] = {}
+
+    def collect(done):
+        # CSV chunks can finish out of order; append them in index order
+        nonlocal written, next_index
+        for future in done:
+            index, result = future.result()
+            ready[index] = result
+        while next_index in ready:
+            result = ready.pop(next_index)
+            if output_dir is None:
+                result.to_csv(output, mode='a', header=(next_index == 0), index=False)
+                result = len(result)
+            written += result
+            next_index += 1
+            elapsed = time.perf_counter() - started_at
+            print(f"  chunk {next_index}/{n_chunks} | {written} rows | {written / elapsed:,.0f} rows/sec")
+
+    def tasks():
+        for index in range(n_chunks):
+            first_id = index * chunk_size + 1
+            yield index, first_id, min(chunk_size, n_rows - index * chunk_size)
+
+    if workers <= 1:
+        for index, first_id, size in tasks():
+            ready[index] = _write_chunk(spec, seeds[index], index, first_id, size, output_dir)[1]
+            collect([])
+    else:
+        pending = set()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for index, first_id, size in tasks():
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(executor.submit(_write_chunk, spec, seeds[index], index, first_id, size, output_dir))
+            done, _ = wait(pending)
+            collect(done)
+
+    elapsed = time.perf_counter() - started_at
+    print("\n--- GENERATION COMPLETED ---")
+    print(f"{written} rows written to '{output}' in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} rows/sec)")
+
+
+def parse_product(value: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Parses 'Name:mean_weight[:Size=p,Size=p]', e.g.
+    'Tablet:550:Large Package=0.8,Small Package=0.2'.
+    """
+    name, mean_weight, *sizes = value.split(':', 2)
+    sizes_p = {}
+    for pair in (sizes[0].split(',') if sizes else []):
+        size, probability = pair.rsplit('=', 1)
+        sizes_p[size.strip()] = float(probability)
+    if not sizes_p:
+        raise argparse.ArgumentTypeError(f"Product '{name}' needs at least one Size=probability.")
+    return name, {"mean_weight": float(mean_weight), "sizes": sizes_p}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Chunked, seeded synthetic shipping dataset generator.")
+    parser.add_argument("output", help="Output directory (parquet) or file (csv).")
+    parser.add_argument("--config", help="JSON file overriding the defaults (same keys as DEFAULT_CONFIG).")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet", dest="output_format")
+    parser.add_argument("--rows", type=int)
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--label-noise", type=float)
+    parser.add_argument("--weight-noise-std", type=float)
+    parser.add_argument("--product", type=parse_product, action="append",
+                        help="Replaces the product list. Repeatable: 'Name:mean_weight:Size=p,Size=p'.")
+    parser.add_argument("--workers", type=int, default=1, help="Generator processes. Output does not depend on it.")
+    args = parser.parse_args()
+
+    # Defaults < config file < command line
+    config = dict(DEFAULT_CONFIG)
+    if args.config:
+        with open(args.config) as f:
+            config.update(json.load(f))
+    for key in ("rows", "chunk_size", "seed", "label_noise", "weight_noise_std"):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    if args.product:
+        config["products"] = dict(args.product)
+
+    run(config, args.output, args.output_format, args.workers)